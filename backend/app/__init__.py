@@ -3,7 +3,7 @@ Flaskアプリケーションパッケージ
 アプリケーションの初期化とルート登録を行う
 """
 
-from flask import Flask, jsonify
+from flask import Flask, current_app, jsonify
 from flask_cors import CORS
 import os
 import json
@@ -39,6 +39,22 @@ def createApp(configName: str = None) -> Flask:
     from .models import db
     db.init_app(app)
     
+    # SQLite の接続ごとの設定（WAL など）
+    from .sqlite_tuning import initSqlitePragmas
+    initSqlitePragmas(app)
+    
+    # カタログのメモリ内スナップショット
+    from .catalog import initCatalog
+    initCatalog(app)
+    
+    # エンコード済みレスポンスのキャッシュ
+    from .http_cache import initResponseCache
+    initResponseCache(app)
+    
+    # インポートなどのバックグラウンドジョブ
+    from .jobs import initJobs
+    initJobs(app)
+    
     # ブループリント登録
     from .routes.garbage_routes import garbage_bp
     from .routes.admin_routes import admin_bp
@@ -78,7 +94,7 @@ def initSampleData():
     sample_categories = [
         {
             'category': '可燃ゴミ',
-            'date': json.dumps(['Tuesday', 'Friday']),
+            'date': ['Tuesday', 'Friday'],
             'method': '指定のゴミ袋に入れて出してください',
             'notion': '生ごみは水気をよく切ってから出してください',
             'special_days': json.dumps([]),
@@ -86,7 +102,7 @@ def initSampleData():
         },
         {
             'category': '不燃ゴミ',
-            'date': json.dumps(['Wednesday']),
+            'date': ['Wednesday'],
             'method': '透明な袋に入れて出してください',
             'notion': '金属類は分別してください',
             'special_days': json.dumps([]),
@@ -100,11 +116,11 @@ def initSampleData():
         # カテゴリを作成
         category = GarbageCategory(
             category=cat_data['category'],
-            date=cat_data['date'],
             method=cat_data['method'],
             notion=cat_data['notion'],
             special_days=cat_data['special_days']
         )
+        category.setDays(cat_data['date'])
         
         db.session.add(category)
         db.session.flush()  # IDを取得するため
@@ -127,13 +143,15 @@ def initDatabase(json_file: str = None):
     Args:
         json_file (str): 初期データとして読み込むJSONファイルのパス
     """
-    from .models import db
+    from .models import CollectionException
     
     print("🔧 データベースを初期化中...")
     
-    # テーブルを作成
-    db.create_all()
-    print("📊 データベーステーブルを作成しました")
+    # テーブルの作成と、既存DBのスキーマ移行（適用済みの移行は実行しない）
+    from .migrations import runMigrations, getSchemaVersion
+    for version, description in runMigrations():
+        print(f"🔁 スキーマ移行 {version}: {description}")
+    print(f"📊 データベーススキーマ: バージョン {getSchemaVersion()}")
     
     if json_file and os.path.exists(json_file):
         print(f"📥 JSONファイル '{json_file}' からデータを読み込み中...")
@@ -149,6 +167,16 @@ def initDatabase(json_file: str = None):
         # JSONファイルが指定されていない場合はサンプルデータを追加
         initSampleData()
     
+    # 休止・振替が未登録の場合は、設定ファイルの一覧を読み込む
+    holidays_file = current_app.config.get('HOLIDAYS_FILE')
+    if holidays_file and os.path.exists(holidays_file) and not CollectionException.query.first():
+        try:
+            from .holidays import HolidayImporter
+            result = HolidayImporter.importFromJson(str(holidays_file))
+            print(f"📅 休止・振替を読み込みました: {result}")
+        except Exception as e:
+            print(f"❌ 休止・振替の読み込み中にエラーが発生しました: {str(e)}")
+    
     print("🎉 データベースの初期化が完了しました！")
 
 
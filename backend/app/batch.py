@@ -0,0 +1,232 @@
+"""
+管理画面からのカテゴリの一括操作（作成・更新・削除）を1つのトランザクションで反映するモジュール
+全操作を指定順にメモリ上で検証してから、削除・更新・作成をそれぞれまとめた文（executemany）で書き込む
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import or_, update
+
+from app.database_manager import DatabaseManager
+from app.models import db, GarbageCategory, GarbageType, CollectionDay, CollectionException, \
+    collectionWeekdays, normalizeDays
+from app.recurrence import dumpRecurrence
+
+# 更新時に1行として書き込むカテゴリのカラム
+CATEGORY_COLUMNS = ('category', 'date', 'method', 'special_days', 'recurrence', 'notion')
+
+
+class BatchConflictError(ValueError):
+    """一括操作の途中でカテゴリ名が重複する場合に送出する例外"""
+
+
+class CategoryBatch:
+    """
+    カテゴリの作成・更新・削除の一覧を、指定順に適用した結果として1つのトランザクションで反映するクラス
+    操作の形式:
+        {"op": "create", "data": {カテゴリ作成APIと同じ形式}}
+        {"op": "update", "id": カテゴリID, "data": {変更するフィールドのみ}}
+        {"op": "delete", "id": カテゴリID}
+    """
+
+    def __init__(self, operations: List[dict]):
+        """
+        操作の一覧の形式を検証する
+        Args:
+            operations (List[dict]): 操作の一覧
+        Raises:
+            ValueError: 操作の形式が不正な場合
+        """
+        self.operations = [self._parseOperation(index, operation) for index, operation in enumerate(operations)]
+        self.deletedIds = set()
+        self.updateRows: List[dict] = []
+        self.daysByCategory: Dict[int, List[str]] = {}
+        self.typesByCategory: Dict[int, List[str]] = {}
+        self.createData: List[dict] = []
+        self.results: List[dict] = []
+
+    @staticmethod
+    def _parseOperation(index: int, operation: dict) -> Tuple[str, str, int, dict]:
+        """
+        1件の操作の形式を検証し、書き込む形式に揃える
+        Args:
+            index (int): 操作の位置（0始まり）
+            operation (dict): 操作
+        Returns:
+            Tuple[str, str, int, dict]: (エラーメッセージ用の表示名, 操作の種類, カテゴリID, データ)
+        Raises:
+            ValueError: 操作の形式が不正な場合
+        """
+        label = f"{index + 1}件目"
+        if not isinstance(operation, dict):
+            raise ValueError(f"{label}: 操作はオブジェクトで指定してください")
+        op = operation.get('op')
+        categoryId = operation.get('id')
+        data = operation.get('data', {})
+        if op not in ('create', 'update', 'delete'):
+            raise ValueError(f"{label}: 不明な操作です: {op}")
+        if op != 'create' and (not isinstance(categoryId, int) or isinstance(categoryId, bool)):
+            raise ValueError(f"{label}: カテゴリID（id）を整数で指定してください")
+        if op == 'delete':
+            return label, op, categoryId, data
+
+        if not isinstance(data, dict):
+            raise ValueError(f"{label}: data はオブジェクトで指定してください")
+        data = dict(data)
+        if op == 'create':
+            for field in ('category', 'date', 'method'):
+                if not data.get(field):
+                    raise ValueError(f"{label}: 必須フィールドが不足しています: {field}")
+        if 'category' in data and not isinstance(data['category'], str):
+            raise ValueError(f"{label}: category は文字列で指定してください")
+        try:
+            if 'date' in data:
+                data['date'] = normalizeDays(data['date'])
+            if 'recurrence' in data or op == 'create':
+                recurrence = dumpRecurrence(data.get('recurrence'))
+                # 作成は insert_category_batch が保存形式に変換するため、ルールの配列のまま渡す
+                if op == 'update':
+                    data['recurrence'] = recurrence
+        except ValueError as e:
+            raise ValueError(f"{label}: {e}")
+        if 'garbage_types' in data:
+            garbageTypes = data['garbage_types']
+            if not isinstance(garbageTypes, list) or not all(isinstance(name, str) for name in garbageTypes):
+                raise ValueError(f"{label}: garbage_types は文字列のリストで指定してください")
+            data['garbage_types'] = [name.strip() for name in garbageTypes if name.strip()]
+        return label, op, categoryId, data
+
+    def apply(self) -> dict:
+        """
+        全操作を検証してから書き込み、コミットする
+        Returns:
+            dict: 操作ごとの結果（作成したカテゴリのIDを含む）と、追加・削除されたゴミ種類名
+        Raises:
+            BatchConflictError: 操作の途中でカテゴリ名が重複する場合（何も反映しない）
+            ValueError: 対象のカテゴリが存在しない場合（何も反映しない）
+        """
+        self._plan()
+        return self._write()
+
+    def _loadStates(self) -> Dict[int, dict]:
+        """
+        対象カテゴリと、使用するカテゴリ名を持つカテゴリを1回のクエリで取得する
+        Returns:
+            Dict[int, dict]: カテゴリID → CATEGORY_COLUMNS の値
+        """
+        names = {data['category'] for _, op, _, data in self.operations if op != 'delete' and 'category' in data}
+        ids = {categoryId for _, op, categoryId, _ in self.operations if op != 'create'}
+        query = db.session.query(GarbageCategory.id, *(getattr(GarbageCategory, column) for column in CATEGORY_COLUMNS)) \
+            .filter(or_(GarbageCategory.category.in_(names), GarbageCategory.id.in_(ids)))
+        return {row[0]: dict(zip(CATEGORY_COLUMNS, row[1:])) for row in query}
+
+    def _plan(self) -> None:
+        """
+        全操作を順に適用した場合の状態をメモリ上で検証し、書き込む内容をまとめる
+        （削除を先に書き込んでも、検証済みの順序でカテゴリ名が重複することはない）
+        Raises:
+            BatchConflictError: 操作の途中でカテゴリ名が重複する場合
+            ValueError: 対象のカテゴリが存在しない場合
+        """
+        states = self._loadStates()
+        owners = {state['category']: categoryId for categoryId, state in states.items()}
+        for label, op, categoryId, data in self.operations:
+            if op == 'create':
+                if data['category'] in owners:
+                    raise BatchConflictError(f"{label}: カテゴリ「{data['category']}」は既に存在します")
+                owners[data['category']] = None
+                self.createData.append(data)
+                self.results.append({'op': op, 'category': data['category']})
+                continue
+
+            if categoryId not in states or categoryId in self.deletedIds:
+                raise ValueError(f"{label}: カテゴリが見つかりません: {categoryId}")
+            state = states[categoryId]
+            if op == 'delete':
+                self.deletedIds.add(categoryId)
+                del owners[state['category']]
+                self.results.append({'op': op, 'id': categoryId, 'category': state['category']})
+                continue
+
+            if 'category' in data and data['category'] != state['category']:
+                if data['category'] in owners:
+                    raise BatchConflictError(f"{label}: カテゴリ名「{data['category']}」は既に使用されています")
+                del owners[state['category']]
+                owners[data['category']] = categoryId
+                state['category'] = data['category']
+            if 'date' in data:
+                state['date'] = json.dumps(data['date'])
+            if 'special_days' in data:
+                state['special_days'] = json.dumps(data['special_days'])
+            for column in ('method', 'recurrence', 'notion'):
+                if column in data:
+                    state[column] = data[column]
+            if 'date' in data or 'recurrence' in data:
+                # 回収曜日と繰り返しルールの曜日（GarbageCategory.setDays と同じ）
+                self.daysByCategory[categoryId] = collectionWeekdays(state['date'], state['recurrence'])
+            if 'garbage_types' in data:
+                self.typesByCategory[categoryId] = data['garbage_types']
+            # 同じカテゴリの更新が続く場合に備え、その時点の全カラムを1行として記録する
+            self.updateRows.append({'id': categoryId, **state, 'updated_at': datetime.utcnow()})
+            self.results.append({'op': op, 'id': categoryId, 'category': state['category']})
+
+    def _write(self) -> dict:
+        """
+        検証済みの削除・更新・作成をまとめた文で書き込み、コミットする（エラー時はロールバックする）
+        Returns:
+            dict: 操作ごとの結果と件数、追加・削除されたゴミ種類名
+        """
+        deletedIds = self.deletedIds
+        try:
+            removedNames = []
+            if deletedIds:
+                removedNames = [name for (name,) in
+                                db.session.query(GarbageType.name).filter(GarbageType.category_id.in_(deletedIds))]
+                for model, column in ((GarbageType, GarbageType.category_id),
+                                      (CollectionDay, CollectionDay.category_id),
+                                      (CollectionException, CollectionException.category_id),
+                                      (GarbageCategory, GarbageCategory.id)):
+                    db.session.query(model).filter(column.in_(deletedIds)).delete(synchronize_session=False)
+
+            # 更新は検証と同じ順序で executemany する（後で削除するカテゴリの更新は省く）
+            updateRows = [row for row in self.updateRows if row['id'] not in deletedIds]
+            if updateRows:
+                db.session.execute(update(GarbageCategory), updateRows)
+            dayIds = [categoryId for categoryId in self.daysByCategory if categoryId not in deletedIds]
+            if dayIds:
+                db.session.query(CollectionDay).filter(CollectionDay.category_id.in_(dayIds)) \
+                    .delete(synchronize_session=False)
+                db.session.bulk_insert_mappings(CollectionDay, [
+                    {'day': day, 'category_id': categoryId}
+                    for categoryId in dayIds for day in self.daysByCategory[categoryId]
+                ])
+            addedNames, removedTypeNames = GarbageType.syncNames({
+                categoryId: names for categoryId, names in self.typesByCategory.items()
+                if categoryId not in deletedIds
+            })
+            removedNames.extend(removedTypeNames)
+
+            if self.createData:
+                createdIds, _ = DatabaseManager.insert_category_batch(self.createData)
+                created = iter(createdIds)
+                for result in self.results:
+                    if result['op'] == 'create':
+                        result['id'] = next(created)
+                for data in self.createData:
+                    addedNames.extend(data.get('garbage_types', []))
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {
+            'results': self.results,
+            'created': len(self.createData),
+            'updated': len({row['id'] for row in updateRows}),
+            'deleted': len(deletedIds),
+            'added_garbage_types': addedNames,
+            'removed_garbage_types': removedNames
+        }
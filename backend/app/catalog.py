@@ -0,0 +1,314 @@
+"""
+カタログ（全カテゴリ・全ゴミ種類）のメモリ内スナップショットを管理するモジュール
+読み取り系APIはスナップショットから応答し、SQLiteへのアクセスを書き込み時のみに限定する
+"""
+
+import heapq
+import secrets
+import threading
+from collections import Counter
+from datetime import date
+from types import MappingProxyType
+from typing import Iterable, List, Optional, Tuple
+
+from flask import Flask, current_app
+from app.models import db, GarbageCategory, CollectionDay, CollectionException
+from app.schedule import CategorySchedule, CollectionCalendar, NextCollectionIndex
+from app.search import normalizeText, NgramIndex, BKTree, allowedDistance, PrefixIndex
+
+# 検索結果の一致の種類（値が小さいほど上位）
+MATCH_EXACT, MATCH_PREFIX, MATCH_SUBSTRING, MATCH_FUZZY = range(4)
+MATCH_NAMES = ('exact', 'prefix', 'substring', 'fuzzy')
+
+
+class CatalogSnapshot:
+    """
+    カタログの不変スナップショットを保持するクラス
+    曜日別のバケット、ID引きの辞書、ゴミ種類名の検索索引、回収カレンダーを構築済みの状態で持つ
+    保持する辞書はレスポンスで共有されるため、呼び出し側で変更してはならない
+    """
+    __slots__ = ('version', 'categories', 'categoryById', 'categoryIdsByDay', 'typeEntries',
+                 'typeEntryById', 'searchKeys', 'nameIndex', 'fuzzyIndex', 'fuzzyLock', 'prefixIndex',
+                 'schedules', 'calendar')
+
+    def __init__(self, version: str, categories: List[dict], dayRows: List[Tuple[str, int]],
+                 exceptionRows: Iterable[tuple] = (), prefixIndex: Optional[PrefixIndex] = None):
+        """
+        シリアライズ済みのカテゴリと曜日の対応からスナップショットを構築する
+        Args:
+            version (str): カタログのバージョン（ETagの生成に使用する）
+            categories (List[dict]): ID順に並んだ GarbageCategory.to_dict() の結果
+            dayRows (List[Tuple[str, int]]): (曜日名, カテゴリID) のリスト
+            exceptionRows (Iterable[tuple]): (日付, カテゴリID, 種類, 振替先) の休止・振替のリスト
+            prefixIndex (PrefixIndex): 差分更新済みの入力補完索引（省略時は全件から構築する）
+        """
+        self.version = version
+        self.categories = tuple(categories)
+        self.categoryById = MappingProxyType({c['id']: c for c in self.categories})
+
+        idsByDay = {}
+        for day, categoryId in dayRows:
+            idsByDay.setdefault(day, []).append(categoryId)
+        self.categoryIdsByDay = MappingProxyType({
+            day: tuple(sorted(ids)) for day, ids in idsByDay.items()
+        })
+
+        # 日付指定の問い合わせ用に、カテゴリごとの回収ルールをコンパイルしておく
+        self.schedules = tuple(CategorySchedule.fromCategory(c) for c in self.categories)
+        # 休止・振替を反映した年単位の回収カレンダー
+        self.calendar = CollectionCalendar(self.schedules, exceptionRows)
+
+        # ゴミ種類は (ゴミ種類, 所属カテゴリ) の組で保持する
+        typeEntries = [(garbageType, category)
+                       for category in self.categories for garbageType in category['garbage_types']]
+        typeEntries.sort(key=lambda entry: entry[0]['id'])
+        self.typeEntries = tuple(typeEntries)
+        self.typeEntryById = MappingProxyType({entry[0]['id']: entry for entry in self.typeEntries})
+
+        # 検索キーは正規化済みの名前（全角半角・カタカナひらがな・大文字小文字を区別しない）
+        self.searchKeys = tuple((garbageType['id'], normalizeText(garbageType['name']))
+                                for garbageType, _ in self.typeEntries)
+        # 部分一致検索用のn-gram索引
+        self.nameIndex = NgramIndex(self.searchKeys)
+        # あいまい検索用のBK木は構築に時間がかかるため、書き込みのたびには作らず初回のあいまい検索時に作る
+        self.fuzzyIndex: Optional[BKTree] = None
+        self.fuzzyLock = threading.Lock()
+        # 入力補完用の整列済み索引
+        # 差分更新した索引が読み込んだゴミ種類名と一致しない場合（別プロセスからの書き込みなど）は全件から構築する
+        names = [garbageType['name'] for garbageType, _ in self.typeEntries]
+        if prefixIndex is None or prefixIndex.counts != Counter(names):
+            prefixIndex = PrefixIndex(names)
+        self.prefixIndex = prefixIndex
+
+    @classmethod
+    def fromDatabase(cls, version: str, prefixIndex: Optional[PrefixIndex] = None) -> 'CatalogSnapshot':
+        """
+        データベースの現在の内容からスナップショットを構築する
+        Args:
+            version (str): カタログのバージョン
+            prefixIndex (PrefixIndex): 差分更新済みの入力補完索引（省略時は全件から構築する）
+        Returns:
+            CatalogSnapshot: 構築されたスナップショット
+        """
+        categories = GarbageCategory.queryWithTypes().order_by(GarbageCategory.id).all()
+        dayRows = db.session.query(CollectionDay.day, CollectionDay.category_id).all()
+        exceptionRows = db.session.query(CollectionException.date, CollectionException.category_id,
+                                         CollectionException.action, CollectionException.moved_to).all()
+        return cls(version, [category.to_dict() for category in categories], dayRows, exceptionRows, prefixIndex)
+
+    def getCategoriesByDay(self, day: str) -> List[dict]:
+        """
+        指定曜日に回収されるカテゴリを返す
+        Args:
+            day (str): 曜日名（例: Monday）
+        Returns:
+            List[dict]: カテゴリ情報のリスト（ID順）
+        """
+        return [self.categoryById[categoryId] for categoryId in self.categoryIdsByDay.get(day, ())]
+
+    def getCategoriesOn(self, day: date) -> List[dict]:
+        """
+        指定日に回収されるカテゴリを、祝日・年末年始の休止・振替を反映して返す
+        Args:
+            day (date): 日付
+        Returns:
+            List[dict]: カテゴリ情報のリスト（ID順）
+        """
+        return [self.categoryById[categoryId] for categoryId in self.calendar.categoryIdsOn(day)]
+
+    def searchTypes(self, query: str, limit: int, offset: int = 0) -> Tuple[List[Tuple[str, dict]], int]:
+        """
+        ゴミ種類名を検索し、一致の種類で順位付けした上位の結果を返す
+        正規化したクエリでn-gram索引の部分一致検索を行い、一致がなければBK木であいまい検索を行う
+        順位は 完全一致 → 前方一致 → 部分一致 → あいまい一致（編集距離順）で、
+        同順位内は名前の短い順・ゴミ種類ID順とする
+        Args:
+            query (str): 検索文字列
+            limit (int): 返す件数の上限
+            offset (int): 先頭から読み飛ばす件数
+        Returns:
+            Tuple[List[Tuple[str, dict]], int]: ((一致の種類, ゴミ種類) のリスト, 全ヒット件数)
+        """
+        normalizedQuery = normalizeText(query)
+        typeIds = self.nameIndex.search(normalizedQuery)
+        if typeIds:
+            keys = self.nameIndex.keys
+            rankedIds = ((self._matchRank(keys[typeId], normalizedQuery), len(keys[typeId]), typeId)
+                         for typeId in typeIds)
+        else:
+            maxDistance = allowedDistance(normalizedQuery)
+            fuzzyHits = self.getFuzzyIndex().search(normalizedQuery, maxDistance) if maxDistance else []
+            typeIds = fuzzyHits
+            rankedIds = ((MATCH_FUZZY + distance, 0, typeId) for distance, typeId in fuzzyHits)
+
+        # 全件をソートせず、必要な offset + limit 件だけをヒープで選択する
+        topIds = heapq.nsmallest(offset + limit, rankedIds)[offset:]
+        hits = [(MATCH_NAMES[min(rank, MATCH_FUZZY)], self.typeEntryById[typeId][0])
+                for rank, _, typeId in topIds]
+        return hits, len(typeIds)
+
+    def getFuzzyIndex(self) -> BKTree:
+        """
+        あいまい検索用のBK木を返す（未構築の場合は構築する）
+        カタログ全体のロックではなくスナップショットごとのロックで構築し、書き込みや他の読み取りを待たせない
+        Returns:
+            BKTree: ゴミ種類名のBK木
+        """
+        fuzzyIndex = self.fuzzyIndex
+        if fuzzyIndex is None:
+            with self.fuzzyLock:
+                if self.fuzzyIndex is None:
+                    self.fuzzyIndex = BKTree(self.searchKeys)
+                fuzzyIndex = self.fuzzyIndex
+        return fuzzyIndex
+
+    @staticmethod
+    def _matchRank(key: str, normalizedQuery: str) -> int:
+        """
+        部分一致したキーの一致の種類を順位の数値で返す
+        Args:
+            key (str): 正規化済みのゴミ種類名
+            normalizedQuery (str): 正規化済みのクエリ
+        Returns:
+            int: MATCH_EXACT / MATCH_PREFIX / MATCH_SUBSTRING のいずれか
+        """
+        if key == normalizedQuery:
+            return MATCH_EXACT
+        if key.startswith(normalizedQuery):
+            return MATCH_PREFIX
+        return MATCH_SUBSTRING
+
+
+class CatalogStore:
+    """
+    アプリケーションごとに現在のスナップショットを保持するクラス
+    読み取りはロックなしで参照を取得し、再構築はロック内で行って参照を差し替える
+    再構築のたびにカタログのバージョン（単調増加する通番）を進める
+    """
+
+    def __init__(self):
+        """
+        空のストアを作成する（スナップショットは初回参照時に構築する）
+        """
+        self.lock = threading.Lock()
+        self.snapshot: Optional[CatalogSnapshot] = None
+        # 再起動前のバージョンと衝突しないよう、起動ごとの識別子をバージョンに含める
+        self.bootId = secrets.token_hex(4)
+        self.counter = 0
+        self.nextIndex: Optional[NextCollectionIndex] = None
+        # 現在のスナップショットが直前の書き込みまでを反映しているか（再構築に失敗した場合は False）
+        self.upToDate = True
+
+    def _nextVersion(self) -> str:
+        """
+        次のカタログバージョンを発行する（ロック内で呼び出すこと）
+        Returns:
+            str: 「起動ID.通番」形式のバージョン
+        """
+        self.counter += 1
+        return f'{self.bootId}.{self.counter}'
+
+    def get(self) -> CatalogSnapshot:
+        """
+        現在のスナップショットを返す。未構築の場合は構築する
+        Returns:
+            CatalogSnapshot: 現在のスナップショット
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            with self.lock:
+                if self.snapshot is None:
+                    self.snapshot = CatalogSnapshot.fromDatabase(self._nextVersion())
+                snapshot = self.snapshot
+        return snapshot
+
+    def rebuild(self, typeChanges: Optional[Tuple[Iterable[str], Iterable[str]]] = None) -> CatalogSnapshot:
+        """
+        データベースからスナップショットを再構築して差し替える
+        構築と差し替えをロック内で行い、並行する書き込みで古い内容に戻らないようにする
+        前回の再構築に失敗している場合は、古いスナップショットの索引を使わずに全件から構築する
+        Args:
+            typeChanges (Tuple): (追加されたゴミ種類名, 削除されたゴミ種類名)
+                                 指定時は入力補完索引を前回の索引から差分更新する
+        Returns:
+            CatalogSnapshot: 新しいスナップショット
+        """
+        with self.lock:
+            prefixIndex = None
+            if typeChanges is not None and self.snapshot is not None and self.upToDate:
+                addedNames, removedNames = typeChanges
+                prefixIndex = self.snapshot.prefixIndex.patched(addedNames, removedNames)
+            self.upToDate = False
+            self.snapshot = CatalogSnapshot.fromDatabase(self._nextVersion(), prefixIndex)
+            self.upToDate = True
+            return self.snapshot
+
+
+def initCatalog(app: Flask) -> None:
+    """
+    アプリケーションにカタログストアを登録する
+    Args:
+        app (Flask): 対象のFlaskアプリケーション
+    """
+    app.extensions['catalog'] = CatalogStore()
+
+
+def getSnapshot() -> CatalogSnapshot:
+    """
+    現在のアプリケーションのスナップショットを取得する
+    Returns:
+        CatalogSnapshot: 現在のスナップショット
+    """
+    return current_app.extensions['catalog'].get()
+
+
+def getNextCollectionIndex(snapshot: CatalogSnapshot) -> NextCollectionIndex:
+    """
+    スナップショットに対応する今日基準の次回回収日索引を取得する
+    日付が変わった後（深夜0時以降）の最初の呼び出しと、管理画面からの書き込み後に作り直す
+    Args:
+        snapshot (CatalogSnapshot): 索引の計算に使用するスナップショット
+    Returns:
+        NextCollectionIndex: 次回回収日索引
+    """
+    store = current_app.extensions['catalog']
+    today = date.today()
+    index = store.nextIndex
+    if index is None or index.baseDate != today or index.version != snapshot.version:
+        index = NextCollectionIndex(snapshot.calendar, today,
+                                    current_app.config['NEXT_COLLECTION_HORIZON_DAYS'], snapshot.version)
+        store.nextIndex = index
+    return index
+
+
+def withNextCollection(category: dict, index: NextCollectionIndex) -> dict:
+    """
+    カテゴリ情報に次の回収日（next_collection）を付加した辞書を返す
+    スナップショットの辞書は共有されているため、コピーに付加する
+    Args:
+        category (dict): カテゴリ情報
+        index (NextCollectionIndex): 次回回収日索引
+    Returns:
+        dict: next_collection（YYYY-MM-DD、期間内にない場合は None）を付加したカテゴリ情報
+    """
+    nextDate = index.nextCollection(category['id'])
+    return {**category, 'next_collection': nextDate.isoformat() if nextDate else None}
+
+
+def refreshCatalog(addedTypeNames: Optional[Iterable[str]] = None,
+                   removedTypeNames: Optional[Iterable[str]] = None) -> CatalogSnapshot:
+    """
+    カタログの書き込みをコミットした後に呼び出し、スナップショットを再構築する
+    ゴミ種類名の増減が分かっている場合は渡すと、入力補完索引を差分更新する
+    （いずれも省略した場合はインポート等とみなして全件から構築する）
+    別プロセス（manage_db.py など）からの書き込みはサーバー再起動まで反映されない
+    Args:
+        addedTypeNames (Iterable[str]): 追加されたゴミ種類名
+        removedTypeNames (Iterable[str]): 削除されたゴミ種類名
+    Returns:
+        CatalogSnapshot: 新しいスナップショット
+    """
+    typeChanges = None
+    if addedTypeNames is not None or removedTypeNames is not None:
+        typeChanges = (addedTypeNames or (), removedTypeNames or ())
+    return current_app.extensions['catalog'].rebuild(typeChanges)
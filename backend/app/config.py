@@ -19,10 +19,72 @@ class Config:
     BASE_DIR = Path(__file__).parent.parent.parent
     DATABASE_PATH = BASE_DIR / 'garbage_assistant.db'
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{DATABASE_PATH}'
+    # 接続プール（SQLite のファイルDBでは接続をスレッド間で使い回すため、同一スレッドの制約を外す）
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 5,
+        'max_overflow': 5,
+        'pool_timeout': 10,
+        'connect_args': {'check_same_thread': False, 'timeout': 5},
+    }
+    # 接続ごとに適用する SQLite の PRAGMA（app/sqlite_tuning.py）
+    # WAL では書き込み中も読み取りがブロックされず、synchronous=NORMAL でもDBが壊れることはない
+    # cache_size は負の値でKiB単位、busy_timeout はミリ秒
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -8000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    }
 
     #ポート
     PORT_NUMBER = 5100  # デフォルトは5100番ポート
 
+    # 本番サーバー（waitress）の設定（main.py）
+    # カタログ・キャッシュはプロセス内に保持するため1プロセスで動かし、同時処理数はスレッド数で調整する
+    # スレッド数とインポートジョブのスレッドの合計が、接続プール（pool_size + max_overflow）を超えないようにする
+    SERVER_THREADS = 8
+    # 同時に受け付ける接続数の上限
+    SERVER_CONNECTION_LIMIT = 100
+    # 無通信の接続を切断するまでの秒数（大きなエクスポート・インポートを考慮して長めにする）
+    SERVER_CHANNEL_TIMEOUT = 120
+
+    # カタログ系APIのCache-Control（ETagで毎回再検証させ、変更がなければ 304 を返す）
+    CATALOG_CACHE_CONTROL = 'no-cache'
+    # エンコード済みレスポンスのキャッシュに使うメモリの上限（バイト、圧縮版を含む）
+    RESPONSE_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+    # 回収日展開APIで指定できる期間の上限（日数）
+    SCHEDULE_MAX_DAYS = 366
+    # 次回回収日（next_collection）を事前計算する日数
+    NEXT_COLLECTION_HORIZON_DAYS = 400
+    # iCalendarフィード（/api/calendar.ics）に出力する日数（days 未指定時、上限は SCHEDULE_MAX_DAYS）
+    ICAL_HORIZON_DAYS = 180
+    # 祝日・年末年始の休止・振替を一括で読み込むファイル
+    HOLIDAYS_FILE = Path(__file__).parent.parent / 'data' / 'holidays.json'
+
+    # 検索結果の件数（limit 未指定時の件数と、指定可能な上限）
+    SEARCH_DEFAULT_LIMIT = 20
+    SEARCH_MAX_LIMIT = 100
+    # 一括検索で1リクエストに指定できる検索語の上限
+    SEARCH_BATCH_MAX_QUERIES = 500
+    # 入力補完の候補数（limit 未指定時の件数と、指定可能な上限）
+    SUGGEST_DEFAULT_LIMIT = 10
+    SUGGEST_MAX_LIMIT = 50
+
+    # 管理APIの一括操作（/api/admin/batch）で1リクエストに指定できる操作数の上限
+    ADMIN_BATCH_MAX_OPERATIONS = 1000
+
+    # バックグラウンドのインポートジョブを実行するスレッド数（SQLite の書き込みは同時に1つのため1とする）
+    IMPORT_JOB_WORKERS = 1
+    # 実行中・実行待ちのインポートジョブ数の上限（超えた場合は 503 を返す）
+    IMPORT_JOB_MAX_PENDING = 4
+    # 状態を問い合わせられるよう保持する完了済みジョブ数
+    IMPORT_JOB_HISTORY = 20
+    # バックグラウンドのNDJSONインポートで、受信データをメモリに保持する上限（超えた分は一時ファイルに書き出す）
+    IMPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
     # CORS 設定（フロントエンドからのアクセス許可）
     ALLOWED_ORIGINS = [
         "http://localhost:5173",
@@ -55,6 +117,18 @@ class ProductionConfig(Config):
     """
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 10,
+        'pool_timeout': 10,
+        'connect_args': {'check_same_thread': False, 'timeout': 5},
+    }
+    SQLITE_PRAGMAS = {
+        **Config.SQLITE_PRAGMAS,
+        'cache_size': -32000,
+        'mmap_size': 256 * 1024 * 1024,
+    }
 
 
 class TermuxConfig(Config):
@@ -64,6 +138,24 @@ class TermuxConfig(Config):
     """
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    # スマートフォンのメモリを圧迫しないよう、キャッシュは小さめにする
+    RESPONSE_CACHE_MAX_BYTES = 1 * 1024 * 1024
+    IMPORT_SPOOL_MAX_BYTES = 2 * 1024 * 1024
+    SERVER_THREADS = 4
+    SERVER_CONNECTION_LIMIT = 50
+    # 接続数・ページキャッシュ・メモリマップを小さくし、フラッシュへの書き込み待ちは長めに許容する
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 3,
+        'max_overflow': 2,
+        'pool_timeout': 15,
+        'connect_args': {'check_same_thread': False, 'timeout': 10},
+    }
+    SQLITE_PRAGMAS = {
+        **Config.SQLITE_PRAGMAS,
+        'cache_size': -2000,
+        'mmap_size': 16 * 1024 * 1024,
+        'busy_timeout': 10000,
+    }
     
     # Termux環境では$HOME配下にDBファイルを配置
     TERMUX_HOME = os.environ.get('HOME', '/data/data/com.termux/files/home')
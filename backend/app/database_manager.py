@@ -1,71 +1,25 @@
 """
 データベースとJSONファイル間の変換機能を提供するモジュール
-データのエクスポート・インポート機能を管理
+データのインポート機能を管理（エクスポートは app.export、休止・振替の読み込みは app.holidays）
 """
 
 import json
 import os
+import time
 from datetime import datetime
-from app.models import db, GarbageCategory, GarbageType
+from flask import current_app
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple
+from app.holidays import HolidayImporter
+from app.models import db, GarbageCategory, GarbageType, CollectionDay, CollectionException, \
+    collectionWeekdays, normalizeDays
+from app.recurrence import dumpRecurrence
+
 
 class DatabaseManager:
     """データベース管理クラス"""
     
-    @staticmethod
-    def export_to_json(filepath: str = None) -> dict:
-        """
-        データベースの内容をJSONファイルにエクスポート
-        Args:
-            filepath (str): 出力先ファイルパス（省略時は data/backup.json）
-        Returns:
-            dict: エクスポートされたデータ
-        """
-        if filepath is None:
-            os.makedirs('data', exist_ok=True)
-            filepath = f'data/backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
-        
-        # データベースからデータを取得
-        categories = GarbageCategory.query.all()
-        
-        export_data = {
-            'metadata': {
-                'export_date': datetime.now().isoformat(),
-                'version': '1.0',
-                'total_categories': len(categories),
-                'total_garbage_types': GarbageType.query.count()
-            },
-            'categories': []
-        }
-        
-        for category in categories:
-            # dateフィールドの処理（複数曜日対応）
-            date_list = []
-            if category.date:
-                try:
-                    date_list = json.loads(category.date)
-                    # 後方互換性のため、文字列の場合は配列に変換
-                    if isinstance(date_list, str):
-                        date_list = [date_list]
-                except json.JSONDecodeError:
-                    # JSONでない場合は単一の文字列として扱う
-                    date_list = [category.date]
-            
-            category_data = {
-                'category': category.category,
-                'date': date_list,
-                'method': category.method,
-                'special_days': json.loads(category.special_days) if category.special_days else [],
-                'notion': category.notion,
-                'garbage_types': [gt.name for gt in category.garbage_types]
-            }
-            export_data['categories'].append(category_data)
-        
-        # ファイルに保存
-        os.makedirs(os.path.dirname(filepath) if os.path.dirname(filepath) else '.', exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2)
-        
-        return export_data
+    # 一括インポートで1回の executemany にまとめるカテゴリ数
+    IMPORT_BATCH_SIZE = 500
     
     @staticmethod
     def import_from_json(filepath: str, clear_existing: bool = False) -> dict:
@@ -83,66 +37,185 @@ class DatabaseManager:
         with open(filepath, 'r', encoding='utf-8') as f:
             import_data = json.load(f)
         
-        if clear_existing:
-            db.session.query(GarbageType).delete()
-            db.session.query(GarbageCategory).delete()
-            db.session.commit()
-        
+        return DatabaseManager.import_data(import_data, clear_existing)
+    
+    @staticmethod
+    def import_data(import_data: dict, clear_existing: bool = False,
+                    progress: Optional[Callable[[int, int, int], None]] = None) -> dict:
+        """
+        メモリ上のエクスポート形式のデータをデータベースにインポート
+        Args:
+            import_data (dict): エクスポート形式のデータ（categories を含む）
+            clear_existing (bool): 既存データを削除するか
+            progress (Callable): 進捗の通知先（_bulk_import を参照）
+        Returns:
+            dict: インポート結果の統計情報
+        """
+        if not isinstance(import_data, dict):
+            raise ValueError('インポートするデータはオブジェクトで指定してください')
+        return DatabaseManager._bulk_import(import_data.get('categories', []), clear_existing, progress)
+    
+    @staticmethod
+    def import_ndjson_stream(stream: BinaryIO, clear_existing: bool = False,
+                             progress: Optional[Callable[[int, int, int], None]] = None) -> dict:
+        """
+        NDJSON（1行に1カテゴリのJSON）のストリームを読みながらデータベースにインポート
+        1行ずつ解析して一括インポートに渡すため、データ全体をメモリに展開しない
+        metadata だけを持つ行と空行は読み飛ばす
+        Args:
+            stream (BinaryIO): UTF-8 の NDJSON を読み出すストリーム（リクエストボディなど）
+            clear_existing (bool): 既存データを削除するか
+            progress (Callable): 進捗の通知先（_bulk_import を参照）
+        Returns:
+            dict: インポート結果の統計情報
+        Raises:
+            ValueError: JSONとして解析できない行、またはカテゴリでない行がある場合（何もインポートしない）
+        """
+        return DatabaseManager._bulk_import(DatabaseManager._iter_ndjson_categories(stream), clear_existing, progress)
+    
+    @staticmethod
+    def _iter_ndjson_categories(stream: BinaryIO) -> Iterator[dict]:
+        """
+        NDJSON のストリームからカテゴリデータを1件ずつ取り出す
+        Args:
+            stream (BinaryIO): UTF-8 の NDJSON を読み出すストリーム
+        Yields:
+            dict: エクスポート形式のカテゴリデータ
+        """
+        for line_number, line in enumerate(iter(stream.readline, b''), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError(f"{line_number}行目: JSONとして解析できません")
+            if isinstance(record, dict) and 'category' in record:
+                yield record
+            elif not (isinstance(record, dict) and 'metadata' in record):
+                raise ValueError(f"{line_number}行目: カテゴリのデータではありません")
+    
+    @staticmethod
+    def _bulk_import(categories: Iterable[dict], clear_existing: bool,
+                     progress: Optional[Callable[[int, int, int], None]] = None) -> dict:
+        """
+        カテゴリとゴミ種類を1つのトランザクションで一括インポート
+        既存のカテゴリ名は1回のクエリで取得し、カテゴリ・回収曜日・ゴミ種類は
+        IMPORT_BATCH_SIZE 件のカテゴリごとに bulk_insert_mappings（executemany）で追加する
+        途中でエラーが発生した場合はロールバックし、何もインポートしない
+        コミットするまで他の接続からは変更前のデータが見える
+        既存データを削除した場合は、カテゴリ個別の休止・振替だけを HOLIDAYS_FILE から同じトランザクションで読み込み直す
+        （全カテゴリ共通の休止・振替は削除しない。形式の不正な行は読み飛ばす）
+        Args:
+            categories (Iterable[dict]): エクスポート形式のカテゴリデータ
+            clear_existing (bool): 既存データを削除するか
+            progress (Callable): まとまりを追加するたびに
+                                 (インポートしたカテゴリ数, ゴミ種類数, 読み飛ばしたカテゴリ数) で呼び出す関数
+        Returns:
+            dict: インポート結果の統計情報（処理時間と1秒あたりの行数を含む）
+        """
+        started = time.perf_counter()
         imported_categories = 0
         imported_garbage_types = 0
         skipped_categories = 0
         
-        for category_data in import_data.get('categories', []):
-            # 既存カテゴリをチェック
-            existing_category = GarbageCategory.query.filter_by(
-                category=category_data['category']
-            ).first()
-            
-            if existing_category and not clear_existing:
-                skipped_categories += 1
-                continue
-            
-            # カテゴリを作成
-            # dateフィールドの処理（複数曜日対応）
-            date_value = category_data['date']
-            if isinstance(date_value, list):
-                # 配列の場合はJSON文字列として保存
-                date_json = json.dumps(date_value)
+        try:
+            if clear_existing:
+                db.session.query(GarbageType).delete()
+                db.session.query(CollectionDay).delete()
+                # カテゴリIDは再利用されるため、カテゴリ個別の休止・振替も削除する
+                db.session.query(CollectionException).filter(CollectionException.category_id.isnot(None)).delete()
+                db.session.query(GarbageCategory).delete()
+                known_names = set()
             else:
-                # 文字列の場合は配列に変換してからJSON文字列として保存
-                date_json = json.dumps([date_value])
+                # 既存のカテゴリ名を1回のクエリで取得
+                known_names = {name for (name,) in db.session.query(GarbageCategory.category)}
             
-            category = GarbageCategory(
-                category=category_data['category'],
-                date=date_json,
-                method=category_data['method'],
-                special_days=json.dumps(category_data.get('special_days', [])),
-                notion=category_data.get('notion', '')
-            )
+            batch = []
+            for category_data in categories:
+                # 既存カテゴリ・ファイル内で重複するカテゴリは読み飛ばす
+                if category_data['category'] in known_names:
+                    skipped_categories += 1
+                    continue
+                known_names.add(category_data['category'])
+                batch.append(category_data)
+                if len(batch) >= DatabaseManager.IMPORT_BATCH_SIZE:
+                    imported_garbage_types += DatabaseManager.insert_category_batch(batch)[1]
+                    imported_categories += len(batch)
+                    batch = []
+                    if progress:
+                        progress(imported_categories, imported_garbage_types, skipped_categories)
+            if batch:
+                imported_garbage_types += DatabaseManager.insert_category_batch(batch)[1]
+                imported_categories += len(batch)
             
-            db.session.add(category)
-            db.session.flush()  # IDを取得するため
-            imported_categories += 1
+            if clear_existing:
+                # 削除したカテゴリ個別の休止・振替を、新しいカテゴリIDで読み込み直す
+                # （全カテゴリ共通の休止・振替は残す。ファイルを読めない場合もカテゴリのインポートは続ける）
+                holidays_file = current_app.config.get('HOLIDAYS_FILE')
+                if holidays_file and os.path.exists(holidays_file):
+                    try:
+                        HolidayImporter.reloadCategoryExceptions(str(holidays_file))
+                    except (OSError, ValueError) as e:
+                        print(f"⚠️ カテゴリ個別の休止・振替を読み込み直せませんでした: {e}")
             
-            # ゴミ種類を追加
-            for garbage_name in category_data.get('garbage_types', []):
-                garbage_type = GarbageType(
-                    name=garbage_name,
-                    category_id=category.id
-                )
-                db.session.add(garbage_type)
-                imported_garbage_types += 1
-        
-        db.session.commit()
+            db.session.commit()
+            if progress:
+                progress(imported_categories, imported_garbage_types, skipped_categories)
+        except Exception:
+            db.session.rollback()
+            raise
         
+        elapsed = time.perf_counter() - started
+        imported_rows = imported_categories + imported_garbage_types
         return {
             'imported_categories': imported_categories,
             'imported_garbage_types': imported_garbage_types,
             'skipped_categories': skipped_categories,
             'total_categories': GarbageCategory.query.count(),
-            'total_garbage_types': GarbageType.query.count()
+            'total_garbage_types': GarbageType.query.count(),
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(imported_rows / elapsed) if elapsed > 0 else imported_rows
         }
     
+    @staticmethod
+    def insert_category_batch(batch: List[dict]) -> Tuple[List[int], int]:
+        """
+        カテゴリのまとまりを、カテゴリ・回収曜日・ゴミ種類の順に executemany で追加（コミットしない）
+        Args:
+            batch (List[dict]): エクスポート形式のカテゴリデータ
+        Returns:
+            Tuple[List[int], int]: (採番されたカテゴリID（batch と同じ順）, 追加したゴミ種類の数)
+        """
+        category_rows = []
+        for category_data in batch:
+            # dateフィールドの処理（複数曜日対応、GarbageCategory.setDays と同じ検証・形式）
+            date_list = normalizeDays(category_data['date'])
+            category_rows.append({
+                'category': category_data['category'],
+                'date': json.dumps(date_list),
+                'method': category_data['method'],
+                'special_days': json.dumps(category_data.get('special_days', [])),
+                'recurrence': dumpRecurrence(category_data.get('recurrence')),
+                'notion': category_data.get('notion', '')
+            })
+        # return_defaults で採番されたIDを各行に受け取る
+        db.session.bulk_insert_mappings(GarbageCategory, category_rows, return_defaults=True)
+        
+        day_rows = []
+        type_rows = []
+        for category_data, category_row in zip(batch, category_rows):
+            category_id = category_row['id']
+            # 回収曜日と繰り返しルールの曜日（GarbageCategory.setDays と同じ）
+            day_rows.extend({'day': day, 'category_id': category_id}
+                            for day in collectionWeekdays(category_row['date'], category_row['recurrence']))
+            type_rows.extend({'name': garbage_name, 'category_id': category_id}
+                             for garbage_name in category_data.get('garbage_types', []))
+        if day_rows:
+            db.session.bulk_insert_mappings(CollectionDay, day_rows)
+        if type_rows:
+            db.session.bulk_insert_mappings(GarbageType, type_rows)
+        return [category_row['id'] for category_row in category_rows], len(type_rows)
+    
     @staticmethod
     def get_default_data() -> dict:
         """
@@ -0,0 +1,128 @@
+"""
+データベースの内容をエクスポート形式のJSONとして出力するモジュール
+カテゴリを少しずつ読み込みながら出力し、全データをメモリに保持しない
+"""
+
+import json
+import os
+import textwrap
+from datetime import datetime
+from typing import Iterator
+
+from app.models import GarbageCategory, GarbageType, parseDateField
+
+
+class CatalogExporter:
+    """データベースの内容をJSONとして出力するクラス"""
+
+    # ストリーミングエクスポートで1回に読み込むカテゴリ数
+    EXPORT_BATCH_SIZE = 100
+
+    @staticmethod
+    def defaultExportPath() -> str:
+        """
+        エクスポート先の既定のファイルパスを返す
+        Returns:
+            str: data/backup_YYYYmmdd_HHMMSS.json
+        """
+        os.makedirs('data', exist_ok=True)
+        return f'data/backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+
+    @staticmethod
+    def exportMetadata() -> dict:
+        """
+        エクスポートのメタデータ（件数はCOUNTクエリで取得する）を作成
+        Returns:
+            dict: メタデータ
+        """
+        return {
+            'export_date': datetime.now().isoformat(),
+            'version': '1.0',
+            'total_categories': GarbageCategory.query.count(),
+            'total_garbage_types': GarbageType.query.count()
+        }
+
+    @staticmethod
+    def iterExportJson(metadata: dict = None) -> Iterator[str]:
+        """
+        データベースの内容をエクスポート形式のJSON（indent=2）として順に生成
+        カテゴリは yield_per で EXPORT_BATCH_SIZE 件ずつ読み込み、1カテゴリずつ出力するため、
+        カタログの大きさに関わらず使用メモリは一定となる
+        出力は json.dump(exportData, indent=2, ensure_ascii=False) と同じ内容になる
+        Args:
+            metadata (dict): 出力するメタデータ（省略時は exportMetadata() で作成）
+        Yields:
+            str: JSONの断片
+        """
+        if metadata is None:
+            metadata = CatalogExporter.exportMetadata()
+        yield '{\n  "metadata": ' + textwrap.indent(json.dumps(metadata, ensure_ascii=False, indent=2), '  ')[2:]
+        yield ',\n  "categories": ['
+
+        categories = (GarbageCategory.queryWithTypes().order_by(GarbageCategory.id)
+                      .yield_per(CatalogExporter.EXPORT_BATCH_SIZE))
+        separator = '\n'
+        for category in categories:
+            categoryData = {
+                'category': category.category,
+                # dateフィールドの処理（複数曜日対応）
+                'date': parseDateField(category.date),
+                'method': category.method,
+                'special_days': json.loads(category.special_days) if category.special_days else [],
+                'recurrence': json.loads(category.recurrence) if category.recurrence else [],
+                'notion': category.notion,
+                'garbage_types': [garbageType.name for garbageType in category.garbage_types]
+            }
+            yield separator + textwrap.indent(json.dumps(categoryData, ensure_ascii=False, indent=2), '    ')
+            separator = ',\n'
+
+        # カテゴリがない場合は json.dump と同じく [] とする
+        yield ('\n  ]' if separator != '\n' else ']') + '\n}'
+
+    @staticmethod
+    def streamExport(filepath: str = None, metadata: dict = None) -> Iterator[str]:
+        """
+        エクスポート形式のJSONを順に生成しながら、同じ内容をファイルにも書き込む
+        書き込みは一時ファイルに行い、最後まで生成できた場合のみ出力先へ置き換える
+        Args:
+            filepath (str): 出力先ファイルパス（省略時は data/backup_YYYYmmdd_HHMMSS.json）
+            metadata (dict): 出力するメタデータ（省略時は exportMetadata() で作成）
+        Yields:
+            str: JSONの断片
+        """
+        if filepath is None:
+            filepath = CatalogExporter.defaultExportPath()
+        os.makedirs(os.path.dirname(filepath) if os.path.dirname(filepath) else '.', exist_ok=True)
+
+        tempPath = filepath + '.part'
+        try:
+            with open(tempPath, 'w', encoding='utf-8') as f:
+                for chunk in CatalogExporter.iterExportJson(metadata):
+                    f.write(chunk)
+                    yield chunk
+            os.replace(tempPath, filepath)
+        finally:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+
+    @staticmethod
+    def exportToJson(filepath: str = None) -> dict:
+        """
+        データベースの内容をJSONファイルにエクスポート
+        カテゴリを1件ずつファイルへ書き込み、全データをメモリに保持しない
+        Args:
+            filepath (str): 出力先ファイルパス（省略時は data/backup_YYYYmmdd_HHMMSS.json）
+        Returns:
+            dict: エクスポートのメタデータ（metadata）と出力先ファイルパス（filepath）
+        """
+        if filepath is None:
+            filepath = CatalogExporter.defaultExportPath()
+
+        metadata = CatalogExporter.exportMetadata()
+        for _ in CatalogExporter.streamExport(filepath, metadata):
+            pass
+
+        return {
+            'metadata': metadata,
+            'filepath': filepath
+        }
@@ -0,0 +1,146 @@
+"""
+祝日・年末年始などの休止・振替（CollectionException）をJSONファイルから読み込むモジュール
+ファイル内のカテゴリ名は、読み込み時点のカテゴリIDに解決する
+"""
+
+import json
+import os
+from typing import Tuple
+
+from app.models import db, GarbageCategory, CollectionException
+from app.schedule import parseIsoDate
+
+
+class HolidayImporter:
+    """
+    休止・振替をJSONファイルから一括でインポートするクラス
+    ファイル形式:
+        {
+            "exceptions": [
+                {"date": "2026-01-01", "action": "cancel", "note": "年始休み"},
+                {"date": "2026-12-31", "category": "可燃ゴミ", "action": "move", "moved_to": "2026-12-30"}
+            ]
+        }
+    category を省略した行は、その日に回収される全カテゴリに適用する
+    """
+
+    @staticmethod
+    def importFromJson(filepath: str, clearExisting: bool = True) -> dict:
+        """
+        休止・振替をJSONファイルからインポートしてコミットする
+        Args:
+            filepath (str): インポート元ファイルパス
+            clearExisting (bool): 既存の休止・振替を削除するか
+        Returns:
+            dict: インポート結果の統計情報
+        Raises:
+            ValueError: 日付・種類の形式が不正な行がある場合（何もインポートしない）
+        """
+        importedExceptions, skippedExceptions = HolidayImporter.loadExceptions(filepath, clearExisting)
+        db.session.commit()
+
+        return {
+            'imported_exceptions': importedExceptions,
+            'skipped_exceptions': skippedExceptions,
+            'total_exceptions': CollectionException.query.count()
+        }
+
+    @staticmethod
+    def reloadCategoryExceptions(filepath: str) -> Tuple[int, int]:
+        """
+        カテゴリ個別の休止・振替だけを削除し、現在のカテゴリIDでファイルから読み込み直す（コミットしない）
+        全カテゴリ共通の行（category_id が NULL）は、別のファイルから読み込んだものも含めて残す
+        カテゴリのインポートの一部として呼び出すため、形式の不正な行は読み飛ばしてインポート全体を失敗させない
+        Args:
+            filepath (str): 読み込み元ファイルパス
+        Returns:
+            Tuple[int, int]: (追加した件数, 読み飛ばした件数)
+        """
+        db.session.query(CollectionException).filter(CollectionException.category_id.isnot(None)).delete()
+        return HolidayImporter.loadExceptions(filepath, clearExisting=False, categoryOnly=True)
+
+    @staticmethod
+    def loadExceptions(filepath: str, clearExisting: bool, categoryOnly: bool = False) -> Tuple[int, int]:
+        """
+        休止・振替のJSONファイルを読み込み、現在のカテゴリ名でカテゴリIDを解決して追加する（コミットしない）
+        Args:
+            filepath (str): インポート元ファイルパス
+            clearExisting (bool): 既存の休止・振替を削除するか
+            categoryOnly (bool): カテゴリ個別の行だけを読み込むか
+                                 （True の場合、形式の不正な行はエラーにせず警告を出力して読み飛ばす）
+        Returns:
+            Tuple[int, int]: (追加した件数, 未登録のカテゴリ宛て・形式の不正な行で読み飛ばした件数)
+        Raises:
+            ValueError: ファイルの形式が不正な場合、または日付・種類の形式が不正な行がある場合
+                        （行の形式は categoryOnly が False の場合のみ）
+        """
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"ファイルが見つかりません: {filepath}")
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            importData = json.load(f)
+        if not isinstance(importData, dict) or not isinstance(importData.get('exceptions', []), list):
+            raise ValueError('休止・振替のファイルは {"exceptions": [...]} の形式で指定してください')
+
+        # カテゴリ名からIDへの対応を1回のクエリで取得
+        categoryIds = dict(db.session.query(GarbageCategory.category, GarbageCategory.id))
+
+        rows = []
+        skippedExceptions = 0
+        for index, entry in enumerate(importData.get('exceptions', []), start=1):
+            if categoryOnly and not (isinstance(entry, dict) and entry.get('category')):
+                continue
+            try:
+                row = HolidayImporter._parseEntry(index, entry)
+            except ValueError as e:
+                if not categoryOnly:
+                    raise
+                print(f"⚠️ 休止・振替の行を読み飛ばしました: {e}")
+                skippedExceptions += 1
+                continue
+
+            if entry.get('category'):
+                row['category_id'] = categoryIds.get(entry['category'])
+                if row['category_id'] is None:
+                    # 未登録のカテゴリ宛ての行は読み飛ばす
+                    skippedExceptions += 1
+                    continue
+            rows.append(row)
+
+        if clearExisting:
+            db.session.query(CollectionException).delete()
+        if rows:
+            db.session.bulk_insert_mappings(CollectionException, rows)
+        return len(rows), skippedExceptions
+
+    @staticmethod
+    def _parseEntry(index: int, entry: dict) -> dict:
+        """
+        ファイルの1行を検証し、追加する行（category_id は未解決の None）に変換する
+        Args:
+            index (int): 行の位置（1始まり）
+            entry (dict): ファイルの1行
+        Returns:
+            dict: CollectionException の行
+        Raises:
+            ValueError: 日付・種類の形式が不正な場合
+        """
+        if not isinstance(entry, dict):
+            raise ValueError(f"{index}件目: 行はオブジェクトで指定してください")
+        action = entry.get('action', CollectionException.ACTION_CANCEL)
+        exceptionDate = parseIsoDate(entry.get('date', ''))
+        movedTo = parseIsoDate(entry['moved_to']) if entry.get('moved_to') else None
+        if exceptionDate is None:
+            raise ValueError(f"{index}件目: date は YYYY-MM-DD 形式で指定してください")
+        if action not in CollectionException.ACTIONS:
+            raise ValueError(f"{index}件目: action は {' / '.join(CollectionException.ACTIONS)} のいずれかで指定してください")
+        if action == CollectionException.ACTION_MOVE and movedTo is None:
+            raise ValueError(f"{index}件目: move には moved_to（YYYY-MM-DD）を指定してください")
+
+        return {
+            'date': exceptionDate.isoformat(),
+            'category_id': None,
+            'action': action,
+            'moved_to': movedTo.isoformat() if movedTo else None,
+            'note': entry.get('note')
+        }
@@ -0,0 +1,169 @@
+"""
+カタログのバージョンに基づくHTTP条件付きレスポンスを提供するモジュール
+ETag / If-None-Match により、データが変わっていない場合は 304 Not Modified を返す
+エンコード済みのボディは圧縮版とともにキャッシュし、変更がない限りJSON・iCalendarのエンコードを行わない
+"""
+
+import hashlib
+from itertools import chain
+from typing import Any, Callable, Iterator, Optional
+
+from flask import Flask, Response, current_app, request, stream_with_context
+from app.catalog import CatalogSnapshot
+from app.response_cache import ENCODING_SUFFIXES, CachedBody, ResponseCache
+
+
+def initResponseCache(app: Flask) -> None:
+    """
+    アプリケーションにレスポンスキャッシュを登録する
+    Args:
+        app (Flask): 対象のFlaskアプリケーション
+    """
+    app.extensions['response_cache'] = ResponseCache(app.config['RESPONSE_CACHE_MAX_BYTES'])
+
+
+def catalogETag(snapshot: CatalogSnapshot, *keyParts: Any) -> str:
+    """
+    カタログのバージョンとレスポンスを区別するキーから強いETagの値を生成する
+    Args:
+        snapshot (CatalogSnapshot): レスポンスの生成に使用するスナップショット
+        keyParts (Any): エンドポイント名・パラメータ・日付など、レスポンスを区別する値
+    Returns:
+        str: ETagの値（引用符なし）
+    """
+    keyDigest = hashlib.blake2s(repr(keyParts).encode('utf-8'), digest_size=8).hexdigest()
+    return f'{snapshot.version}.{keyDigest}'
+
+
+def applyCacheHeaders(response: Response, etag: str) -> Response:
+    """
+    レスポンスにETagとCache-Controlヘッダーを設定する
+    Args:
+        response (Response): 対象のレスポンス
+        etag (str): ETagの値（引用符なし）
+    Returns:
+        Response: ヘッダーを設定したレスポンス
+    """
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = current_app.config['CATALOG_CACHE_CONTROL']
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def encodeJson(payload: dict) -> bytes:
+    """
+    ペイロードを jsonify と同じ形式（キー順ソート・ASCIIエスケープ・改行終端）でエンコードする
+    Args:
+        payload (dict): レスポンスのペイロード
+    Returns:
+        bytes: エンコード済みのJSON
+    """
+    return (current_app.json.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def catalogJsonResponse(snapshot: CatalogSnapshot, keyParts: tuple,
+                        buildPayload: Callable[[], dict]) -> Response:
+    """
+    カタログから生成するJSONレスポンスを、ETagによる条件付きで返す（catalogCachedResponse を参照）
+    Args:
+        snapshot (CatalogSnapshot): レスポンスの生成に使用するスナップショット
+        keyParts (tuple): レスポンスを区別する値（エンドポイント名・パラメータなど）
+        buildPayload (Callable[[], dict]): レスポンスのペイロードを生成する関数
+    Returns:
+        Response: 304 または JSON の 200 レスポンス
+    """
+    return catalogCachedResponse(snapshot, keyParts, lambda: encodeJson(buildPayload()), 'application/json')
+
+
+def catalogCachedResponse(snapshot: CatalogSnapshot, keyParts: tuple,
+                          buildBody: Callable[[], bytes], mimetype: str) -> Response:
+    """
+    カタログから生成するレスポンスを、ETagによる条件付きで返す
+    If-None-Match が現在のETagと一致する場合は、ボディの生成もエンコードも行わずに 304 を返す
+    それ以外はETagをキーにキャッシュしたボディ（圧縮形式はAccept-Encodingで選択）をそのまま返し、
+    キャッシュにない場合のみボディを生成する
+    圧縮形式ごとにボディが異なるため、ETagには圧縮形式の接尾辞を付ける
+    Args:
+        snapshot (CatalogSnapshot): レスポンスの生成に使用するスナップショット
+        keyParts (tuple): レスポンスを区別する値（エンドポイント名・パラメータなど）
+        buildBody (Callable[[], bytes]): エンコード済みのボディを生成する関数
+        mimetype (str): レスポンスのMIMEタイプ
+    Returns:
+        Response: 304 または 200 レスポンス
+    """
+    etag = catalogETag(snapshot, *keyParts)
+    notModified = notModifiedResponse(etag)
+    if notModified is not None:
+        return notModified
+
+    cache: ResponseCache = current_app.extensions['response_cache']
+    entry = cache.get(etag)
+    if entry is None:
+        entry = cache.put(etag, buildBody())
+    return cachedBodyResponse(entry, etag, mimetype)
+
+
+def catalogStreamedResponse(snapshot: CatalogSnapshot, keyParts: tuple,
+                            iterBody: Callable[[], Iterator[bytes]], mimetype: str) -> Response:
+    """
+    catalogCachedResponse と同様に条件付きで返すが、ボディを分割して生成する
+    生成しながらバイト数を数え、キャッシュの上限以内に収まった場合だけ結合してキャッシュする
+    上限を超える場合は結合もキャッシュもせず、生成済みの分に続けて残りを無圧縮のままストリーミングで返す
+    Args:
+        snapshot (CatalogSnapshot): レスポンスの生成に使用するスナップショット
+        keyParts (tuple): レスポンスを区別する値（エンドポイント名・パラメータなど）
+        iterBody (Callable[[], Iterator[bytes]]): エンコード済みのボディを分割して生成する関数
+        mimetype (str): レスポンスのMIMEタイプ
+    Returns:
+        Response: 304、キャッシュしたボディの 200、またはストリーミングの 200 レスポンス
+    """
+    etag = catalogETag(snapshot, *keyParts)
+    notModified = notModifiedResponse(etag)
+    if notModified is not None:
+        return notModified
+
+    cache: ResponseCache = current_app.extensions['response_cache']
+    entry = cache.get(etag)
+    if entry is None:
+        chunks = iterBody()
+        buffered = []
+        bufferedBytes = 0
+        for chunk in chunks:
+            buffered.append(chunk)
+            bufferedBytes += len(chunk)
+            if bufferedBytes > cache.maxBytes:
+                response = Response(stream_with_context(chain(buffered, chunks)), mimetype=mimetype)
+                return applyCacheHeaders(response, etag)
+        entry = cache.put(etag, b''.join(buffered))
+    return cachedBodyResponse(entry, etag, mimetype)
+
+
+def notModifiedResponse(etag: str) -> Optional[Response]:
+    """
+    If-None-Match が現在のETag（圧縮形式の接尾辞付きを含む）と一致する場合に 304 レスポンスを返す
+    Args:
+        etag (str): 現在のETagの値（引用符なし、接尾辞なし）
+    Returns:
+        Response: 304 レスポンス（一致しない場合は None）
+    """
+    for suffix in ('', *ENCODING_SUFFIXES.values()):
+        if request.if_none_match.contains(etag + suffix):
+            return applyCacheHeaders(Response(status=304), etag + suffix)
+    return None
+
+
+def cachedBodyResponse(entry: CachedBody, etag: str, mimetype: str) -> Response:
+    """
+    キャッシュしたボディから、Accept-Encoding で選択した圧縮形式のレスポンスを作成する
+    Args:
+        entry (CachedBody): ボディと圧縮版
+        etag (str): ETagの値（引用符なし、接尾辞なし）
+        mimetype (str): レスポンスのMIMEタイプ
+    Returns:
+        Response: 200 レスポンス
+    """
+    encoding, body = entry.select(request.accept_encodings)
+    response = Response(body, mimetype=mimetype)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    return applyCacheHeaders(response, etag + ENCODING_SUFFIXES.get(encoding, ''))
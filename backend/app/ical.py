@@ -0,0 +1,111 @@
+"""
+回収予定を iCalendar（RFC 5545）形式で出力するモジュール
+スマートフォンのカレンダーアプリから購読できるよう、回収日ごとの終日予定（VEVENT）を順に生成する
+"""
+
+from datetime import date, timedelta
+from typing import Iterable, Iterator, Optional
+
+from app.catalog import CatalogSnapshot
+
+PRODUCT_ID = '-//HomeGarbageAssistance//Collection Calendar//JA'
+UID_DOMAIN = 'home-garbage-assistance'
+# 1行の最大長（オクテット、改行を除く）
+LINE_LIMIT = 75
+# 何件の予定ごとにまとめて送信するか
+EVENTS_PER_CHUNK = 50
+
+
+def escapeText(value: str) -> str:
+    """
+    TEXT型の値に含まれる特殊文字をエスケープする
+    Args:
+        value (str): 値
+    Returns:
+        str: エスケープした値
+    """
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def foldLine(line: str) -> str:
+    """
+    1行を75オクテット以内に折り返し、CRLFで終端する（マルチバイト文字の途中では折り返さない）
+    Args:
+        line (str): コンテンツ行
+    Returns:
+        str: 折り返したコンテンツ行
+    """
+    if len(line.encode('utf-8')) <= LINE_LIMIT:
+        return line + '\r\n'
+    parts = []
+    current, currentBytes = '', 0
+    for char in line:
+        charBytes = len(char.encode('utf-8'))
+        # 継続行は先頭の空白1文字分だけ短くする
+        if currentBytes + charBytes > (LINE_LIMIT if not parts else LINE_LIMIT - 1):
+            parts.append(current)
+            current, currentBytes = '', 0
+        current += char
+        currentBytes += charBytes
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def buildEvent(pickupDate: date, category: dict, stamp: str) -> str:
+    """
+    1カテゴリの1回の回収を終日予定（VEVENT）に変換する
+    Args:
+        pickupDate (date): 回収日
+        category (dict): カテゴリ情報
+        stamp (str): DTSTAMP の値（UTC）
+    Returns:
+        str: VEVENT のコンテンツ行
+    """
+    description = category['method']
+    if category.get('notion'):
+        description += '\n' + category['notion']
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{pickupDate:%Y%m%d}-{category["id"]}@{UID_DOMAIN}',
+        f'DTSTAMP:{stamp}',
+        f'DTSTART;VALUE=DATE:{pickupDate:%Y%m%d}',
+        f'DTEND;VALUE=DATE:{pickupDate + timedelta(days=1):%Y%m%d}',
+        f'SUMMARY:{escapeText(category["category"])}',
+        f'DESCRIPTION:{escapeText(description)}',
+        'TRANSP:TRANSPARENT',
+        'END:VEVENT',
+    ]
+    return ''.join(foldLine(line) for line in lines)
+
+
+def iterCalendar(snapshot: CatalogSnapshot, start: date, end: date,
+                 categoryIds: Optional[Iterable[int]] = None) -> Iterator[bytes]:
+    """
+    期間内の回収予定を iCalendar 形式で順に生成する
+    回収カレンダー（休止・振替を反映済み）を展開し、EVENTS_PER_CHUNK 件ごとにまとめて返す
+    Args:
+        snapshot (CatalogSnapshot): 使用するスナップショット
+        start (date): 期間の開始日（この日を含む）
+        end (date): 期間の終了日（この日を含む）
+        categoryIds (Iterable[int]): 出力するカテゴリID（省略時は全カテゴリ）
+    Yields:
+        bytes: UTF-8 でエンコードしたコンテンツ行のまとまり
+    """
+    selectedIds = set(categoryIds) if categoryIds is not None else None
+    # 同じ内容なら同じ出力になるよう、DTSTAMP は期間の開始日とする
+    stamp = f'{start:%Y%m%d}T000000Z'
+    yield (foldLine('BEGIN:VCALENDAR') + foldLine('VERSION:2.0') + foldLine(f'PRODID:{PRODUCT_ID}')
+           + foldLine('CALSCALE:GREGORIAN') + foldLine('METHOD:PUBLISH')
+           + foldLine('X-WR-CALNAME:ゴミ回収日') + foldLine('X-WR-TIMEZONE:Asia/Tokyo')).encode('utf-8')
+
+    chunk = []
+    for pickupDate, ids in snapshot.calendar.expand(start, end):
+        for categoryId in ids:
+            if selectedIds is None or categoryId in selectedIds:
+                chunk.append(buildEvent(pickupDate, snapshot.categoryById[categoryId], stamp))
+        if len(chunk) >= EVENTS_PER_CHUNK:
+            yield ''.join(chunk).encode('utf-8')
+            chunk = []
+    chunk.append(foldLine('END:VCALENDAR'))
+    yield ''.join(chunk).encode('utf-8')
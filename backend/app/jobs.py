@@ -0,0 +1,192 @@
+"""
+インポートなどの時間のかかる処理をバックグラウンドで実行するジョブ管理モジュール
+ジョブは上限付きのスレッドプールで実行し、進捗はジョブIDで問い合わせる
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional
+
+from flask import Flask, current_app
+
+# ジョブの状態
+JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JOB_FAILED = 'queued', 'running', 'succeeded', 'failed'
+
+
+class JobQueueFullError(Exception):
+    """実行待ちのジョブが上限に達している場合に送出する例外"""
+
+
+class ImportJob:
+    """
+    1件のインポートジョブの状態と進捗を保持するクラス
+    進捗はワーカースレッドから更新され、リクエストスレッドから参照される
+    """
+
+    def __init__(self, jobId: str, kind: str):
+        """
+        実行待ちのジョブを作成する
+        Args:
+            jobId (str): ジョブID
+            kind (str): ジョブの種類（例: import）
+        """
+        self.lock = threading.Lock()
+        self.id = jobId
+        self.kind = kind
+        self.status = JOB_QUEUED
+        self.createdAt = datetime.now()
+        self.startedAt: Optional[float] = None
+        self.finishedAt: Optional[float] = None
+        self.categoriesProcessed = 0
+        self.typesProcessed = 0
+        self.categoriesSkipped = 0
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+
+    def updateProgress(self, categories: int, types: int, skipped: int) -> None:
+        """
+        処理済みの件数を更新する（DatabaseManager の進捗コールバックとして使用する）
+        Args:
+            categories (int): インポートしたカテゴリ数
+            types (int): インポートしたゴミ種類数
+            skipped (int): 読み飛ばしたカテゴリ数
+        """
+        with self.lock:
+            self.categoriesProcessed = categories
+            self.typesProcessed = types
+            self.categoriesSkipped = skipped
+
+    def toDict(self) -> dict:
+        """
+        ジョブの状態を辞書形式に変換する
+        Returns:
+            dict: ジョブ情報の辞書
+        """
+        with self.lock:
+            if self.startedAt is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self.finishedAt or time.perf_counter()) - self.startedAt
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'created_at': self.createdAt.isoformat(),
+                'elapsed_seconds': round(elapsed, 3),
+                'categories_processed': self.categoriesProcessed,
+                'garbage_types_processed': self.typesProcessed,
+                'categories_skipped': self.categoriesSkipped,
+                'result': self.result,
+                'error': self.error
+            }
+
+
+class JobManager:
+    """
+    ジョブを上限付きのスレッドプールで実行し、最近のジョブを保持するクラス
+    SQLite の書き込みは同時に1つしか行えないため、ワーカー数は通常1とする
+    """
+
+    def __init__(self, maxWorkers: int, maxPending: int, historySize: int):
+        """
+        スレッドプールを作成する
+        Args:
+            maxWorkers (int): 同時に実行するジョブ数
+            maxPending (int): 実行中・実行待ちのジョブ数の上限
+            historySize (int): 保持する完了済みジョブ数
+        """
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='import-job')
+        self.maxPending = maxPending
+        self.historySize = historySize
+        self.jobs: 'OrderedDict[str, ImportJob]' = OrderedDict()
+
+    def submit(self, app: Flask, kind: str, work: Callable[[ImportJob], dict]) -> ImportJob:
+        """
+        ジョブを登録して実行待ちにする
+        Args:
+            app (Flask): ジョブ内でアプリケーションコンテキストを作成するアプリケーション
+            kind (str): ジョブの種類
+            work (Callable[[ImportJob], dict]): ジョブ本体（進捗をジョブに書き込み、結果を返す）
+        Returns:
+            ImportJob: 登録したジョブ
+        Raises:
+            JobQueueFullError: 実行中・実行待ちのジョブが上限に達している場合
+        """
+        with self.lock:
+            pending = sum(1 for job in self.jobs.values() if job.status in (JOB_QUEUED, JOB_RUNNING))
+            if pending >= self.maxPending:
+                raise JobQueueFullError(f'実行中・実行待ちのジョブが上限（{self.maxPending}件）に達しています')
+            job = ImportJob(secrets.token_hex(8), kind)
+            self.jobs[job.id] = job
+            self._trimHistory()
+        self.executor.submit(self._run, app, job, work)
+        return job
+
+    def get(self, jobId: str) -> Optional[ImportJob]:
+        """
+        ジョブIDからジョブを取得する
+        Args:
+            jobId (str): ジョブID
+        Returns:
+            ImportJob: ジョブ（存在しない・履歴から削除済みの場合は None）
+        """
+        with self.lock:
+            return self.jobs.get(jobId)
+
+    def _trimHistory(self) -> None:
+        """
+        完了済みのジョブを古い順に削除し、保持数を historySize 以内にする（ロック内で呼び出すこと）
+        """
+        finished = [jobId for jobId, job in self.jobs.items() if job.status in (JOB_SUCCEEDED, JOB_FAILED)]
+        for jobId in finished[:max(0, len(finished) - self.historySize)]:
+            del self.jobs[jobId]
+
+    @staticmethod
+    def _run(app: Flask, job: ImportJob, work: Callable[[ImportJob], dict]) -> None:
+        """
+        ワーカースレッドでジョブを実行する
+        Args:
+            app (Flask): アプリケーション
+            job (ImportJob): 実行するジョブ
+            work (Callable[[ImportJob], dict]): ジョブ本体
+        """
+        with job.lock:
+            job.status = JOB_RUNNING
+            job.startedAt = time.perf_counter()
+        with app.app_context():
+            try:
+                result = work(job)
+            except Exception as e:
+                with job.lock:
+                    job.status = JOB_FAILED
+                    job.error = str(e)
+                    job.finishedAt = time.perf_counter()
+                return
+        with job.lock:
+            job.status = JOB_SUCCEEDED
+            job.result = result
+            job.finishedAt = time.perf_counter()
+
+
+def initJobs(app: Flask) -> None:
+    """
+    アプリケーションにジョブ管理を登録する
+    Args:
+        app (Flask): 対象のFlaskアプリケーション
+    """
+    app.extensions['jobs'] = JobManager(app.config['IMPORT_JOB_WORKERS'], app.config['IMPORT_JOB_MAX_PENDING'],
+                                        app.config['IMPORT_JOB_HISTORY'])
+
+
+def getJobManager() -> JobManager:
+    """
+    現在のアプリケーションのジョブ管理を取得する
+    Returns:
+        JobManager: ジョブ管理
+    """
+    return current_app.extensions['jobs']
@@ -0,0 +1,149 @@
+"""
+既存データベースのスキーマ移行・データ移行処理を提供するモジュール
+スキーマのバージョンを SQLite の PRAGMA user_version に記録し、未適用の移行だけを順に実行する
+スキーマ変更に伴い、既存の行を新しい形式へ変換する
+"""
+
+import json
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+
+from app.models import db, GarbageCategory, CollectionDay
+from app.recurrence import compressSpecialDays
+
+
+def migrateCollectionDays() -> int:
+    """
+    dateカラム（JSON文字列・旧形式の単一文字列）から collection_days を作成する
+    collection_days が空でカテゴリが存在する場合のみ実行する
+    Returns:
+        int: 作成した行数（移行不要の場合は0）
+    """
+    if CollectionDay.query.first() or not GarbageCategory.query.first():
+        return 0
+    
+    createdRows = CollectionDay.syncFromCategories()
+    db.session.commit()
+    return createdRows
+
+
+def syncRecurrenceDays() -> int:
+    """
+    繰り返しルールの曜日を含めて collection_days を作り直す
+    （ルールの曜日を曜日別の一覧に含める前に登録されたカテゴリ向け。作り直すだけのため再実行してよい）
+    Returns:
+        int: 作成した行数
+    """
+    createdRows = CollectionDay.syncFromCategories()
+    db.session.commit()
+    return createdRows
+
+
+def addRecurrenceColumn() -> bool:
+    """
+    garbage_categories に recurrence カラムがない既存DBへカラムを追加する
+    （db.create_all() は既存テーブルへのカラム追加を行わないため）
+    Returns:
+        bool: カラムを追加した場合は True
+    """
+    columns = {row[1] for row in db.session.execute(text('PRAGMA table_info(garbage_categories)'))}
+    if 'recurrence' in columns:
+        return False
+    
+    db.session.execute(text('ALTER TABLE garbage_categories ADD COLUMN recurrence TEXT'))
+    db.session.commit()
+    return True
+
+
+def createIndexes() -> None:
+    """
+    検索・曜日での絞り込み・カテゴリからの関連読み込みで使うインデックスを作成する
+    （名前はモデルの index=True が作成するものと同じにし、db.create_all() 済みのDBでは何もしない）
+    """
+    db.session.execute(text('CREATE INDEX IF NOT EXISTS ix_garbage_types_category_id ON garbage_types (category_id)'))
+    db.session.execute(text('CREATE INDEX IF NOT EXISTS ix_garbage_types_name ON garbage_types (name)'))
+    db.session.execute(text('CREATE INDEX IF NOT EXISTS ix_collection_days_category_id ON collection_days (category_id)'))
+    db.session.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_collection_exceptions_category_id ON collection_exceptions (category_id)'
+    ))
+    db.session.commit()
+
+
+# スキーマの移行処理（バージョン, 説明, 処理）。適用済みのバージョンは PRAGMA user_version に記録する
+# 途中で中断しても再実行できるよう、各処理は適用済みのDBに対して何もしないように書く
+# 新しい移行は末尾に追加し、既存の番号は変更しない
+MIGRATIONS: List[Tuple[int, str, Callable[[], object]]] = [
+    (1, 'テーブルの作成', lambda: db.create_all()),
+    (2, 'garbage_categories.recurrence カラムの追加', addRecurrenceColumn),
+    (3, 'collection_days への回収曜日の移行', migrateCollectionDays),
+    (4, 'garbage_types・collection_days・collection_exceptions のインデックス作成', createIndexes),
+    (5, 'collection_days への繰り返しルールの曜日の反映', syncRecurrenceDays),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def getSchemaVersion() -> int:
+    """
+    データベースに記録されたスキーマのバージョンを取得する
+    Returns:
+        int: スキーマのバージョン（未記録の場合は0）
+    """
+    return db.session.execute(text('PRAGMA user_version')).scalar() or 0
+
+
+def setSchemaVersion(version: int) -> None:
+    """
+    スキーマのバージョンを記録する（db.drop_all() で作り直す場合は0に戻してから runMigrations を呼ぶ）
+    Args:
+        version (int): スキーマのバージョン
+    """
+    db.session.execute(text(f'PRAGMA user_version = {int(version)}'))
+    db.session.commit()
+
+
+def runMigrations() -> List[Tuple[int, str]]:
+    """
+    未適用の移行を順に実行し、1件ごとにスキーマのバージョンを記録する
+    適用済みの場合は user_version を1回読むだけで終了するため、起動のたびに呼び出してよい
+    Returns:
+        List[Tuple[int, str]]: 適用した移行の (バージョン, 説明)
+    """
+    currentVersion = getSchemaVersion()
+    if currentVersion >= SCHEMA_VERSION:
+        return []
+    
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version <= currentVersion:
+            continue
+        migrate()
+        setSchemaVersion(version)
+        applied.append((version, description))
+    return applied
+
+
+def migrateRecurrenceRules() -> int:
+    """
+    特別回収日（special_days）を列挙しているカテゴリを、繰り返しルール（recurrence）へ移行する
+    隔週・第n曜日として表せる日付はルールに圧縮し、表せない日付は dates のルールとして残す
+    移行したカテゴリの special_days は空にし、ルールの曜日を collection_days に反映する
+    recurrence が登録済みのカテゴリは変更しない
+    Returns:
+        int: 移行したカテゴリ数
+    """
+    migratedCategories = 0
+    for category in GarbageCategory.query.filter(GarbageCategory.recurrence.is_(None)):
+        specialDays = category.to_dict()['special_days']
+        if not specialDays:
+            continue
+        rules = compressSpecialDays(specialDays)
+        if not rules:
+            continue
+        category.recurrence = json.dumps(rules, ensure_ascii=False)
+        category.special_days = json.dumps([])
+        category.syncCollectionDays()
+        migratedCategories += 1
+    
+    db.session.commit()
+    return migratedCategories
@@ -4,16 +4,85 @@
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import selectinload, joinedload
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
 
 db = SQLAlchemy()
 
+# 曜日名の一覧（datetime.weekday() の並び順）
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def parseDateField(rawDate: Optional[str]) -> List[str]:
+    """
+    dateカラムに保存された値を曜日名のリストに変換する
+    JSON配列・JSON文字列・JSONでない単一文字列（旧形式）のいずれにも対応する
+    Args:
+        rawDate (str): dateカラムの生の値
+    Returns:
+        List[str]: 曜日名のリスト
+    """
+    if not rawDate:
+        return []
+    try:
+        dateList = json.loads(rawDate)
+    except json.JSONDecodeError:
+        # JSONでない場合は単一の文字列として扱う
+        return [rawDate]
+    # 後方互換性のため、文字列の場合は配列に変換
+    if isinstance(dateList, str):
+        return [dateList]
+    return list(dateList)
+
+
+def collectionWeekdays(rawDate: Optional[str], rawRecurrence: Optional[str]) -> List[str]:
+    """
+    collection_days に登録する曜日（回収曜日と、繰り返しルールの days に含まれる曜日の和集合）を返す
+    month_days・dates のルールは曜日が決まらないため、回収曜日だけに従う
+    Args:
+        rawDate (str): dateカラムの生の値
+        rawRecurrence (str): recurrenceカラムの生の値（ルールの配列のJSON文字列）
+    Returns:
+        List[str]: 曜日名のリスト（重複なし）
+    """
+    days = parseDateField(rawDate)
+    if rawRecurrence:
+        try:
+            rules = json.loads(rawRecurrence)
+        except json.JSONDecodeError:
+            rules = []
+        for rule in rules if isinstance(rules, list) else []:
+            if isinstance(rule, dict) and isinstance(rule.get('days'), list):
+                days.extend(day for day in rule['days'] if day in WEEKDAYS)
+    return list(dict.fromkeys(days))
+
+
+def normalizeDays(dateValue) -> List[str]:
+    """
+    回収曜日の指定を検証し、曜日名のリストに変換する
+    Args:
+        dateValue (list | str): 曜日名のリスト、または単一の曜日名
+    Returns:
+        List[str]: 曜日名のリスト
+    Raises:
+        ValueError: 空の場合、または曜日名（WEEKDAYS）以外の値を含む場合
+    """
+    dateList = dateValue if isinstance(dateValue, list) else [dateValue]
+    if not dateList:
+        raise ValueError('回収曜日を1つ以上指定してください')
+    for day in dateList:
+        if not isinstance(day, str) or day not in WEEKDAYS:
+            raise ValueError(f"回収曜日は {', '.join(WEEKDAYS)} のいずれかで指定してください: {day}")
+    return dateList
+
 
 class GarbageCategory(db.Model):
     """
     ゴミのカテゴリデータを管理するクラス
-    カテゴリごとの回収日、回収方法、特別日などの情報を保持する
+    カテゴリごとの回収日、回収方法、特別日、繰り返しルールなどの情報を保持する
     """
     __tablename__ = 'garbage_categories'
     
@@ -22,12 +91,51 @@ class GarbageCategory(db.Model):
     date = db.Column(db.Text, nullable=False)  # JSON string for multiple days (e.g., ["Monday", "Tuesday"])
     method = db.Column(db.String(200), nullable=False)
     special_days = db.Column(db.Text)  # JSON string for special collection days
+    recurrence = db.Column(db.Text)  # JSON string for recurrence rules (see app/recurrence.py)
     notion = db.Column(db.Text)  # Additional notes
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationship with GarbageType
-    garbage_types = db.relationship('GarbageType', backref='category_ref', lazy=True)
+    # Relationship with GarbageType（カテゴリ削除時はゴミ種類も削除する）
+    garbage_types = db.relationship('GarbageType', backref='category_ref', lazy=True,
+                                    cascade='all, delete-orphan')
+    # 曜日での絞り込み用に正規化した回収曜日
+    collection_days = db.relationship('CollectionDay', backref='category_ref', lazy=True,
+                                      cascade='all, delete-orphan')
+    # カテゴリ個別の休止・振替（全カテゴリ共通のものは category_id が NULL）
+    exceptions = db.relationship('CollectionException', backref='category_ref', lazy=True,
+                                 cascade='all, delete-orphan')
+    
+    @classmethod
+    def queryWithTypes(cls):
+        """
+        ゴミ種類を一括読み込みするカテゴリのクエリを返す
+        to_dict() でのシリアライズ時に、カテゴリごとの遅延読み込みクエリ（N+1）が発生しないようにする
+        Returns:
+            Query: garbage_types を selectin で読み込むクエリ
+        """
+        return cls.query.options(selectinload(cls.garbage_types))
+    
+    def setDays(self, dateValue) -> None:
+        """
+        回収曜日を設定する
+        dateカラム（JSON文字列）と正規化テーブル collection_days を同時に更新する
+        繰り返しルールの曜日も collection_days に含めるため、recurrence は先に設定しておくこと
+        Args:
+            dateValue (list | str): 曜日名のリスト、または単一の曜日名
+        Raises:
+            ValueError: 曜日名として正しくない値を含む場合（normalizeDays を参照）
+        """
+        dateList = normalizeDays(dateValue)
+        self.date = json.dumps(dateList)
+        self.syncCollectionDays()
+    
+    def syncCollectionDays(self) -> None:
+        """
+        dateカラムと recurrence カラムから collection_days を作り直す
+        （回収曜日を変えずに繰り返しルールだけを変更した場合に呼び出す）
+        """
+        self.collection_days = [CollectionDay(day=day) for day in collectionWeekdays(self.date, self.recurrence)]
     
     def to_dict(self) -> dict:
         """
@@ -35,7 +143,6 @@ class GarbageCategory(db.Model):
         Returns:
             dict: カテゴリ情報の辞書
         """
-        import json
         special_days_list = []
         if self.special_days:
             try:
@@ -43,17 +150,16 @@ class GarbageCategory(db.Model):
             except json.JSONDecodeError:
                 special_days_list = []
         
-        # dateフィールドも複数曜日に対応
-        date_list = []
-        if self.date:
+        # 繰り返しルール（未登録の場合は空で、回収曜日と特別回収日に従う）
+        recurrence_list = []
+        if self.recurrence:
             try:
-                date_list = json.loads(self.date)
-                # 後方互換性のため、文字列の場合は配列に変換
-                if isinstance(date_list, str):
-                    date_list = [date_list]
+                recurrence_list = json.loads(self.recurrence)
             except json.JSONDecodeError:
-                # JSONでない場合は単一の文字列として扱う
-                date_list = [self.date]
+                recurrence_list = []
+        
+        # dateフィールドも複数曜日に対応
+        date_list = parseDateField(self.date)
                 
         return {
             'id': self.id,
@@ -61,6 +167,7 @@ class GarbageCategory(db.Model):
             'date': date_list,
             'method': self.method,
             'special_days': special_days_list,
+            'recurrence': recurrence_list,
             'notion': self.notion,
             'garbage_types': [gt.to_dict() for gt in self.garbage_types]
         }
@@ -74,11 +181,67 @@ class GarbageType(db.Model):
     __tablename__ = 'garbage_types'
     
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    category_id = db.Column(db.Integer, db.ForeignKey('garbage_categories.id'), nullable=False)
+    name = db.Column(db.String(100), nullable=False, index=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('garbage_categories.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    @classmethod
+    def queryWithCategory(cls):
+        """
+        所属カテゴリとその全ゴミ種類を一括読み込みするゴミ種類のクエリを返す
+        検索結果のシリアライズ時に、ヒットごとの遅延読み込みクエリが発生しないようにする
+        Returns:
+            Query: category_ref を joined、カテゴリの garbage_types を selectin で読み込むクエリ
+        """
+        return cls.query.options(
+            joinedload(cls.category_ref).selectinload(GarbageCategory.garbage_types)
+        )
+    
+    @classmethod
+    def syncNames(cls, namesByCategory: Dict[int, Iterable[str]]) -> Tuple[List[str], List[str]]:
+        """
+        カテゴリごとのゴミ種類を指定した名前の一覧に合わせる（コミットしない）
+        対象カテゴリの現在の行を1回のクエリで取得して差分（同じ名前の件数も考慮）を求め、
+        追加分は executemany で挿入し、削除分はIDを指定した1回の DELETE で削除する
+        変更のない行はIDと作成日時を保持する
+        Args:
+            namesByCategory (Dict[int, Iterable[str]]): カテゴリID → ゴミ種類名の一覧
+                                                        （前後の空白は除き、空の名前は無視する）
+        Returns:
+            Tuple[List[str], List[str]]: (追加した名前, 削除した名前)
+        """
+        if not namesByCategory:
+            return [], []
+        currentByCategory: Dict[int, List[Tuple[int, str]]] = {categoryId: [] for categoryId in namesByCategory}
+        for typeId, categoryId, name in (db.session.query(cls.id, cls.category_id, cls.name)
+                                         .filter(cls.category_id.in_(list(namesByCategory)))
+                                         .order_by(cls.id)):
+            currentByCategory[categoryId].append((typeId, name))
+        
+        removedIds = []
+        removedNames = []
+        addedRows = []
+        for categoryId, names in namesByCategory.items():
+            wanted = Counter(name.strip() for name in names if name.strip())
+            current = currentByCategory[categoryId]
+            currentCounts = Counter(name for _, name in current)
+            # 同じ名前が余っている場合は新しい行から削除する
+            surplus = currentCounts - wanted
+            for typeId, name in reversed(current):
+                if surplus[name] > 0:
+                    surplus[name] -= 1
+                    removedIds.append(typeId)
+                    removedNames.append(name)
+            addedRows.extend({'name': name, 'category_id': categoryId}
+                             for name in (wanted - currentCounts).elements())
+        
+        if removedIds:
+            db.session.query(cls).filter(cls.id.in_(removedIds)).delete(synchronize_session=False)
+        if addedRows:
+            db.session.bulk_insert_mappings(cls, addedRows)
+        return [row['name'] for row in addedRows], removedNames
+    
     def to_dict(self) -> dict:
         """
         オブジェクトを辞書形式に変換する
@@ -91,3 +254,68 @@ class GarbageType(db.Model):
             'category_id': self.category_id,
             'category': self.category_ref.category if self.category_ref else None
         }
+
+
+class CollectionDay(db.Model):
+    """
+    カテゴリの回収曜日を1曜日1行で管理するクラス
+    曜日を主キーの先頭に置き、曜日での絞り込みをインデックス検索で行えるようにする
+    """
+    __tablename__ = 'collection_days'
+    
+    day = db.Column(db.String(10), primary_key=True)
+    # カテゴリからの読み込み・削除用（主キーは曜日が先頭のため、カテゴリIDだけでは使えない）
+    category_id = db.Column(db.Integer, db.ForeignKey('garbage_categories.id'), primary_key=True, index=True)
+    
+    @classmethod
+    def syncFromCategories(cls) -> int:
+        """
+        全カテゴリのdateカラムと recurrence カラムから collection_days を作り直す
+        既存DBの移行や、dateカラムを直接書き換えた後の再同期に使用する
+        Returns:
+            int: 作成した行数
+        """
+        db.session.query(cls).delete()
+        rows = []
+        for categoryId, rawDate, rawRecurrence in db.session.query(GarbageCategory.id, GarbageCategory.date,
+                                                                   GarbageCategory.recurrence):
+            for day in collectionWeekdays(rawDate, rawRecurrence):
+                rows.append({'day': day, 'category_id': categoryId})
+        if rows:
+            db.session.bulk_insert_mappings(cls, rows)
+        return len(rows)
+
+
+class CollectionException(db.Model):
+    """
+    祝日・年末年始などによる回収の休止・振替を1日1行で管理するクラス
+    category_id が NULL の行は、その日に回収される全カテゴリに適用する
+    """
+    __tablename__ = 'collection_exceptions'
+    
+    # 例外の種類（休止 / 別の日への振替）
+    ACTION_CANCEL = 'cancel'
+    ACTION_MOVE = 'move'
+    ACTIONS = (ACTION_CANCEL, ACTION_MOVE)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.String(10), nullable=False, index=True)  # YYYY-MM-DD
+    category_id = db.Column(db.Integer, db.ForeignKey('garbage_categories.id'), index=True)
+    action = db.Column(db.String(10), nullable=False)
+    moved_to = db.Column(db.String(10))  # 振替先 YYYY-MM-DD（action が move の場合）
+    note = db.Column(db.String(100))  # 例: 年末年始休み
+    
+    def to_dict(self) -> dict:
+        """
+        オブジェクトを辞書形式に変換する
+        Returns:
+            dict: 例外情報の辞書
+        """
+        return {
+            'id': self.id,
+            'date': self.date,
+            'category_id': self.category_id,
+            'action': self.action,
+            'moved_to': self.moved_to,
+            'note': self.note
+        }
@@ -0,0 +1,394 @@
+"""
+回収日の繰り返しルール（RRULE に相当する簡易ルール）を評価するモジュール
+「第2・第4水曜日」「隔週」「毎月10日」などを日付を列挙せずに表現し、
+日付の判定と期間内の回収日の算出を、日付を1日ずつ走査せずに行う
+
+ルールはカテゴリの recurrence カラムに JSON 配列として保存し、いずれかのルールに一致する日を回収日とする
+    {"freq": "weekly", "days": ["Wednesday"], "interval": 2, "start": "2025-04-09"}   隔週水曜日
+    {"freq": "monthly", "days": ["Wednesday"], "weeks": [2, 4]}                      第2・第4水曜日（-1 は最終週）
+    {"freq": "monthly", "month_days": [10, -1]}                                      毎月10日と月末
+    {"freq": "dates", "dates": ["2025-04-10", "2025-05-08"]}                         日付の列挙
+start / until（YYYY-MM-DD、両端を含む）はすべてのルールで指定でき、期間外の日は一致しない
+"""
+
+import calendar
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from app.models import WEEKDAYS
+
+FREQ_WEEKLY, FREQ_MONTHLY, FREQ_DATES = 'weekly', 'monthly', 'dates'
+FREQUENCIES = (FREQ_WEEKLY, FREQ_MONTHLY, FREQ_DATES)
+
+# 通日（ordinal）の範囲の両端（date.min / date.max）
+MIN_ORDINAL, MAX_ORDINAL = date.min.toordinal(), date.max.toordinal()
+
+
+def _parseDate(value, field: str) -> Optional[date]:
+    """
+    ルールの日付項目を日付に変換する
+    Args:
+        value: YYYY-MM-DD 形式の文字列（None の場合は指定なし）
+        field (str): エラーメッセージ用の項目名
+    Returns:
+        date: 変換した日付（指定なしの場合は None）
+    Raises:
+        ValueError: 形式が不正な場合
+    """
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f'{field} は YYYY-MM-DD 形式で指定してください: {value}')
+
+
+def _monthIndex(day: date) -> int:
+    """
+    日付の年月を通し番号（年 * 12 + 月 - 1）に変換する
+    Args:
+        day (date): 日付
+    Returns:
+        int: 月の通し番号
+    """
+    return day.year * 12 + day.month - 1
+
+
+class RecurrenceRule:
+    """
+    1件の繰り返しルールをコンパイルした結果を保持するクラス
+    曜日・第n週・日付は事前に数値へ変換し、判定と期間内の列挙を算術演算で行う
+    """
+    __slots__ = ('freq', 'interval', 'weekdays', 'weeks', 'monthDays', 'dateOrdinals',
+                 'startOrdinal', 'untilOrdinal', 'anchor')
+
+    def __init__(self, freq: str, days: Iterable[str] = (), interval: int = 1, weeks: Iterable[int] = (),
+                 monthDays: Iterable[int] = (), dates: Iterable[str] = (),
+                 start: Optional[str] = None, until: Optional[str] = None):
+        """
+        ルールの各項目を検証してコンパイルする
+        Args:
+            freq (str): 'weekly' / 'monthly' / 'dates'
+            days (Iterable[str]): 曜日名のリスト（weekly、および monthly の第n曜日指定）
+            interval (int): 何週・何か月ごとか（start の週・月を起点に数える）
+            weeks (Iterable[int]): 月内の第n週（1〜5、-1〜-5 は月末から数える）
+            monthDays (Iterable[int]): 月内の日（1〜31、-1 は月末）
+            dates (Iterable[str]): 回収日（YYYY-MM-DD）の列挙
+            start (str): ルールの適用開始日（この日を含む）
+            until (str): ルールの適用終了日（この日を含む）
+        Raises:
+            ValueError: 項目が不正な場合
+        """
+        if freq not in FREQUENCIES:
+            raise ValueError(f'freq は {" / ".join(FREQUENCIES)} のいずれかで指定してください: {freq}')
+        if not isinstance(interval, int) or isinstance(interval, bool) or interval < 1:
+            raise ValueError(f'interval は1以上の整数で指定してください: {interval}')
+        invalidDays = [day for day in days if day not in WEEKDAYS]
+        if invalidDays:
+            raise ValueError(f'days に不正な曜日名があります: {invalidDays}')
+        invalidWeeks = [week for week in weeks if not isinstance(week, int) or not 1 <= abs(week) <= 5]
+        if invalidWeeks:
+            raise ValueError(f'weeks は 1〜5 または -1〜-5 で指定してください: {invalidWeeks}')
+        invalidMonthDays = [day for day in monthDays if not isinstance(day, int) or not 1 <= abs(day) <= 31]
+        if invalidMonthDays:
+            raise ValueError(f'month_days は 1〜31 または -1〜-31 で指定してください: {invalidMonthDays}')
+
+        self.freq = freq
+        self.interval = interval
+        self.weekdays: Tuple[int, ...] = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+        self.weeks: Tuple[int, ...] = tuple(sorted(set(weeks)))
+        self.monthDays: Tuple[int, ...] = tuple(sorted(set(monthDays)))
+        self.dateOrdinals: Tuple[int, ...] = tuple(sorted({_parseDate(str(d), 'dates').toordinal() for d in dates}))
+
+        if freq == FREQ_WEEKLY and not self.weekdays:
+            raise ValueError('weekly のルールには days を指定してください')
+        if freq == FREQ_MONTHLY and not (self.weekdays and self.weeks) and not self.monthDays:
+            raise ValueError('monthly のルールには days と weeks、または month_days を指定してください')
+        if freq == FREQ_DATES and not self.dateOrdinals:
+            raise ValueError('dates のルールには dates を指定してください')
+
+        startDate = _parseDate(start, 'start')
+        untilDate = _parseDate(until, 'until')
+        if interval > 1 and startDate is None:
+            raise ValueError('interval を2以上にする場合は、起点となる start を指定してください')
+        if startDate and untilDate and untilDate < startDate:
+            raise ValueError('until は start 以降の日付で指定してください')
+        self.startOrdinal = startDate.toordinal() if startDate else MIN_ORDINAL
+        self.untilOrdinal = untilDate.toordinal() if untilDate else MAX_ORDINAL
+        # interval の起点（weekly は start を含む週の通し番号、monthly は月の通し番号）
+        if freq == FREQ_WEEKLY:
+            self.anchor = (self.startOrdinal - 1) // 7
+        else:
+            self.anchor = _monthIndex(startDate) if startDate else 0
+
+    @classmethod
+    def fromDict(cls, rule: dict) -> 'RecurrenceRule':
+        """
+        JSON のルール（辞書）からルールを作成する
+        Args:
+            rule (dict): ルールの辞書
+        Returns:
+            RecurrenceRule: コンパイルしたルール
+        Raises:
+            ValueError: ルールが不正な場合
+        """
+        if not isinstance(rule, dict):
+            raise ValueError(f'ルールはオブジェクトで指定してください: {rule}')
+        unknownKeys = set(rule) - {'freq', 'days', 'interval', 'weeks', 'month_days', 'dates', 'start', 'until'}
+        if unknownKeys:
+            raise ValueError(f'ルールに不明な項目があります: {sorted(unknownKeys)}')
+        for key in ('days', 'weeks', 'month_days', 'dates'):
+            if not isinstance(rule.get(key, []), list):
+                raise ValueError(f'{key} は配列で指定してください')
+        return cls(rule.get('freq'), rule.get('days', []), rule.get('interval', 1), rule.get('weeks', []),
+                   rule.get('month_days', []), rule.get('dates', []), rule.get('start'), rule.get('until'))
+
+    def toDict(self) -> dict:
+        """
+        ルールを JSON 保存用の辞書に変換する（既定値の項目は省略する）
+        Returns:
+            dict: ルールの辞書
+        """
+        rule = {'freq': self.freq}
+        if self.weekdays:
+            rule['days'] = [WEEKDAYS[weekday] for weekday in self.weekdays]
+        if self.interval > 1:
+            rule['interval'] = self.interval
+        if self.weeks:
+            rule['weeks'] = list(self.weeks)
+        if self.monthDays:
+            rule['month_days'] = list(self.monthDays)
+        if self.dateOrdinals:
+            rule['dates'] = [date.fromordinal(ordinal).isoformat() for ordinal in self.dateOrdinals]
+        if self.startOrdinal != MIN_ORDINAL:
+            rule['start'] = date.fromordinal(self.startOrdinal).isoformat()
+        if self.untilOrdinal != MAX_ORDINAL:
+            rule['until'] = date.fromordinal(self.untilOrdinal).isoformat()
+        return rule
+
+    def matches(self, day: date) -> bool:
+        """
+        指定日がルールに一致するかを判定する
+        Args:
+            day (date): 判定する日付
+        Returns:
+            bool: 一致する場合は True
+        """
+        ordinal = day.toordinal()
+        if not self.startOrdinal <= ordinal <= self.untilOrdinal:
+            return False
+        if self.freq == FREQ_DATES:
+            position = bisect_left(self.dateOrdinals, ordinal)
+            return position < len(self.dateOrdinals) and self.dateOrdinals[position] == ordinal
+        if self.freq == FREQ_WEEKLY:
+            return (day.weekday() in self.weekdays
+                    and ((ordinal - 1) // 7 - self.anchor) % self.interval == 0)
+
+        if (_monthIndex(day) - self.anchor) % self.interval:
+            return False
+        monthLength = calendar.monthrange(day.year, day.month)[1]
+        if day.day in self.monthDays or day.day - monthLength - 1 in self.monthDays:
+            return True
+        return (day.weekday() in self.weekdays
+                and ((day.day - 1) // 7 + 1 in self.weeks or -((monthLength - day.day) // 7 + 1) in self.weeks))
+
+    def occurrences(self, startOrdinal: int, endOrdinal: int) -> List[int]:
+        """
+        期間内の一致する日を通日の昇順で返す
+        weekly は等差数列、monthly は月ごとの算出、dates は二分探索で求める
+        Args:
+            startOrdinal (int): 期間の開始日の通日（この日を含む）
+            endOrdinal (int): 期間の終了日の通日（この日を含む）
+        Returns:
+            List[int]: 一致する日の通日
+        """
+        low = max(startOrdinal, self.startOrdinal)
+        high = min(endOrdinal, self.untilOrdinal)
+        if low > high:
+            return []
+        if self.freq == FREQ_DATES:
+            return list(self.dateOrdinals[bisect_left(self.dateOrdinals, low):bisect_right(self.dateOrdinals, high)])
+        if self.freq == FREQ_WEEKLY:
+            return self._weeklyOccurrences(low, high)
+        return self._monthlyOccurrences(low, high)
+
+    def _weeklyOccurrences(self, low: int, high: int) -> List[int]:
+        """
+        weekly のルールの一致日を、曜日ごとに 7 * interval 日間隔の等差数列として求める
+        """
+        step = 7 * self.interval
+        # 通日の曜日は (ordinal - 1) % 7 で、月曜日が 0 になる
+        lowWeekday = (low - 1) % 7
+        ordinals = []
+        for weekday in self.weekdays:
+            first = low + (weekday - lowWeekday) % 7
+            # 起点の週から interval 週ごとの週まで進める
+            first += 7 * ((self.anchor - (first - 1) // 7) % self.interval)
+            ordinals.extend(range(first, high + 1, step))
+        ordinals.sort()
+        return ordinals
+
+    def _monthlyOccurrences(self, low: int, high: int) -> List[int]:
+        """
+        monthly のルールの一致日を、期間内の月ごとに第n曜日・日付から算出して求める
+        """
+        lowDate, highDate = date.fromordinal(low), date.fromordinal(high)
+        firstMonth, lastMonth = _monthIndex(lowDate), _monthIndex(highDate)
+        firstMonth += (self.anchor - firstMonth) % self.interval
+        ordinals = []
+        for monthIndex in range(firstMonth, lastMonth + 1, self.interval):
+            year, month = divmod(monthIndex, 12)
+            month += 1
+            firstWeekday, monthLength = calendar.monthrange(year, month)
+            days = set()
+            for monthDay in self.monthDays:
+                day = monthDay if monthDay > 0 else monthLength + monthDay + 1
+                if 1 <= day <= monthLength:
+                    days.add(day)
+            lastWeekday = (firstWeekday + monthLength - 1) % 7
+            for weekday in self.weekdays:
+                for week in self.weeks:
+                    if week > 0:
+                        day = 1 + (weekday - firstWeekday) % 7 + 7 * (week - 1)
+                    else:
+                        day = monthLength - (lastWeekday - weekday) % 7 + 7 * (week + 1)
+                    if 1 <= day <= monthLength:
+                        days.add(day)
+            monthStart = date(year, month, 1).toordinal() - 1
+            ordinals.extend(monthStart + day for day in sorted(days) if low <= monthStart + day <= high)
+        return ordinals
+
+
+class RecurrenceSet:
+    """
+    カテゴリの回収ルール全体（いずれかのルールに一致する日を回収日とする）を保持するクラス
+    """
+    __slots__ = ('rules',)
+
+    def __init__(self, rules: Sequence[RecurrenceRule]):
+        """
+        コンパイル済みのルールから作成する
+        Args:
+            rules (Sequence[RecurrenceRule]): ルールのリスト
+        """
+        self.rules = tuple(rules)
+
+    @classmethod
+    def fromJson(cls, rules) -> 'RecurrenceSet':
+        """
+        JSON のルールの配列から作成する
+        Args:
+            rules (list): ルールの辞書の配列
+        Returns:
+            RecurrenceSet: コンパイルしたルール全体
+        Raises:
+            ValueError: ルールが不正な場合
+        """
+        if not isinstance(rules, list):
+            raise ValueError('recurrence はルールの配列で指定してください')
+        return cls([RecurrenceRule.fromDict(rule) for rule in rules])
+
+    @classmethod
+    def fromLegacy(cls, days: Iterable[str], specialDays: Iterable[str]) -> 'RecurrenceSet':
+        """
+        従来の回収曜日と特別回収日からルールを作成する
+        特別回収日が登録されている場合はその日だけが回収日となり（画面のグレーアウト表示と同じ扱い）、
+        登録がない場合は回収曜日の毎週が回収日となる。解釈できない曜日名・日付は無視する
+        Args:
+            days (Iterable[str]): 回収曜日名のリスト
+            specialDays (Iterable[str]): 特別回収日（YYYY-MM-DD）のリスト
+        Returns:
+            RecurrenceSet: 同じ回収日を表すルール全体
+        """
+        validDates = []
+        for specialDay in specialDays:
+            try:
+                validDates.append(_parseDate(specialDay, 'special_days').isoformat())
+            except (ValueError, AttributeError):
+                continue
+        if validDates:
+            return cls([RecurrenceRule(FREQ_DATES, dates=validDates)])
+        validDays = [day for day in days if day in WEEKDAYS]
+        return cls([RecurrenceRule(FREQ_WEEKLY, validDays)] if validDays else [])
+
+    def toJson(self) -> List[dict]:
+        """
+        ルール全体を JSON 保存用の配列に変換する
+        Returns:
+            List[dict]: ルールの辞書の配列
+        """
+        return [rule.toDict() for rule in self.rules]
+
+    def matches(self, day: date) -> bool:
+        """
+        指定日が回収日かを判定する
+        Args:
+            day (date): 判定する日付
+        Returns:
+            bool: いずれかのルールに一致する場合は True
+        """
+        return any(rule.matches(day) for rule in self.rules)
+
+    def occurrences(self, startOrdinal: int, endOrdinal: int) -> List[int]:
+        """
+        期間内の回収日を通日の昇順で返す（複数のルールに一致する日は1回だけ返す）
+        Args:
+            startOrdinal (int): 期間の開始日の通日（この日を含む）
+            endOrdinal (int): 期間の終了日の通日（この日を含む）
+        Returns:
+            List[int]: 回収日の通日
+        """
+        if len(self.rules) == 1:
+            return self.rules[0].occurrences(startOrdinal, endOrdinal)
+        return sorted({ordinal for rule in self.rules for ordinal in rule.occurrences(startOrdinal, endOrdinal)})
+
+
+def compressSpecialDays(specialDays: Iterable[str]) -> List[dict]:
+    """
+    列挙された特別回収日を、同じ日付の集合を表す短いルールに変換する
+    隔週（n週ごと）・第n曜日の順に候補を作り、最初の日から最後の日までの一致日が
+    元の日付と完全に一致する候補だけを採用する（該当しない場合は dates のルールのまま残す）
+    Args:
+        specialDays (Iterable[str]): 特別回収日（YYYY-MM-DD）のリスト
+    Returns:
+        List[dict]: ルールの辞書の配列（有効な日付がない場合は空）
+    """
+    legacy = RecurrenceSet.fromLegacy([], specialDays)
+    if not legacy.rules:
+        return []
+    ordinals = legacy.rules[0].dateOrdinals
+    if len(ordinals) < 2:
+        return legacy.toJson()
+
+    first, last = date.fromordinal(ordinals[0]), date.fromordinal(ordinals[-1])
+    days = sorted({WEEKDAYS[(ordinal - 1) % 7] for ordinal in ordinals}, key=WEEKDAYS.index)
+    candidates = []
+    gaps = {b - a for a, b in zip(ordinals, ordinals[1:])}
+    if len(days) == 1 and len(gaps) == 1 and next(iter(gaps)) % 7 == 0:
+        candidates.append(RecurrenceRule(FREQ_WEEKLY, days, next(iter(gaps)) // 7,
+                                         start=first.isoformat(), until=last.isoformat()))
+    weeks = {(date.fromordinal(ordinal).day - 1) // 7 + 1 for ordinal in ordinals}
+    candidates.append(RecurrenceRule(FREQ_MONTHLY, days, weeks=weeks,
+                                     start=first.isoformat(), until=last.isoformat()))
+
+    for candidate in candidates:
+        if tuple(candidate.occurrences(ordinals[0], ordinals[-1])) == ordinals:
+            return [candidate.toDict()]
+    return legacy.toJson()
+
+
+def dumpRecurrence(rules) -> Optional[str]:
+    """
+    APIやインポートで受け取ったルールの配列を検証し、recurrence カラムに保存する JSON 文字列に変換する
+    Args:
+        rules (list): ルールの辞書の配列（None または空の場合はルールなし）
+    Returns:
+        str: 正規化したルールの JSON 文字列（ルールなしの場合は None）
+    Raises:
+        ValueError: ルールが不正な場合
+    """
+    if not rules:
+        return None
+    return json.dumps(RecurrenceSet.fromJson(rules).toJson(), ensure_ascii=False)
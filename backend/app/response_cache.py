@@ -0,0 +1,109 @@
+"""
+エンコード済みレスポンスのキャッシュを提供するモジュール
+JSON・iCalendarのバイト列と、その gzip / brotli 圧縮版をバイト数上限付きのLRUで保持する
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    import brotli  # 任意の依存ライブラリ（未インストールの場合は gzip のみ提供する）
+except ImportError:
+    brotli = None
+
+# 圧縮形式と、ETagに付加する接尾辞
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+class CachedBody:
+    """
+    1件のレスポンスボディと、その圧縮版を保持するクラス
+    """
+    __slots__ = ('variants', 'size')
+
+    def __init__(self, body: bytes, compress: bool = True):
+        """
+        エンコード済みのボディから各圧縮形式の版を作成する
+        Args:
+            body (bytes): エンコード済みのボディ
+            compress (bool): 圧縮版を作成するか（False の場合は無圧縮の版のみ保持する）
+        """
+        self.variants = {'identity': body}
+        if compress:
+            self.variants['gzip'] = gzip.compress(body, compresslevel=6)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(body, quality=5)
+        self.size = sum(len(variant) for variant in self.variants.values())
+
+    def select(self, acceptEncodings) -> Tuple[str, bytes]:
+        """
+        クライアントが受け入れる圧縮形式のうち、最も小さくなるものを選ぶ
+        Args:
+            acceptEncodings: リクエストの Accept-Encoding（werkzeug の Accept オブジェクト）
+        Returns:
+            Tuple[str, bytes]: (圧縮形式, ボディ)
+        """
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and acceptEncodings[encoding]:
+                return encoding, self.variants[encoding]
+        return 'identity', self.variants['identity']
+
+
+class ResponseCache:
+    """
+    エンコード済みレスポンスをバイト数の上限付きで保持するLRUキャッシュクラス
+    キーにカタログのバージョンを含めるため、古いバージョンの項目は参照されずに追い出される
+    """
+
+    def __init__(self, maxBytes: int):
+        """
+        キャッシュを作成する
+        Args:
+            maxBytes (int): 保持するボディの合計バイト数の上限（0 の場合はキャッシュしない）
+        """
+        self.maxBytes = maxBytes
+        self.totalBytes = 0
+        self.entries: 'OrderedDict[str, CachedBody]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedBody]:
+        """
+        キャッシュされたボディを取得し、最近使用したものとして記録する
+        Args:
+            key (str): キャッシュキー
+        Returns:
+            CachedBody: キャッシュされたボディ（ない場合は None）
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, body: bytes) -> CachedBody:
+        """
+        ボディを圧縮版とともにキャッシュに追加し、上限を超えた分を古い順に追い出す
+        Args:
+            key (str): キャッシュキー
+            body (bytes): エンコード済みのボディ
+        Returns:
+            CachedBody: 追加したボディ（上限を超える大きさの場合は保持せずに返す）
+        """
+        # 無圧縮の版だけで上限を超える場合は、捨てることになる圧縮版を作らない
+        if len(body) > self.maxBytes:
+            return CachedBody(body, compress=False)
+        entry = CachedBody(body)
+        if entry.size > self.maxBytes:
+            return entry
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.totalBytes -= previous.size
+            self.entries[key] = entry
+            self.totalBytes += entry.size
+            while self.totalBytes > self.maxBytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.totalBytes -= evicted.size
+        return entry
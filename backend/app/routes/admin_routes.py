@@ -3,14 +3,39 @@
 CRUD操作とデータのインポート・エクスポート機能を提供
 """
 
-from flask import Blueprint, request, jsonify
-from app.models import db, GarbageCategory, GarbageType
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context, url_for
+from app.models import db, GarbageCategory, GarbageType, CollectionException, normalizeDays
 from app.database_manager import DatabaseManager
+from app.export import CatalogExporter
+from app.holidays import HolidayImporter
+from app.batch import BatchConflictError, CategoryBatch
+from app.catalog import getSnapshot, refreshCatalog
+from app.http_cache import catalogJsonResponse
+from app.recurrence import dumpRecurrence
+from app.jobs import JobQueueFullError, getJobManager
 import json
-import os
+import shutil
+import tempfile
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
+def _refresh_after_commit(added_names=None, removed_names=None) -> dict:
+    """
+    書き込みのコミット後にカタログを更新する
+    書き込みはコミット済みのため、更新に失敗しても例外にはせず、レスポンスに含めるエラーを返す
+    （失敗した場合、次回の更新は差分ではなく全件から再構築する）
+    Args:
+        added_names (list): 追加されたゴミ種類名（省略時は全件から再構築する）
+        removed_names (list): 削除されたゴミ種類名
+    Returns:
+        dict: 失敗した場合は {'catalog_refresh_error': エラーメッセージ}、成功した場合は空の辞書
+    """
+    try:
+        refreshCatalog(added_names, removed_names)
+    except Exception as e:
+        return {'catalog_refresh_error': str(e)}
+    return {}
+
 @admin_bp.route('/categories', methods=['GET'])
 def get_all_categories_admin():
     """
@@ -19,19 +44,24 @@ def get_all_categories_admin():
         JSON: カテゴリ一覧（管理用詳細情報含む）
     """
     try:
-        categories = GarbageCategory.query.all()
-        result = []
-        
-        for category in categories:
-            category_data = category.to_dict()
-            category_data['garbage_types_count'] = len(category.garbage_types)
-            result.append(category_data)
+        def build_payload():
+            """管理用カテゴリ一覧のペイロードを生成する"""
+            categories = GarbageCategory.queryWithTypes().order_by(GarbageCategory.id).all()
+            result = []
+            
+            for category in categories:
+                category_data = category.to_dict()
+                category_data['garbage_types_count'] = len(category.garbage_types)
+                result.append(category_data)
+            
+            return {
+                'success': True,
+                'data': result,
+                'total': len(result)
+            }
         
-        return jsonify({
-            'success': True,
-            'data': result,
-            'total': len(result)
-        })
+        # 管理画面からの書き込みはカタログのバージョンを進めるため、変更がなければDBを読まずに 304 を返す
+        return catalogJsonResponse(getSnapshot(), ('admin_categories',), build_payload)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -48,6 +78,7 @@ def create_category():
             "date": "回収曜日",
             "method": "回収方法",
             "special_days": ["特別回収日"],
+            "recurrence": [{"freq": "monthly", "days": ["Wednesday"], "weeks": [2, 4]}],
             "notion": "注意事項",
             "garbage_types": ["ゴミ種類1", "ゴミ種類2"]
         }
@@ -66,6 +97,16 @@ def create_category():
                     'error': f'必須フィールドが不足しています: {field}'
                 }), 400
         
+        # 回収曜日・繰り返しルールの検証
+        try:
+            normalizeDays(data['date'])
+            recurrence = dumpRecurrence(data.get('recurrence'))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
         # 既存カテゴリの重複チェック
         existing = GarbageCategory.query.filter_by(category=data['category']).first()
         if existing:
@@ -75,27 +116,21 @@ def create_category():
             }), 409
         
         # カテゴリを作成
-        # dateフィールドの処理（複数曜日対応）
-        date_value = data['date']
-        if isinstance(date_value, list):
-            # 配列の場合はJSON文字列として保存
-            date_json = json.dumps(date_value)
-        else:
-            # 文字列の場合は配列に変換してからJSON文字列として保存
-            date_json = json.dumps([date_value])
-        
         category = GarbageCategory(
             category=data['category'],
-            date=date_json,
             method=data['method'],
             special_days=json.dumps(data.get('special_days', [])),
+            recurrence=recurrence,
             notion=data.get('notion', '')
         )
+        # dateフィールドの処理（複数曜日対応、collection_days も繰り返しルールの曜日を含めて更新）
+        category.setDays(data['date'])
         
         db.session.add(category)
         db.session.flush()  # IDを取得するため
         
         # ゴミ種類を追加
+        added_names = []
         for garbage_name in data.get('garbage_types', []):
             if garbage_name.strip():  # 空文字列を除外
                 garbage_type = GarbageType(
@@ -103,13 +138,16 @@ def create_category():
                     category_id=category.id
                 )
                 db.session.add(garbage_type)
+                added_names.append(garbage_type.name)
         
         db.session.commit()
+        refresh_error = _refresh_after_commit(added_names, [])
         
         return jsonify({
             'success': True,
             'data': category.to_dict(),
-            'message': 'カテゴリが正常に作成されました'
+            'message': 'カテゴリが正常に作成されました',
+            **refresh_error
         }), 201
         
     except Exception as e:
@@ -132,6 +170,18 @@ def update_category(category_id):
         category = GarbageCategory.query.get_or_404(category_id)
         data = request.get_json()
         
+        # 回収曜日・繰り返しルールの検証（変更を加える前に行う）
+        try:
+            if 'date' in data:
+                normalizeDays(data['date'])
+            if 'recurrence' in data:
+                recurrence = dumpRecurrence(data['recurrence'])
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
         # カテゴリ情報を更新
         if 'category' in data:
             # 他のカテゴリと重複しないかチェック
@@ -146,15 +196,14 @@ def update_category(category_id):
                 }), 409
             category.category = data['category']
         
+        if 'recurrence' in data:
+            category.recurrence = recurrence
         if 'date' in data:
-            # dateフィールドの処理（複数曜日対応）
-            date_value = data['date']
-            if isinstance(date_value, list):
-                # 配列の場合はJSON文字列として保存
-                category.date = json.dumps(date_value)
-            else:
-                # 文字列の場合は配列に変換してからJSON文字列として保存
-                category.date = json.dumps([date_value])
+            # dateフィールドの処理（複数曜日対応、collection_days も繰り返しルールの曜日を含めて更新）
+            category.setDays(data['date'])
+        elif 'recurrence' in data:
+            # 繰り返しルールの曜日を collection_days に反映する
+            category.syncCollectionDays()
         if 'method' in data:
             category.method = data['method']
         if 'special_days' in data:
@@ -162,26 +211,24 @@ def update_category(category_id):
         if 'notion' in data:
             category.notion = data['notion']
         
-        # ゴミ種類を更新
+        # ゴミ種類を更新（追加・削除された名前だけを書き込む）
+        added_names = []
+        removed_names = []
         if 'garbage_types' in data:
-            # 既存のゴミ種類を削除
-            GarbageType.query.filter_by(category_id=category_id).delete()
-            
-            # 新しいゴミ種類を追加
-            for garbage_name in data['garbage_types']:
-                if garbage_name.strip():
-                    garbage_type = GarbageType(
-                        name=garbage_name.strip(),
-                        category_id=category_id
-                    )
-                    db.session.add(garbage_type)
+            added_names, removed_names = GarbageType.syncNames({category_id: data['garbage_types']})
         
         db.session.commit()
+        refresh_error = _refresh_after_commit(added_names, removed_names)
         
         return jsonify({
             'success': True,
             'data': category.to_dict(),
-            'message': 'カテゴリが正常に更新されました'
+            'changes': {
+                'added_garbage_types': added_names,
+                'removed_garbage_types': removed_names
+            },
+            'message': 'カテゴリが正常に更新されました',
+            **refresh_error
         })
         
     except Exception as e:
@@ -203,14 +250,17 @@ def delete_category(category_id):
     try:
         category = GarbageCategory.query.get_or_404(category_id)
         category_name = category.category
+        removed_names = [gt.name for gt in category.garbage_types]
         
         # 関連するゴミ種類も自動的に削除される（cascade設定による）
         db.session.delete(category)
         db.session.commit()
+        refresh_error = _refresh_after_commit([], removed_names)
         
         return jsonify({
             'success': True,
-            'message': f'カテゴリ「{category_name}」が正常に削除されました'
+            'message': f'カテゴリ「{category_name}」が正常に削除されました',
+            **refresh_error
         })
         
     except Exception as e:
@@ -220,20 +270,88 @@ def delete_category(category_id):
             'error': str(e)
         }), 500
 
+@admin_bp.route('/batch', methods=['POST'])
+def apply_batch():
+    """
+    複数カテゴリの作成・更新・削除を1回のリクエスト・1つのトランザクションで反映
+    Request Body:
+        {
+            "operations": [
+                {"op": "create", "data": {"category": "カテゴリ名", "date": ["Monday"], "method": "回収方法"}},
+                {"op": "update", "id": 1, "data": {"garbage_types": ["ゴミ種類1"]}},
+                {"op": "delete", "id": 2}
+            ]
+        }
+    操作は指定順に適用した結果として検証し、1件でもエラーがあれば何も反映しない
+    Returns:
+        JSON: 操作ごとの結果（作成したカテゴリのIDを含む）と件数
+    """
+    try:
+        request_data = request.get_json(silent=True)
+        operations = request_data.get('operations') if isinstance(request_data, dict) else None
+        if not isinstance(operations, list) or not operations:
+            return jsonify({
+                'success': False,
+                'error': '操作の一覧（operations）を指定してください'
+            }), 400
+        
+        max_operations = current_app.config['ADMIN_BATCH_MAX_OPERATIONS']
+        if len(operations) > max_operations:
+            return jsonify({
+                'success': False,
+                'error': f'1回に指定できる操作は{max_operations}件までです'
+            }), 400
+        
+        result = CategoryBatch(operations).apply()
+        # キャッシュとカタログの更新は一括操作全体で1回だけ行う
+        refresh_error = _refresh_after_commit(result['added_garbage_types'], result['removed_garbage_types'])
+        
+        return jsonify({
+            'success': True,
+            'data': result,
+            'message': f"{len(operations)}件の操作を反映しました",
+            **refresh_error
+        })
+    except BatchConflictError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 409
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @admin_bp.route('/export', methods=['GET'])
 def export_data():
     """
     データベースの内容をJSONとしてエクスポート
+    カテゴリを1件ずつ読み込みながら、バックアップファイルへの書き込みと
+    チャンク形式のレスポンスを同時に行い、全データをメモリに保持しない
     Returns:
         JSON: エクスポートされたデータ
     """
     try:
-        export_data = DatabaseManager.export_to_json()
-        return jsonify({
-            'success': True,
-            'data': export_data,
-            'message': 'データのエクスポートが完了しました'
-        })
+        # 件数の取得やファイル作成のエラーは、送信開始前に 500 として返す
+        metadata = CatalogExporter.exportMetadata()
+        chunks = CatalogExporter.streamExport(CatalogExporter.defaultExportPath(), metadata)
+        # streamExport はジェネレーターのため、最初の断片を取り出してファイルを開いておく
+        first = next(chunks)
+        
+        def generate():
+            """レスポンスの外枠の中にエクスポートデータを順に出力する"""
+            yield '{"success": true, "message": "データのエクスポートが完了しました", "data": '
+            yield first
+            yield from chunks
+            yield '}\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/json')
     except Exception as e:
         return jsonify({
             'success': False,
@@ -247,76 +365,197 @@ def import_data():
     Request Body:
         {
             "data": {JSON形式のデータ},
-            "clear_existing": true/false
+            "clear_existing": true/false,
+            "background": true/false
         }
+    Content-Type が application/x-ndjson の場合は、1行に1カテゴリのJSONを
+    リクエストのストリームから1行ずつ読みながらインポートする（clear_existing はクエリパラメータで指定）
+    background（JSONの場合はボディ、NDJSONの場合はクエリパラメータ）が true の場合は
+    バックグラウンドのジョブとして実行し、ジョブIDを 202 で直ちに返す（進捗は /jobs/<job_id> で取得する）
     Returns:
-        JSON: インポート結果
+        JSON: インポート結果、またはジョブ情報
     """
     try:
-        request_data = request.get_json()
-        
-        if 'data' not in request_data:
-            return jsonify({
-                'success': False,
-                'error': 'インポートするデータが指定されていません'
-            }), 400
-        
-        clear_existing = request_data.get('clear_existing', False)
-        import_data = request_data['data']
-        
-        # 一時ファイルに保存してインポート
-        temp_file = 'temp_import.json'
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(import_data, f, ensure_ascii=False, indent=2)
+        if request.mimetype == 'application/x-ndjson':
+            clear_existing = request.args.get('clear_existing', 'false').lower() == 'true'
+            background = request.args.get('background', 'false').lower() == 'true'
+            if background:
+                # レスポンスを返した後はリクエストのストリームを読めないため、受信済みのデータを退避する
+                spool = tempfile.SpooledTemporaryFile(max_size=current_app.config['IMPORT_SPOOL_MAX_BYTES'])
+                shutil.copyfileobj(request.stream, spool)
+                spool.seek(0)
+                return _submit_import_job(
+                    lambda progress: DatabaseManager.import_ndjson_stream(spool, clear_existing, progress),
+                    spool.close)
+            result = DatabaseManager.import_ndjson_stream(request.stream, clear_existing)
+        else:
+            request_data = request.get_json()
+            
+            if 'data' not in request_data:
+                return jsonify({
+                    'success': False,
+                    'error': 'インポートするデータが指定されていません'
+                }), 400
+            
+            clear_existing = request_data.get('clear_existing', False)
+            if request_data.get('background', False):
+                data = request_data['data']
+                return _submit_import_job(
+                    lambda progress: DatabaseManager.import_data(data, clear_existing, progress))
+            # 受け取ったデータをそのままインポート
+            result = DatabaseManager.import_data(request_data['data'], clear_existing)
         
-        try:
-            result = DatabaseManager.import_from_json(temp_file, clear_existing)
-            return jsonify({
-                'success': True,
-                'data': result,
-                'message': 'データのインポートが完了しました'
-            })
-        finally:
-            # 一時ファイルを削除
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-                
+        refresh_error = _refresh_after_commit()
+        return jsonify({
+            'success': True,
+            'data': result,
+            'message': 'データのインポートが完了しました',
+            **refresh_error
+        })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def _submit_import_job(run_import, cleanup=None):
+    """
+    インポートをバックグラウンドのジョブとして登録し、ジョブ情報を 202 で返す
+    ジョブはコミット後にカタログを更新するため、それまでの読み取りには変更前のデータを返す
+    Args:
+        run_import (Callable): 進捗の通知先を受け取ってインポートを実行し、結果を返す関数
+        cleanup (Callable): ジョブの終了後（または登録に失敗した場合）に呼び出す後処理
+    Returns:
+        Response: ジョブ情報（ジョブが上限に達している場合は 503）
+    """
+    def work(job):
+        """
+        ワーカースレッドでインポートを実行し、コミット後にカタログを更新する
+        インポートはコミット済みのため、カタログの更新に失敗してもジョブは成功とし、
+        そのエラーは結果の catalog_refresh_error に記録する
+        Args:
+            job (ImportJob): 進捗を書き込むジョブ
+        Returns:
+            dict: インポート結果
+        """
+        try:
+            result = run_import(job.updateProgress)
+            return dict(result, **_refresh_after_commit())
+        finally:
+            db.session.remove()
+            if cleanup:
+                cleanup()
+    
+    try:
+        job = getJobManager().submit(current_app._get_current_object(), 'import', work)
+    except JobQueueFullError as e:
+        if cleanup:
+            cleanup()
+        response = jsonify({
+            'success': False,
+            'error': str(e)
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    
+    return jsonify({
+        'success': True,
+        'data': job.toDict(),
+        'message': 'インポートをバックグラウンドで開始しました'
+    }), 202, {'Location': url_for('admin.get_job', job_id=job.id)}
+
+@admin_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    バックグラウンドジョブの状態と進捗を取得
+    Args:
+        job_id (str): ジョブID
+    Returns:
+        JSON: ジョブ情報（状態、処理済みのカテゴリ数・ゴミ種類数、経過時間、完了時の結果）
+    """
+    job = getJobManager().get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'ジョブが見つかりません'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': job.toDict()
+    })
+
 @admin_bp.route('/reset', methods=['POST'])
 def reset_database():
     """
     データベースをデフォルトデータでリセット
+    既存データの削除とデフォルトデータの追加を1つのトランザクションで行う
     Returns:
         JSON: リセット結果
     """
     try:
-        # 既存データを削除
-        db.session.query(GarbageType).delete()
-        db.session.query(GarbageCategory).delete()
-        db.session.commit()
-        
-        # デフォルトデータをインポート
-        default_data = DatabaseManager.get_default_data()
-        temp_file = 'temp_default.json'
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(default_data, f, ensure_ascii=False, indent=2)
-        
-        try:
-            result = DatabaseManager.import_from_json(temp_file, clear_existing=False)
-            return jsonify({
-                'success': True,
-                'data': result,
-                'message': 'データベースがデフォルトデータでリセットされました'
-            })
-        finally:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-                
+        result = DatabaseManager.import_data(DatabaseManager.get_default_data(), clear_existing=True)
+        refresh_error = _refresh_after_commit()
+        return jsonify({
+            'success': True,
+            'data': result,
+            'message': 'データベースがデフォルトデータでリセットされました',
+            **refresh_error
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/holidays', methods=['GET'])
+def get_holidays():
+    """
+    登録されている休止・振替の一覧を日付順に取得
+    Returns:
+        JSON: 休止・振替の一覧
+    """
+    try:
+        exceptions = CollectionException.query.order_by(CollectionException.date, CollectionException.id).all()
+        return jsonify({
+            'success': True,
+            'data': [exception.to_dict() for exception in exceptions],
+            'total': len(exceptions)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@admin_bp.route('/holidays/reload', methods=['POST'])
+def reload_holidays():
+    """
+    設定ファイル（HOLIDAYS_FILE）から休止・振替を読み込み直し、回収カレンダーを作り直す
+    Returns:
+        JSON: インポート結果
+    """
+    try:
+        result = HolidayImporter.importFromJson(str(current_app.config['HOLIDAYS_FILE']))
+        refresh_error = _refresh_after_commit()
+        return jsonify({
+            'success': True,
+            'data': result,
+            'message': '休止・振替の読み込みが完了しました',
+            **refresh_error
+        })
+    except (FileNotFoundError, ValueError) as e:
+        db.session.rollback()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({
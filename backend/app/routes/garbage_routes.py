@@ -3,54 +3,87 @@
 曜日別のゴミ情報取得と逆検索機能を提供する
 """
 
-from flask import Blueprint, jsonify, request
-from app.models import db, GarbageCategory, GarbageType
-from datetime import datetime
+from flask import Blueprint, current_app, jsonify, request
+from app.catalog import getSnapshot, getNextCollectionIndex, withNextCollection
+from app.http_cache import catalogJsonResponse, catalogStreamedResponse
+from app.ical import iterCalendar
+from app.models import WEEKDAYS
+from app.schedule import parseIsoDate
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Any
-import json
 
 garbage_bp = Blueprint('garbage', __name__)
 
 
+def buildSearchHits(hits: List[tuple], snapshot, categories: Dict[int, dict]) -> List[Dict[str, Any]]:
+    """
+    検索結果をレスポンス用のヒット情報に変換する
+    ヒットしたゴミ種類の所属カテゴリは categories に1回だけ追加し、ヒットからはIDで参照する
+    追加するカテゴリ情報には次の回収日（next_collection）を付加する
+    Args:
+        hits (List[tuple]): CatalogSnapshot.searchTypes() が返す (一致の種類, ゴミ種類) のリスト
+        snapshot (CatalogSnapshot): 検索に使用したスナップショット
+        categories (Dict[int, dict]): カテゴリIDをキーとするカテゴリ情報（追加される）
+    Returns:
+        List[Dict[str, Any]]: ヒット情報のリスト
+    """
+    next_index = getNextCollectionIndex(snapshot)
+    results = []
+    for match, garbage_type in hits:
+        category_id = garbage_type['category_id']
+        results.append({
+            'garbage_type': garbage_type,
+            'category_id': category_id,
+            'match': match
+        })
+        if category_id not in categories:
+            categories[category_id] = withNextCollection(snapshot.categoryById[category_id], next_index)
+    return results
+
+
 @garbage_bp.route('/api/categories', methods=['GET'])
 def getCategoriesByDay():
     """
     指定された曜日のゴミカテゴリ情報を取得する
     クエリパラメータで曜日を指定しない場合は全曜日の情報を返す
+    date を指定した場合は、その日に実際に回収されるカテゴリ（祝日・年末年始の休止・振替を反映済み）を返す
+    各カテゴリには次の回収日（next_collection）を付加する
+    Args:
+        day (str): 曜日名（例: Monday）
+        date (str): 日付 YYYY-MM-DD
     Returns:
         JSON: カテゴリ情報のリスト
     """
     day = request.args.get('day')
+    on_date = parseIsoDate(request.args['date']) if 'date' in request.args else None
+    if 'date' in request.args and on_date is None:
+        return jsonify({
+            'success': False,
+            'error': 'date は YYYY-MM-DD 形式で指定してください'
+        }), 400
     
     try:
-        if day:
-            # 複数曜日対応：指定された曜日が含まれるカテゴリを抽出
-            all_categories = GarbageCategory.query.all()
-            filtered_categories = []
-            
-            for category in all_categories:
-                try:
-                    date_list = json.loads(category.date)
-                    # 後方互換性のため、文字列の場合も対応
-                    if isinstance(date_list, str):
-                        date_list = [date_list]
-                    
-                    if day in date_list:
-                        filtered_categories.append(category)
-                        
-                except json.JSONDecodeError:
-                    # JSONでない場合は単一の文字列として比較
-                    if category.date == day:
-                        filtered_categories.append(category)
-            
-            categories = filtered_categories
-        else:
-            categories = GarbageCategory.query.all()
-            
-        return jsonify({
-            'success': True,
-            'data': [category.to_dict() for category in categories]
-        })
+        snapshot = getSnapshot()
+        
+        def buildPayload() -> dict:
+            """カテゴリ一覧のペイロードを生成する"""
+            if on_date:
+                # 事前計算済みの回収カレンダーから抽出
+                categories = snapshot.getCategoriesOn(on_date)
+            elif day:
+                # 複数曜日対応：スナップショットの曜日バケットから抽出
+                categories = snapshot.getCategoriesByDay(day)
+            else:
+                categories = snapshot.categories
+            next_index = getNextCollectionIndex(snapshot)
+            return {
+                'success': True,
+                'data': [withNextCollection(category, next_index) for category in categories]
+            }
+        
+        # カタログが変わっていなければ 304 を返す
+        # 次の回収日は今日を基準にするため、ETagのキーに今日の日付を含める
+        return catalogJsonResponse(snapshot, ('categories', day, on_date, date.today()), buildPayload)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -61,39 +94,179 @@ def getCategoriesByDay():
 @garbage_bp.route('/api/categories/today', methods=['GET'])
 def getTodayCategories():
     """
-    今日の曜日に対応するゴミカテゴリ情報を取得する
+    今日回収されるゴミカテゴリ情報を取得する
+    祝日・年末年始の休止・振替を反映した、事前計算済みの回収カレンダーから応答する
+    各カテゴリには次の回収日（next_collection）を付加する
     Returns:
         JSON: 今日のカテゴリ情報のリスト
     """
     try:
-        # 現在の曜日を取得
-        today = datetime.now().strftime('%A')  # Monday, Tuesday, etc.
+        # 現在の日付と曜日を取得
+        now = datetime.now()
+        today = now.strftime('%A')  # Monday, Tuesday, etc.
         
-        # 複数曜日対応：dateフィールドがJSONで格納されているため
-        # すべてのカテゴリを取得して、今日の曜日が含まれているものを抽出
-        all_categories = GarbageCategory.query.all()
-        today_categories = []
+        snapshot = getSnapshot()
         
-        for category in all_categories:
-            try:
-                date_list = json.loads(category.date)
-                # 後方互換性のため、文字列の場合も対応
-                if isinstance(date_list, str):
-                    date_list = [date_list]
-                
-                if today in date_list:
-                    today_categories.append(category)
-                    
-            except json.JSONDecodeError:
-                # JSONでない場合は単一の文字列として比較
-                if category.date == today:
-                    today_categories.append(category)
+        def buildPayload() -> dict:
+            """今日のカテゴリのペイロードを生成する"""
+            next_index = getNextCollectionIndex(snapshot)
+            return {
+                'success': True,
+                'today': today,
+                'date': now.date().isoformat(),
+                # 回収カレンダーから今日の回収カテゴリを抽出
+                'data': [withNextCollection(category, next_index)
+                         for category in snapshot.getCategoriesOn(now.date())]
+            }
         
+        # 日付が変わるとレスポンスも変わるため、ETagのキーに日付を含める
+        return catalogJsonResponse(snapshot, ('today', now.date()), buildPayload)
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'today': today,
-            'data': [category.to_dict() for category in today_categories]
-        })
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@garbage_bp.route('/api/week', methods=['GET'])
+def getWeekSchedule():
+    """
+    月曜日〜日曜日の全曜日のゴミカテゴリ情報をまとめて取得する
+    メイン画面の初回表示を1回のリクエストで行うために使用する
+    カテゴリ情報は categories にカテゴリIDをキーとして1回ずつ格納し、各曜日からはIDで参照する
+    今日から7日間の各曜日の日付と、その日に実際に回収されるカテゴリ（隔週・第n曜日などのルールと
+    祝日・年末年始の休止・振替を適用済み）も返す
+    各カテゴリには次の回収日（next_collection）を付加する
+    Returns:
+        JSON: 曜日ごとのカテゴリIDと、今日・明日の曜日、今週の日付と回収カテゴリ、カテゴリ情報
+    """
+    try:
+        now = datetime.now()
+        today = now.strftime('%A')
+        snapshot = getSnapshot()
+        
+        def buildPayload() -> dict:
+            """全曜日のスケジュールのペイロードを生成する"""
+            start = now.date()
+            week_dates = {WEEKDAYS[(start + timedelta(days=offset)).weekday()]: start + timedelta(days=offset)
+                          for offset in range(7)}
+            pickups = snapshot.calendar.expand(start, start + timedelta(days=6))
+            collecting = {pickup_date: category_ids for pickup_date, category_ids in pickups}
+            next_index = getNextCollectionIndex(snapshot)
+            return {
+                'success': True,
+                'today': today,
+                'tomorrow': (now + timedelta(days=1)).strftime('%A'),
+                'days': {day: list(snapshot.categoryIdsByDay.get(day, ())) for day in WEEKDAYS},
+                'dates': {day: week_dates[day].isoformat() for day in WEEKDAYS},
+                'collecting': {day: collecting.get(week_dates[day], []) for day in WEEKDAYS},
+                'categories': {category['id']: withNextCollection(category, next_index)
+                               for category in snapshot.categories}
+            }
+        
+        # 日付が変わるとレスポンスも変わるため、ETagのキーに日付を含める
+        return catalogJsonResponse(snapshot, ('week', now.date()), buildPayload)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@garbage_bp.route('/api/schedule', methods=['GET'])
+def getSchedule():
+    """
+    指定期間の具体的な回収日を取得する
+    休止・振替を反映した回収カレンダーから、回収のある日だけを日付順に返す
+    カテゴリ情報は categories にカテゴリIDをキーとして1回ずつ格納し、各日付からはIDで参照する
+    Args:
+        from (str): 期間の開始日 YYYY-MM-DD（省略時は今日）
+        to (str): 期間の終了日 YYYY-MM-DD（省略時は開始日の6日後、期間の上限は SCHEDULE_MAX_DAYS）
+    Returns:
+        JSON: 回収日ごとのカテゴリIDとカテゴリ情報
+    """
+    start = parseIsoDate(request.args['from']) if 'from' in request.args else date.today()
+    end = parseIsoDate(request.args['to']) if 'to' in request.args else (start and start + timedelta(days=6))
+    
+    if start is None or end is None:
+        return jsonify({
+            'success': False,
+            'error': 'from / to は YYYY-MM-DD 形式で指定してください'
+        }), 400
+    max_days = current_app.config['SCHEDULE_MAX_DAYS']
+    if end < start or (end - start).days >= max_days:
+        return jsonify({
+            'success': False,
+            'error': f'期間は from 以降の日付で、{max_days}日以内で指定してください'
+        }), 400
+    
+    try:
+        snapshot = getSnapshot()
+        
+        def buildPayload() -> dict:
+            """回収日一覧のペイロードを生成する"""
+            pickups = snapshot.calendar.expand(start, end)
+            used_ids = {category_id for _, category_ids in pickups for category_id in category_ids}
+            return {
+                'success': True,
+                'from': start.isoformat(),
+                'to': end.isoformat(),
+                'data': [{
+                    'date': pickup_date.isoformat(),
+                    'day': WEEKDAYS[pickup_date.weekday()],
+                    'category_ids': category_ids
+                } for pickup_date, category_ids in pickups],
+                'categories': {category_id: snapshot.categoryById[category_id] for category_id in used_ids}
+            }
+        
+        return catalogJsonResponse(snapshot, ('schedule', start, end), buildPayload)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@garbage_bp.route('/api/calendar.ics', methods=['GET'])
+def getCalendarFeed():
+    """
+    今日から一定期間の回収予定を iCalendar 形式で取得する
+    スマートフォンのカレンダーアプリから購読するためのフィード
+    カタログと日付が変わらない限り同じETagを返すため、定期的な同期は 304 で応答する
+    エンコード済みのフィードはETagをキーにキャッシュし、条件なしの取得でも作り直さない
+    キャッシュの上限を超える大きさのフィードは、まとめずに予定を生成しながら送信する
+    Args:
+        category (int): 出力するカテゴリID（複数指定可、省略時は全カテゴリ）
+        days (int): 出力する日数（省略時は ICAL_HORIZON_DAYS、上限は SCHEDULE_MAX_DAYS）
+    Returns:
+        text/calendar: iCalendar 形式の回収予定
+    """
+    days = request.args.get('days', current_app.config['ICAL_HORIZON_DAYS'], type=int)
+    max_days = current_app.config['SCHEDULE_MAX_DAYS']
+    if not 1 <= days <= max_days:
+        return jsonify({
+            'success': False,
+            'error': f'days は1〜{max_days}の整数で指定してください'
+        }), 400
+    
+    try:
+        snapshot = getSnapshot()
+        category_ids = None
+        if 'category' in request.args:
+            category_ids = sorted(set(request.args.getlist('category', type=int)))
+            if not category_ids or any(category_id not in snapshot.categoryById for category_id in category_ids):
+                return jsonify({
+                    'success': False,
+                    'error': 'category には登録済みのカテゴリIDを指定してください'
+                }), 400
+        
+        start = date.today()
+        end = start + timedelta(days=days - 1)
+        response = catalogStreamedResponse(snapshot, ('ical', tuple(category_ids or ()), days, start),
+                                           lambda: iterCalendar(snapshot, start, end, category_ids),
+                                           'text/calendar')
+        response.headers['Content-Disposition'] = 'inline; filename="garbage.ics"'
+        return response
     except Exception as e:
         return jsonify({
             'success': False,
@@ -105,8 +278,12 @@ def getTodayCategories():
 def searchGarbageType():
     """
     ゴミの種類名で逆検索を行う
+    完全一致 → 前方一致 → 部分一致 → あいまい一致 の順に順位付けし、limit/offset の範囲を返す
+    カテゴリ情報は categories にカテゴリIDをキーとして1回ずつ格納し、各ヒットはIDで参照する
     Args:
         q (str): 検索するゴミの種類名
+        limit (int): 返す件数（省略時は SEARCH_DEFAULT_LIMIT、上限は SEARCH_MAX_LIMIT）
+        offset (int): 先頭から読み飛ばす件数
     Returns:
         JSON: 検索結果とカテゴリ情報
     """
@@ -118,32 +295,144 @@ def searchGarbageType():
             'error': 'Search query is required'
         }), 400
     
+    limit = request.args.get('limit', current_app.config['SEARCH_DEFAULT_LIMIT'], type=int)
+    offset = request.args.get('offset', 0, type=int)
+    if limit < 1 or offset < 0:
+        return jsonify({
+            'success': False,
+            'error': 'limit は1以上、offset は0以上の整数で指定してください'
+        }), 400
+    limit = min(limit, current_app.config['SEARCH_MAX_LIMIT'])
+    
     try:
-        # ゴミの種類名で部分一致検索
-        garbage_types = GarbageType.query.filter(
-            GarbageType.name.contains(query)
-        ).all()
+        snapshot = getSnapshot()
         
-        if not garbage_types:
-            return jsonify({
+        def buildPayload() -> dict:
+            """検索結果のペイロードを生成する"""
+            # ゴミの種類名で検索し、上位 limit 件を取得
+            hits, total = snapshot.searchTypes(query, limit, offset)
+            
+            if not total:
+                return {
+                    'success': True,
+                    'found': False,
+                    'message': f'「{query}」に関するゴミ情報が見つかりませんでした'
+                }
+            
+            # 見つかったゴミ種類と、そのカテゴリ情報（重複なし）を返す
+            categories = {}
+            results = buildSearchHits(hits, snapshot, categories)
+            
+            return {
                 'success': True,
-                'found': False,
-                'message': f'「{query}」に関するゴミ情報が見つかりませんでした'
-            })
+                'found': True,
+                'query': query,
+                'total': total,
+                'limit': limit,
+                'offset': offset,
+                'data': results,
+                'categories': categories
+            }
         
-        # 見つかったゴミ種類とそのカテゴリ情報を返す
+        # next_collection は日付で変わるため、ETagのキーに日付を含める
+        return catalogJsonResponse(snapshot, ('search', query, limit, offset, date.today()), buildPayload)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@garbage_bp.route('/api/search/batch', methods=['POST'])
+def searchGarbageTypeBatch():
+    """
+    複数のゴミの種類名をまとめて逆検索する
+    買い物リストや引っ越しの持ち物などを1回のリクエストで確認するために使用する
+    同じ検索語は1回だけ検索し、カテゴリ情報は全検索語で共有して1回ずつ返す
+    Request Body:
+        {
+            "queries": ["ペットボトル", "電池", ...],
+            "limit": 検索語ごとの件数（省略時は SEARCH_DEFAULT_LIMIT）
+        }
+    Returns:
+        JSON: 検索語ごとの検索結果とカテゴリ情報
+    """
+    data = request.get_json(silent=True) or {}
+    queries = data.get('queries')
+    
+    if not isinstance(queries, list) or not queries:
+        return jsonify({
+            'success': False,
+            'error': 'queries に検索語の配列を指定してください'
+        }), 400
+    if len(queries) > current_app.config['SEARCH_BATCH_MAX_QUERIES']:
+        return jsonify({
+            'success': False,
+            'error': f'検索語は{current_app.config["SEARCH_BATCH_MAX_QUERIES"]}件以内で指定してください'
+        }), 400
+    
+    limit = data.get('limit', current_app.config['SEARCH_DEFAULT_LIMIT'])
+    if not isinstance(limit, int) or limit < 1:
+        return jsonify({
+            'success': False,
+            'error': 'limit は1以上の整数で指定してください'
+        }), 400
+    limit = min(limit, current_app.config['SEARCH_MAX_LIMIT'])
+    
+    try:
+        snapshot = getSnapshot()
+        categories = {}
+        resultsByQuery = {}
         results = []
-        for garbage_type in garbage_types:
-            results.append({
-                'garbage_type': garbage_type.to_dict(),
-                'category': garbage_type.category_ref.to_dict() if garbage_type.category_ref else None
-            })
+        for rawQuery in queries:
+            query = str(rawQuery).strip()
+            if query not in resultsByQuery:
+                hits, total = snapshot.searchTypes(query, limit) if query else ([], 0)
+                resultsByQuery[query] = {
+                    'query': query,
+                    'found': total > 0,
+                    'total': total,
+                    'hits': buildSearchHits(hits, snapshot, categories)
+                }
+            results.append(resultsByQuery[query])
         
         return jsonify({
             'success': True,
-            'found': True,
-            'query': query,
-            'data': results
+            'data': results,
+            'categories': categories
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@garbage_bp.route('/api/search/suggest', methods=['GET'])
+def suggestGarbageType():
+    """
+    入力途中の文字列に前方一致するゴミの種類名を補完候補として返す
+    検索ボックスの入力ごとに呼び出せるよう、整列済みの索引を二分探索して応答する
+    Args:
+        prefix (str): 入力途中の文字列
+        limit (int): 返す件数（省略時は SUGGEST_DEFAULT_LIMIT、上限は SUGGEST_MAX_LIMIT）
+    Returns:
+        JSON: 補完候補の名前のリスト
+    """
+    prefix = request.args.get('prefix', '').strip()
+    limit = request.args.get('limit', current_app.config['SUGGEST_DEFAULT_LIMIT'], type=int)
+    if limit < 1:
+        return jsonify({
+            'success': False,
+            'error': 'limit は1以上の整数で指定してください'
+        }), 400
+    limit = min(limit, current_app.config['SUGGEST_MAX_LIMIT'])
+    
+    try:
+        return jsonify({
+            'success': True,
+            'prefix': prefix,
+            'data': getSnapshot().prefixIndex.complete(prefix, limit)
         })
     except Exception as e:
         return jsonify({
@@ -155,18 +444,25 @@ def searchGarbageType():
 @garbage_bp.route('/api/categories/<int:categoryId>', methods=['GET'])
 def getCategoryById(categoryId: int):
     """
-    指定されたIDのカテゴリ情報を取得する
+    指定されたIDのカテゴリ情報を、次の回収日（next_collection）付きで取得する
     Args:
         categoryId (int): カテゴリID
     Returns:
         JSON: カテゴリ情報
     """
     try:
-        category = GarbageCategory.query.get_or_404(categoryId)
+        snapshot = getSnapshot()
+        category = snapshot.categoryById.get(categoryId)
+        if category is None:
+            return jsonify({
+                'success': False,
+                'error': 'カテゴリが見つかりません'
+            }), 404
         
-        return jsonify({
+        # next_collection は日付で変わるため、ETagのキーに日付を含める
+        return catalogJsonResponse(snapshot, ('category', categoryId, date.today()), lambda: {
             'success': True,
-            'data': category.to_dict()
+            'data': withNextCollection(category, getNextCollectionIndex(snapshot))
         })
     except Exception as e:
         return jsonify({
@@ -0,0 +1,248 @@
+"""
+ゴミカテゴリの回収ルールを具体的な回収日に展開するモジュール
+回収ルールは app.recurrence の繰り返しルールにコンパイルし、日付の通日（ordinal）に対する
+等差数列・月ごとの算出・二分探索で、1日ずつの繰り返し判定を行わずに期間内の回収日を求める
+祝日・年末年始の休止・振替は、年単位で事前計算する回収カレンダーに反映する
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.recurrence import RecurrenceSet
+
+# 回収カレンダーをキャッシュする年数の上限
+CALENDAR_CACHE_YEARS = 8
+
+
+def parseIsoDate(value: str):
+    """
+    YYYY-MM-DD 形式の文字列を日付に変換する
+    Args:
+        value (str): 日付文字列
+    Returns:
+        date: 変換した日付（形式が不正な場合は None）
+    """
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+class CategorySchedule:
+    """
+    1カテゴリの回収ルールをコンパイルした結果を保持するクラス
+    繰り返しルール（recurrence）が登録されている場合はそれに従い、
+    登録がない場合は回収曜日と特別回収日から作成したルールに従う
+    """
+    __slots__ = ('categoryId', 'recurrence')
+
+    def __init__(self, categoryId: int, recurrence: RecurrenceSet):
+        """
+        カテゴリIDとコンパイル済みのルールから作成する
+        Args:
+            categoryId (int): カテゴリID
+            recurrence (RecurrenceSet): 回収ルール
+        """
+        self.categoryId = categoryId
+        self.recurrence = recurrence
+
+    @classmethod
+    def fromCategory(cls, category: dict) -> 'CategorySchedule':
+        """
+        シリアライズ済みのカテゴリ（to_dict() の結果）からルールを作成する
+        保存済みの繰り返しルールが解釈できない場合は、回収曜日と特別回収日から作成する
+        Args:
+            category (dict): カテゴリ情報
+        Returns:
+            CategorySchedule: コンパイルしたルール
+        """
+        if category.get('recurrence'):
+            try:
+                return cls(category['id'], RecurrenceSet.fromJson(category['recurrence']))
+            except ValueError:
+                pass
+        return cls(category['id'], RecurrenceSet.fromLegacy(category.get('date') or [],
+                                                            category.get('special_days') or []))
+
+    def matches(self, day: date) -> bool:
+        """
+        指定日が回収日かを判定する
+        Args:
+            day (date): 判定する日付
+        Returns:
+            bool: 回収日の場合は True
+        """
+        return self.recurrence.matches(day)
+
+    def occurrences(self, startOrdinal: int, endOrdinal: int) -> List[int]:
+        """
+        期間内の回収日を通日の昇順で返す
+        Args:
+            startOrdinal (int): 期間の開始日の通日（この日を含む）
+            endOrdinal (int): 期間の終了日の通日（この日を含む）
+        Returns:
+            List[int]: 回収日の通日
+        """
+        return self.recurrence.occurrences(startOrdinal, endOrdinal)
+
+
+class CollectionCalendar:
+    """
+    祝日・年末年始などの休止・振替を反映した回収カレンダーを年単位で事前計算するクラス
+    年ごとに「通日 → その日に回収されるカテゴリID」の表と、カテゴリごとの整列済み回収日を保持し、
+    日付・期間の問い合わせには表の参照と二分探索だけで応答する（年の表は初回参照時に作成する）
+    """
+    __slots__ = ('schedules', 'exceptionsByOrdinal', 'movesByTarget', 'years')
+
+    def __init__(self, schedules: Sequence[CategorySchedule],
+                 exceptions: Iterable[Tuple[str, Optional[int], str, Optional[str]]] = ()):
+        """
+        カテゴリごとのルールと休止・振替の一覧から作成する
+        Args:
+            schedules (Sequence[CategorySchedule]): カテゴリごとのルール
+            exceptions (Iterable[Tuple]): (日付, カテゴリID, 種類, 振替先) のリスト
+                                          カテゴリIDが None の場合はその日の全カテゴリに適用する
+                                          日付が解釈できないもの・振替先のない振替は無視する
+        """
+        self.schedules = tuple(schedules)
+        # 休止・振替の元の日付ごと、振替先の日付ごとに (カテゴリID, 元の日付) をまとめる
+        self.exceptionsByOrdinal: Dict[int, List[Optional[int]]] = {}
+        self.movesByTarget: Dict[int, List[Tuple[Optional[int], int]]] = {}
+        for rawDate, categoryId, action, rawMovedTo in exceptions:
+            exceptionDate = parseIsoDate(rawDate)
+            if exceptionDate is None:
+                continue
+            ordinal = exceptionDate.toordinal()
+            if action == 'move':
+                movedTo = parseIsoDate(rawMovedTo) if rawMovedTo else None
+                if movedTo is None:
+                    continue
+                self.movesByTarget.setdefault(movedTo.toordinal(), []).append((categoryId, ordinal))
+            self.exceptionsByOrdinal.setdefault(ordinal, []).append(categoryId)
+        self.years: Dict[int, Tuple[Dict[int, Tuple[int, ...]], Tuple[int, ...]]] = {}
+
+    def _scheduledOn(self, ordinal: int, categoryId: Optional[int]) -> List[int]:
+        """
+        休止・振替を反映する前のルールで、指定日に回収されるカテゴリIDを返す
+        Args:
+            ordinal (int): 日付の通日
+            categoryId (int): 対象のカテゴリID（None の場合は全カテゴリ）
+        Returns:
+            List[int]: 回収されるカテゴリID
+        """
+        day = date.fromordinal(ordinal)
+        return [schedule.categoryId for schedule in self.schedules
+                if (categoryId is None or schedule.categoryId == categoryId) and schedule.matches(day)]
+
+    def forYear(self, year: int) -> Tuple[Dict[int, Tuple[int, ...]], Tuple[int, ...]]:
+        """
+        指定年の回収カレンダーを返す（未作成の場合は作成してキャッシュする）
+        Args:
+            year (int): 年
+        Returns:
+            Tuple: (通日 → カテゴリIDのタプル の辞書, 回収のある日の整列済み通日)
+        """
+        calendar = self.years.get(year)
+        if calendar is not None:
+            return calendar
+
+        startOrdinal = date(year, 1, 1).toordinal()
+        endOrdinal = date(year, 12, 31).toordinal()
+        idsByOrdinal: Dict[int, set] = {}
+        for schedule in self.schedules:
+            for ordinal in schedule.occurrences(startOrdinal, endOrdinal):
+                idsByOrdinal.setdefault(ordinal, set()).add(schedule.categoryId)
+
+        # 休止・振替の元の日から該当カテゴリを外す
+        for ordinal, categoryIds in self.exceptionsByOrdinal.items():
+            if startOrdinal <= ordinal <= endOrdinal and ordinal in idsByOrdinal:
+                if None in categoryIds:
+                    del idsByOrdinal[ordinal]
+                else:
+                    idsByOrdinal[ordinal].difference_update(categoryIds)
+        # 振替先の日に、元の日に回収予定だったカテゴリを加える（元の日が別の年の場合も含む）
+        for ordinal, moves in self.movesByTarget.items():
+            if startOrdinal <= ordinal <= endOrdinal:
+                for categoryId, sourceOrdinal in moves:
+                    movedIds = self._scheduledOn(sourceOrdinal, categoryId)
+                    if movedIds:
+                        idsByOrdinal.setdefault(ordinal, set()).update(movedIds)
+
+        idsTable = {ordinal: tuple(sorted(ids)) for ordinal, ids in idsByOrdinal.items() if ids}
+        calendar = (idsTable, tuple(sorted(idsTable)))
+        # 任意の年を問い合わせられるため、キャッシュする年数に上限を設ける
+        if len(self.years) >= CALENDAR_CACHE_YEARS:
+            self.years.clear()
+        self.years[year] = calendar
+        return calendar
+
+    def categoryIdsOn(self, day: date) -> Tuple[int, ...]:
+        """
+        指定日に回収されるカテゴリIDを返す
+        Args:
+            day (date): 日付
+        Returns:
+            Tuple[int, ...]: カテゴリIDのタプル（ID順）
+        """
+        return self.forYear(day.year)[0].get(day.toordinal(), ())
+
+    def expand(self, start: date, end: date) -> List[Tuple[date, List[int]]]:
+        """
+        期間内の具体的な回収日を返す
+        Args:
+            start (date): 期間の開始日（この日を含む）
+            end (date): 期間の終了日（この日を含む）
+        Returns:
+            List[Tuple[date, List[int]]]: (回収日, その日に回収されるカテゴリIDのリスト) の日付順のリスト
+        """
+        startOrdinal, endOrdinal = start.toordinal(), end.toordinal()
+        pickups = []
+        for year in range(start.year, end.year + 1):
+            idsByOrdinal, ordinals = self.forYear(year)
+            low, high = bisect_left(ordinals, startOrdinal), bisect_right(ordinals, endOrdinal)
+            pickups.extend((date.fromordinal(ordinal), list(idsByOrdinal[ordinal])) for ordinal in ordinals[low:high])
+        return pickups
+
+
+class NextCollectionIndex:
+    """
+    カテゴリごとの「次の回収日」を二分探索で求めるための索引クラス
+    基準日から一定期間の回収日を、カテゴリごとに整列済みの通日配列として事前に計算して保持する
+    基準日（日付が変わったとき）やカタログのバージョンが変わった場合は作り直して使用する
+    """
+    __slots__ = ('baseDate', 'version', 'horizonOrdinal', 'ordinalsByCategory')
+
+    def __init__(self, calendar: CollectionCalendar, baseDate: date, horizonDays: int, version: str):
+        """
+        基準日から horizonDays 日分の回収日を、休止・振替を反映した回収カレンダーから事前計算する
+        Args:
+            calendar (CollectionCalendar): 回収カレンダー
+            baseDate (date): 基準日（通常は今日）
+            horizonDays (int): 事前計算する日数
+            version (str): 計算に使用したカタログのバージョン
+        """
+        self.baseDate = baseDate
+        self.version = version
+        startOrdinal = baseDate.toordinal()
+        self.horizonOrdinal = startOrdinal + horizonDays - 1
+        ordinalsByCategory: Dict[int, List[int]] = {}
+        for pickupDate, categoryIds in calendar.expand(baseDate, date.fromordinal(self.horizonOrdinal)):
+            for categoryId in categoryIds:
+                ordinalsByCategory.setdefault(categoryId, []).append(pickupDate.toordinal())
+        self.ordinalsByCategory: Dict[int, Tuple[int, ...]] = {
+            categoryId: tuple(ordinals) for categoryId, ordinals in ordinalsByCategory.items()
+        }
+
+    def nextCollection(self, categoryId: int, onOrAfter: date = None):
+        """
+        指定日以降で最も近い回収日を返す
+        Args:
+            categoryId (int): カテゴリID
+            onOrAfter (date): この日以降の回収日を探す（省略時は基準日）
+        Returns:
+            date: 次の回収日（事前計算した期間内にない場合は None）
+        """
+        ordinals = self.ordinalsByCategory.get(categoryId, ())
+        position = bisect_left(ordinals, (onOrAfter or self.baseDate).toordinal())
+        return date.fromordinal(ordinals[position]) if position < len(ordinals) else None
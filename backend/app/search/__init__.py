@@ -0,0 +1,11 @@
+"""
+ゴミ種類名の検索索引を提供するパッケージ
+カタログのスナップショット構築時に索引を作成し、検索APIから参照する
+"""
+
+from .normalize import normalizeText
+from .ngram import NgramIndex
+from .bktree import BKTree, allowedDistance
+from .prefix import PrefixIndex
+
+__all__ = ['normalizeText', 'NgramIndex', 'BKTree', 'allowedDistance', 'PrefixIndex']
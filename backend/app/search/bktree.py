@@ -0,0 +1,117 @@
+"""
+編集距離によるあいまい検索用のBK木を提供するモジュール
+入力ミスのある検索語に対し、全件と比較せずに近い名前を探す
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def editDistance(source: str, target: str, limit: Optional[int] = None) -> int:
+    """
+    2つの文字列のレーベンシュタイン距離を計算する
+    limit を指定した場合、距離が limit を超えることが確定した時点で limit + 1 を返す
+    Args:
+        source (str): 比較元の文字列
+        target (str): 比較先の文字列
+        limit (int): 計算を打ち切る距離の上限
+    Returns:
+        int: 編集距離
+    """
+    if limit is not None and abs(len(source) - len(target)) > limit:
+        return limit + 1
+    previous = list(range(len(target) + 1))
+    for i, sourceChar in enumerate(source, 1):
+        current = [i]
+        for j, targetChar in enumerate(target, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (sourceChar != targetChar)
+            ))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """
+    編集距離を距離関数とするBK木クラス
+    各ノードは検索キーと、そのキーを持つ文書IDのリストを保持する
+    三角不等式により、検索時に距離の範囲外となる部分木を辿らずに済む
+    """
+
+    def __init__(self, keys: Iterable[Tuple[int, str]]):
+        """
+        (文書ID, 検索キー) の組からBK木を構築する
+        Args:
+            keys (Iterable[Tuple[int, str]]): 文書IDと検索キー（正規化済み文字列）の組
+        """
+        # ノードは [キー, 文書IDリスト, {距離: 子ノード}] の形で保持する
+        self.root: Optional[list] = None
+        for docId, key in keys:
+            self._add(docId, key)
+
+    def _add(self, docId: int, key: str) -> None:
+        """
+        キーをBK木に追加する。同じキーが既にあれば文書IDのみ追加する
+        Args:
+            docId (int): 文書ID
+            key (str): 検索キー
+        """
+        if not key:
+            return
+        if self.root is None:
+            self.root = [key, [docId], {}]
+            return
+        node = self.root
+        while True:
+            distance = editDistance(key, node[0])
+            if distance == 0:
+                node[1].append(docId)
+                return
+            children: Dict[int, list] = node[2]
+            if distance not in children:
+                children[distance] = [key, [docId], {}]
+                return
+            node = children[distance]
+
+    def search(self, query: str, maxDistance: int) -> List[Tuple[int, int]]:
+        """
+        クエリとの編集距離が maxDistance 以下のキーを持つ文書を探す
+        Args:
+            query (str): 検索文字列（正規化済み）
+            maxDistance (int): 許容する編集距離の上限
+        Returns:
+            List[Tuple[int, int]]: (編集距離, 文書ID) のリスト（距離・ID順）
+        """
+        if self.root is None or not query:
+            return []
+        results = []
+        stack = [self.root]
+        while stack:
+            key, docIds, children = stack.pop()
+            # 子ノードの距離の最大値 + maxDistance を超える場合は部分木ごと対象外になるため打ち切る
+            distance = editDistance(query, key, maxDistance + max(children, default=0))
+            if distance <= maxDistance:
+                results.extend((distance, docId) for docId in docIds)
+            low, high = distance - maxDistance, distance + maxDistance
+            stack.extend(child for childDistance, child in children.items()
+                         if low <= childDistance <= high)
+        return sorted(results)
+
+
+def allowedDistance(query: str) -> int:
+    """
+    クエリの長さに応じたあいまい検索の許容編集距離を返す
+    短い語で距離を大きくすると無関係な名前ばかり一致するため、長さに応じて上限を決める
+    Args:
+        query (str): 検索文字列（正規化済み）
+    Returns:
+        int: 許容する編集距離
+    """
+    if len(query) <= 2:
+        return 0
+    if len(query) <= 5:
+        return 1
+    return 2
@@ -0,0 +1,70 @@
+"""
+部分一致検索用のn-gram転置索引を提供するモジュール
+先頭ワイルドカードのLIKE検索の代わりに、1文字・2文字の索引から候補を絞り込む
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+class NgramIndex:
+    """
+    文字列の部分一致検索を行うn-gram転置索引クラス
+    1文字（unigram）と2文字（bigram）の出現位置を登録し、
+    クエリのbigramの積集合で候補を絞り込んでから部分一致を確認する
+    """
+
+    def __init__(self, keys: Iterable[Tuple[int, str]]):
+        """
+        (文書ID, 検索キー) の組から索引を構築する
+        Args:
+            keys (Iterable[Tuple[int, str]]): 文書IDと検索キー（正規化済み文字列）の組
+        """
+        self.keys: Dict[int, str] = {}
+        postings: Dict[str, set] = {}
+        for docId, key in keys:
+            self.keys[docId] = key
+            for gram in self._grams(key):
+                postings.setdefault(gram, set()).add(docId)
+        self.postings: Dict[str, FrozenSet[int]] = {
+            gram: frozenset(ids) for gram, ids in postings.items()
+        }
+
+    @staticmethod
+    def _grams(text: str) -> set:
+        """
+        文字列に含まれるunigramとbigramの集合を返す
+        Args:
+            text (str): 対象文字列
+        Returns:
+            set: n-gramの集合
+        """
+        grams = set(text)
+        grams.update(text[i:i + 2] for i in range(len(text) - 1))
+        return grams
+
+    def search(self, query: str) -> List[int]:
+        """
+        クエリを部分文字列として含む文書IDを返す
+        Args:
+            query (str): 検索文字列（検索キーと同じ方法で正規化済みのもの）
+        Returns:
+            List[int]: 該当する文書IDのリスト（昇順）
+        """
+        if not query:
+            return []
+        if len(query) == 1:
+            return sorted(self.postings.get(query, ()))
+
+        # bigramの出現件数が少ない順に積集合を取り、候補を早く絞り込む
+        bigrams = {query[i:i + 2] for i in range(len(query) - 1)}
+        postingLists = sorted((self.postings.get(gram, frozenset()) for gram in bigrams), key=len)
+        candidates = set(postingLists[0])
+        for posting in postingLists[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+
+        # bigramがすべて含まれていても連続して出現するとは限らないため最後に確認する
+        if len(query) > 2:
+            candidates = {docId for docId in candidates if query in self.keys[docId]}
+        return sorted(candidates)
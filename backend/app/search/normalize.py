@@ -0,0 +1,24 @@
+"""
+検索キーの正規化処理を提供するモジュール
+全角・半角、カタカナ・ひらがな、英字の大文字・小文字の違いを吸収する
+"""
+
+import unicodedata
+
+# カタカナ（ァ〜ヶ、ヽ・ヾ）をひらがなへ変換する対応表
+KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+KATAKANA_TO_HIRAGANA.update({0x30FD: 0x309D, 0x30FE: 0x309E})
+
+
+def normalizeText(text: str) -> str:
+    """
+    検索キー用に文字列を正規化する
+    NFKC正規化（半角カナ・全角英数の統一）、英字の小文字化、カタカナのひらがな化を行う
+    例: 「ﾍﾟｯﾄﾎﾞﾄﾙ」「ペットボトル」「ぺっとぼとる」はすべて「ぺっとぼとる」になる
+    Args:
+        text (str): 正規化する文字列
+    Returns:
+        str: 正規化された文字列
+    """
+    normalized = unicodedata.normalize('NFKC', text).casefold()
+    return normalized.translate(KATAKANA_TO_HIRAGANA).strip()
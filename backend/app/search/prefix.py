@@ -0,0 +1,78 @@
+"""
+前方一致の入力補完用に、正規化済みの名前を整列して保持する索引を提供するモジュール
+二分探索で先頭位置を求め、そこから連続する候補だけを読む
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+from .normalize import normalizeText
+
+
+class PrefixIndex:
+    """
+    (正規化済みキー, 表示名) を整列して保持する前方一致索引クラス
+    同じ名前が複数のカテゴリにある場合に備え、名前ごとの登録件数を数えて管理する
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        """
+        ゴミ種類名の一覧から索引を構築する
+        Args:
+            names (Iterable[str]): ゴミ種類名（重複可）
+        """
+        self.counts: Dict[str, int] = {}
+        for name in names:
+            self.counts[name] = self.counts.get(name, 0) + 1
+        self.entries: List[Tuple[str, str]] = sorted((normalizeText(name), name) for name in self.counts)
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        """
+        前方一致する名前を正規化済みキーの辞書順で最大 limit 件返す
+        Args:
+            prefix (str): 入力途中の文字列（正規化前）
+            limit (int): 返す件数の上限
+        Returns:
+            List[str]: 補完候補の名前
+        """
+        normalizedPrefix = normalizeText(prefix)
+        if not normalizedPrefix:
+            return []
+        completions = []
+        position = bisect_left(self.entries, (normalizedPrefix,))
+        for key, name in self.entries[position:position + limit]:
+            if not key.startswith(normalizedPrefix):
+                break
+            completions.append(name)
+        return completions
+
+    def patched(self, addedNames: Iterable[str], removedNames: Iterable[str]) -> 'PrefixIndex':
+        """
+        名前の追加・削除を反映した新しい索引を返す（元の索引は変更しない）
+        全件の再ソートを行わず、変更のあった名前だけを二分探索で挿入・削除する
+        Args:
+            addedNames (Iterable[str]): 追加されたゴミ種類名
+            removedNames (Iterable[str]): 削除されたゴミ種類名
+        Returns:
+            PrefixIndex: 変更を反映した索引
+        """
+        index = PrefixIndex()
+        index.counts = dict(self.counts)
+        index.entries = list(self.entries)
+        for name in removedNames:
+            count = index.counts.get(name, 0)
+            if count > 1:
+                index.counts[name] = count - 1
+            elif count == 1:
+                del index.counts[name]
+                entry = (normalizeText(name), name)
+                position = bisect_left(index.entries, entry)
+                if position < len(index.entries) and index.entries[position] == entry:
+                    del index.entries[position]
+        for name in addedNames:
+            if name in index.counts:
+                index.counts[name] += 1
+            else:
+                index.counts[name] = 1
+                insort(index.entries, (normalizeText(name), name))
+        return index
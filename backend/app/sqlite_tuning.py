@@ -0,0 +1,52 @@
+"""
+SQLite の接続ごとの設定（PRAGMA）を適用するモジュール
+設定クラスの SQLITE_PRAGMAS を、エンジンが新しい接続を作成するたびに適用する
+"""
+
+from typing import Dict, Union
+
+from flask import Flask
+from sqlalchemy import event
+
+# 適用する順序（ロック待ちの時間を先に設定し、ジャーナルモードの切り替えが他の接続と競合しても待機させる）
+PRAGMA_ORDER = ('busy_timeout', 'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+
+
+def applyPragmas(dbapiConnection, pragmas: Dict[str, Union[str, int]]) -> None:
+    """
+    DB-API の接続に PRAGMA を適用する
+    Args:
+        dbapiConnection: sqlite3 の接続
+        pragmas (Dict[str, Union[str, int]]): PRAGMA 名 → 値
+    """
+    ordered = [name for name in PRAGMA_ORDER if name in pragmas]
+    ordered.extend(name for name in pragmas if name not in PRAGMA_ORDER)
+    cursor = dbapiConnection.cursor()
+    try:
+        for name in ordered:
+            cursor.execute(f"PRAGMA {name}={pragmas[name]}")
+    finally:
+        cursor.close()
+
+
+def initSqlitePragmas(app: Flask) -> None:
+    """
+    アプリケーションのエンジンに、接続ごとに PRAGMA を適用するフックを登録する
+    SQLite 以外のデータベース、または SQLITE_PRAGMAS が空の場合は何もしない
+    Args:
+        app (Flask): 対象のFlaskアプリケーション（db.init_app 済みであること）
+    """
+    from .models import db
+
+    pragmas = dict(app.config.get('SQLITE_PRAGMAS') or {})
+    if not pragmas:
+        return
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def onConnect(dbapiConnection, connectionRecord):
+        """新しい接続を作成したときに PRAGMA を適用する"""
+        applyPragmas(dbapiConnection, pragmas)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+SQLite の接続設定（SQLITE_PRAGMAS）のベンチマークスクリプト
+別スレッドで管理画面相当の書き込みを続けながら読み取りクエリの応答時間を計測し、
+既定の設定（ロールバックジャーナル）と設定クラスの PRAGMA を比較する
+
+使い方:
+    python benchmark_sqlite.py [--config production] [--categories 300] [--duration 5] [--write-interval 0.01]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import createApp
+from app.config import config
+from app.database_manager import DatabaseManager
+from app.models import db, GarbageCategory, GarbageType, CollectionDay, WEEKDAYS
+
+# 比較の基準とする SQLite の既定の設定
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+def build_app(base_name: str, database_path: str, pragmas: dict):
+    """
+    一時DBと指定の PRAGMA を使うアプリケーションを作成する
+    Args:
+        base_name (str): 元にする設定名
+        database_path (str): 一時DBのパス
+        pragmas (dict): 接続ごとに適用する PRAGMA
+    Returns:
+        Flask: アプリケーション
+    """
+    base = config[base_name]
+    config['benchmark'] = type('BenchmarkConfig', (base,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+        'SQLALCHEMY_ECHO': False,
+        'SQLITE_PRAGMAS': pragmas,
+    })
+    return createApp('benchmark')
+
+
+def seed(category_count: int) -> None:
+    """
+    計測用のカテゴリとゴミ種類を追加する
+    Args:
+        category_count (int): カテゴリ数
+    """
+    db.create_all()
+    DatabaseManager.import_data({'categories': [
+        {
+            'category': f'カテゴリ{index}',
+            'date': [WEEKDAYS[index % 7]],
+            'method': '指定の袋に入れて出してください',
+            'garbage_types': [f'品目{index}-{number}' for number in range(20)]
+        }
+        for index in range(category_count)
+    ]}, clear_existing=True)
+
+
+def writer(app, stop: threading.Event, category_ids: list, interval: float, counters: dict) -> None:
+    """
+    書き込みを繰り返す（カテゴリの更新とゴミ種類の入れ替えを1トランザクションでコミット）
+    Args:
+        app (Flask): アプリケーション
+        stop (threading.Event): 停止の合図
+        category_ids (list): 更新するカテゴリID
+        interval (float): 書き込みの間隔（秒）
+        counters (dict): 書き込み回数・エラー数を記録する辞書
+    """
+    with app.app_context():
+        while not stop.is_set():
+            category_id = random.choice(category_ids)
+            try:
+                category = db.session.get(GarbageCategory, category_id)
+                category.notion = f'更新 {time.time()}'
+                names = [f'品目{category_id}-{number}' for number in range(20)]
+                random.shuffle(names)
+                GarbageType.syncNames({category_id: names[:random.randint(10, 20)]})
+                db.session.commit()
+                counters['writes'] += 1
+            except Exception:
+                db.session.rollback()
+                counters['write_errors'] += 1
+            stop.wait(interval)
+        db.session.remove()
+
+
+def measure(base_name: str, label: str, pragmas: dict, category_count: int, duration: float,
+            write_interval: float) -> dict:
+    """
+    書き込み中の読み取り応答時間を計測する
+    Args:
+        base_name (str): 元にする設定名
+        label (str): 表示名
+        pragmas (dict): 接続ごとに適用する PRAGMA
+        category_count (int): カテゴリ数
+        duration (float): 計測時間（秒）
+        write_interval (float): 書き込みの間隔（秒）
+    Returns:
+        dict: 計測結果
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        app = build_app(base_name, os.path.join(directory, 'benchmark.db'), pragmas)
+        with app.app_context():
+            seed(category_count)
+            category_ids = [category_id for (category_id,) in db.session.query(GarbageCategory.id)]
+            journal_mode = db.session.connection().exec_driver_sql('PRAGMA journal_mode').scalar()
+            db.session.remove()
+
+        counters = {'writes': 0, 'write_errors': 0}
+        stop = threading.Event()
+        thread = threading.Thread(target=writer, args=(app, stop, category_ids, write_interval, counters))
+        latencies = []
+        read_errors = 0
+        with app.app_context():
+            thread.start()
+            deadline = time.perf_counter() + duration
+            while time.perf_counter() < deadline:
+                day = random.choice(WEEKDAYS)
+                started = time.perf_counter()
+                try:
+                    # 曜日での絞り込みと、ゴミ種類の一括読み込み（管理画面・カタログ再構築と同じ形のクエリ）
+                    categories = GarbageCategory.queryWithTypes().join(CollectionDay) \
+                        .filter(CollectionDay.day == day).all()
+                    [category.to_dict() for category in categories]
+                    db.session.rollback()
+                    latencies.append(time.perf_counter() - started)
+                except Exception:
+                    db.session.rollback()
+                    read_errors += 1
+            stop.set()
+            thread.join()
+            db.session.remove()
+        with app.app_context():
+            db.engine.dispose()
+
+    latencies.sort()
+    milliseconds = [latency * 1000 for latency in latencies]
+    return {
+        'label': label,
+        'journal_mode': journal_mode,
+        'reads': len(latencies),
+        'read_errors': read_errors,
+        'writes': counters['writes'],
+        'write_errors': counters['write_errors'],
+        'p50': statistics.median(milliseconds) if milliseconds else 0.0,
+        'p95': milliseconds[int(len(milliseconds) * 0.95)] if milliseconds else 0.0,
+        'p99': milliseconds[int(len(milliseconds) * 0.99)] if milliseconds else 0.0,
+        'max': milliseconds[-1] if milliseconds else 0.0,
+    }
+
+
+def main():
+    """
+    コマンドライン引数を解釈し、SQLite の既定の設定と指定した設定の SQLITE_PRAGMAS を比較する
+    それぞれ一時DBにカテゴリを登録し、別スレッドで一定間隔の書き込みを続けながら曜日別の一覧を読み取り、
+    読み取り・書き込みの件数とエラー数、読み取り応答時間（p50 / p95 / p99 / 最大）を表形式で出力する
+    """
+    parser = argparse.ArgumentParser(description='SQLite の接続設定のベンチマーク（書き込み中の読み取り応答時間）')
+    parser.add_argument('--config', '-c', default='production', choices=['development', 'production', 'termux'],
+                        help='比較する SQLITE_PRAGMAS を持つ設定名')
+    parser.add_argument('--categories', type=int, default=300, help='カテゴリ数（1カテゴリにつきゴミ種類20件）')
+    parser.add_argument('--duration', type=float, default=5.0, help='1つの設定あたりの計測時間（秒）')
+    parser.add_argument('--write-interval', type=float, default=0.01, help='書き込みの間隔（秒）')
+    args = parser.parse_args()
+
+    print(f"=== SQLite benchmark: categories={args.categories}, duration={args.duration}s, "
+          f"write interval={args.write_interval}s ===")
+    results = [
+        measure(args.config, 'default', DEFAULT_PRAGMAS, args.categories, args.duration, args.write_interval),
+        measure(args.config, args.config, config[args.config].SQLITE_PRAGMAS, args.categories, args.duration,
+                args.write_interval),
+    ]
+
+    print(f"{'profile':<12}{'journal':<9}{'reads':>7}{'writes':>8}{'errors':>8}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for result in results:
+        errors = result['read_errors'] + result['write_errors']
+        print(f"{result['label']:<12}{result['journal_mode']:<9}{result['reads']:>7}{result['writes']:>8}"
+              f"{errors:>8}{result['p50']:>9.2f}{result['p95']:>9.2f}{result['p99']:>9.2f}{result['max']:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,7 +11,7 @@ import argparse
 # プロジェクトルートをパスに追加
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import initDatabase
+from app import createApp, initDatabase
 
 def main():
     parser = argparse.ArgumentParser(description='データベース初期化スクリプト')
@@ -26,12 +26,11 @@ def main():
     try:
         if args.export:
             # エクスポートモード
-            from app import createApp
-            from app.database_manager import DatabaseManager
+            from app.export import CatalogExporter
             
             app = createApp()
             with app.app_context():
-                export_data = DatabaseManager.export_to_json(args.export)
+                export_data = CatalogExporter.exportToJson(args.export)
                 print(f"✅ データベースの内容を {args.export} にエクスポートしました")
                 print(f"📊 カテゴリ数: {export_data['metadata']['total_categories']}")
                 print(f"📊 ゴミ種類数: {export_data['metadata']['total_garbage_types']}")
@@ -43,7 +42,9 @@ def main():
                     sys.exit(1)
                 print(f"📁 JSONファイルを使用: {args.json}")
             
-            app = initDatabase(args.json)
+            app = createApp()
+            with app.app_context():
+                initDatabase(args.json)
             print()
             print("✅ データベースの初期化が正常に完了しました！")
             print("💡 サーバーを起動する準備が整いました。")
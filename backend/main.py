@@ -2,45 +2,114 @@
 """
 Flaskアプリケーションのメインエントリーポイント
 アプリケーションの起動を行う
+本番（production / termux 設定）では waitress のマルチスレッドサーバーで配信し、
+開発設定では Flask の開発サーバーを使用する
+カタログ・レスポンスキャッシュ・インポートジョブはプロセス内に保持するため、常に1プロセスで起動する
 """
 
-from app import createApp, initDatabase
+from app import createApp
+import argparse
 import os
 import sys
 
 
+def prepareDatabase(app) -> None:
+    """
+    配信開始前に、未適用のスキーマ移行（適用済みの場合はバージョンの確認のみ）とカタログの読み込みを行う
+    初期データの投入（initDatabase）は init_db.py / manage_db.py で事前に行い、起動のたびには実行しない
+    Args:
+        app (Flask): 対象のFlaskアプリケーション
+    """
+    from app.catalog import getSnapshot
+    from app.migrations import runMigrations
+    from app.models import GarbageCategory
+
+    with app.app_context():
+        for version, description in runMigrations():
+            print(f"🔁 スキーマ移行 {version}: {description}")
+        if not GarbageCategory.query.first():
+            print("⚠️  カテゴリが登録されていません。python init_db.py で初期データを投入してください")
+        # 最初のリクエストでカタログを構築しないよう、事前に読み込む
+        getSnapshot()
+
+
+def serveWithWaitress(app, host: str, port: int, threads: int) -> bool:
+    """
+    waitress でアプリケーションを配信する（終了するまで戻らない）
+    Args:
+        app (Flask): 配信するアプリケーション
+        host (str): 待ち受けるホスト
+        port (int): 待ち受けるポート
+        threads (int): リクエストを処理するスレッド数
+    Returns:
+        bool: waitress がインストールされていない場合は False
+    """
+    try:
+        from waitress import serve
+    except ImportError:
+        return False
+
+    serve(
+        app,
+        host=host,
+        port=port,
+        threads=threads,
+        connection_limit=app.config['SERVER_CONNECTION_LIMIT'],
+        channel_timeout=app.config['SERVER_CHANNEL_TIMEOUT'],
+        ident='HomeGarbageAssistance'
+    )
+    return True
+
+
 def main():
     """
     メイン関数：アプリケーションを起動する
     """
+    parser = argparse.ArgumentParser(description='HomeGarbageAssistance API サーバー')
+    parser.add_argument('--server', choices=['auto', 'waitress', 'flask'], default=os.environ.get('SERVER', 'auto'),
+                        help='使用するサーバー（auto: デバッグ時は Flask の開発サーバー、それ以外は waitress）')
+    parser.add_argument('--threads', type=int, default=None,
+                        help='waitress のスレッド数（省略時は環境変数 THREADS、未設定の場合は設定の SERVER_THREADS）')
+    args = parser.parse_args()
+
     # 環境変数からポートとホストを取得
     port = int(os.environ.get('PORT', 5100))
     host = os.environ.get('HOST', '0.0.0.0')
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
-    
+
     # Flaskアプリケーションを作成
     app = createApp()
-    
-    # アプリケーションコンテキスト内でデータベースを初期化
-    with app.app_context():
-        try:
-            # データベースの初期化
-            initDatabase()
-        except Exception as e:
-            print(f"⚠️  データベース初期化中にエラーが発生しましたが、アプリケーションを続行します: {str(e)}")
-    
+
+    # スキーマの確認とカタログの読み込み（データの初期化は行わない）
+    try:
+        prepareDatabase(app)
+    except Exception as e:
+        print(f"⚠️  データベースの確認中にエラーが発生しましたが、アプリケーションを続行します: {str(e)}")
+
+    server = args.server
+    if server == 'auto':
+        server = 'flask' if debug or app.config.get('DEBUG') else 'waitress'
+    threads = args.threads or int(os.environ.get('THREADS', app.config['SERVER_THREADS']))
+
     print(f"🚀 HomeGarbageAssistance API を起動中...")
     print(f"   URL: http://{host}:{port}")
+    print(f"   サーバー: {server}" + (f"（{threads}スレッド）" if server == 'waitress' else ''))
     print(f"   デバッグモード: {debug}")
     print(f"   終了するには Ctrl+C を押してください")
-    
+
     try:
+        if server == 'waitress':
+            if serveWithWaitress(app, host, port, threads):
+                return
+            print("⚠️  waitress がインストールされていないため、Flask の開発サーバーで起動します（pip install waitress）")
+
         # Flaskアプリケーションを起動
         app.run(
             host=host,
             port=port,
             debug=debug,
-            use_reloader=debug
+            use_reloader=debug,
+            threaded=True
         )
     except KeyboardInterrupt:
         print("\n👋 アプリケーションを終了します...")
@@ -15,18 +15,31 @@ sys.path.insert(0, current_dir)
 
 # app パッケージから createApp をインポート
 from app import createApp, initDatabase
-from app.models import db, GarbageCategory, GarbageType
+from app.models import db, GarbageCategory, GarbageType, CollectionDay, CollectionException
 from app.database_manager import DatabaseManager
+from app.holidays import HolidayImporter
+from app.migrations import SCHEMA_VERSION, getSchemaVersion, migrateRecurrenceRules, runMigrations, setSchemaVersion
 
 def init_database():
     """データベースを初期化"""
     app = createApp()
     with app.app_context():
         print("📊 データベーステーブルを作成中...")
-        db.create_all()
+        runMigrations()
         print("✅ テーブル作成完了")
         return app
 
+def migrate_database():
+    """未適用のスキーマ移行を実行"""
+    app = createApp()
+    with app.app_context():
+        print(f"📊 現在のスキーマ: バージョン {getSchemaVersion()}（最新: {SCHEMA_VERSION}）")
+        applied = runMigrations()
+        for version, description in applied:
+            print(f"🔁 スキーマ移行 {version}: {description}")
+        if not applied:
+            print("✅ スキーマは最新です")
+
 def seed_database():
     """サンプルデータを追加"""
     app = createApp()
@@ -41,6 +54,8 @@ def seed_database():
             
             print("🗑️  既存データを削除中...")
             db.session.query(GarbageType).delete()
+            db.session.query(CollectionDay).delete()
+            db.session.query(CollectionException).filter(CollectionException.category_id.isnot(None)).delete()
             db.session.query(GarbageCategory).delete()
             db.session.commit()
         
@@ -65,6 +80,7 @@ def import_json_file(json_path):
             print(f"✅ インポートが完了しました！")
             print(f"   インポートされたカテゴリ数: {result.get('imported_categories', 0)}")
             print(f"   インポートされたゴミ種類数: {result.get('imported_garbage_types', 0)}")
+            print(f"   処理時間: {result.get('elapsed_seconds', 0)}秒（{result.get('rows_per_second', 0)}行/秒）")
             
             return True
             
@@ -80,7 +96,8 @@ def reset_database():
     with app.app_context():
         print("🔄 データベースをリセット中...")
         db.drop_all()
-        db.create_all()
+        setSchemaVersion(0)
+        runMigrations()
         print("✅ データベースリセット完了")
 
 def show_status():
@@ -108,11 +125,11 @@ def add_category(name, day, method, notion=""):
     with app.app_context():
         category = GarbageCategory(
             category=name,
-            date=day,
             method=method,
             notion=notion,
             special_days=json.dumps([])
         )
+        category.setDays(day)
         
         try:
             db.session.add(category)
@@ -122,9 +139,34 @@ def add_category(name, day, method, notion=""):
             db.session.rollback()
             print(f"❌ エラー: {str(e)}")
 
+def import_holidays(json_path=None):
+    """祝日・年末年始の休止・振替をJSONファイルから一括インポート"""
+    app = createApp()
+    with app.app_context():
+        json_path = json_path or str(app.config['HOLIDAYS_FILE'])
+        if not os.path.exists(json_path):
+            print(f"❌ ファイルが見つかりません: {json_path}")
+            return False
+        
+        print(f"📅 休止・振替を読み込み中: {json_path}")
+        result = HolidayImporter.importFromJson(json_path)
+        print(f"✅ インポート完了: {result['imported_exceptions']}件（未登録カテゴリのため読み飛ばし: {result['skipped_exceptions']}件）")
+        return True
+
+def migrate_recurrence():
+    """特別回収日を繰り返しルールへ移行"""
+    app = createApp()
+    with app.app_context():
+        for version, description in runMigrations():
+            print(f"🔁 スキーマ移行 {version}: {description}")
+        
+        print("🔁 特別回収日を繰り返しルールへ移行中...")
+        migrated = migrateRecurrenceRules()
+        print(f"✅ {migrated}件のカテゴリを移行しました")
+
 def main():
     parser = argparse.ArgumentParser(description='データベース管理スクリプト')
-    parser.add_argument('command', choices=['init', 'seed', 'reset', 'status', 'add-category', 'import-json'], 
+    parser.add_argument('command', choices=['init', 'seed', 'reset', 'status', 'add-category', 'import-json', 'import-holidays', 'migrate', 'migrate-recurrence'], 
                        help='実行するコマンド')
     
     # add-category用のオプション
@@ -133,8 +175,8 @@ def main():
     parser.add_argument('--method', help='回収方法')
     parser.add_argument('--notion', default='', help='注意事項')
     
-    # import-json用のオプション
-    parser.add_argument('--file', help='インポートするJSONファイルのパス')
+    # import-json / import-holidays用のオプション
+    parser.add_argument('--file', help='インポートするJSONファイルのパス（import-holidays では省略時に HOLIDAYS_FILE）')
     
     args = parser.parse_args()
     
@@ -166,6 +208,15 @@ def main():
                 return
             import_json_file(args.file)
             
+        elif args.command == 'import-holidays':
+            import_holidays(args.file)
+            
+        elif args.command == 'migrate':
+            migrate_database()
+            
+        elif args.command == 'migrate-recurrence':
+            migrate_recurrence()
+            
         elif args.command == 'seed':
             init_database()  # テーブルが存在しない場合に作成
             seed_database()
@@ -116,6 +116,14 @@ export PYTHONPATH="$(pwd)"
 export TMPDIR="$PREFIX/tmp"
 export HOME="$HOME"
 
+# Initialize database (schema migrations and first-run data) before serving
+print_info "Initializing database..."
+python init_db.py
+if [ $? -ne 0 ]; then
+    print_error "Failed to initialize database"
+    exit 1
+fi
+
 # Display configuration
 echo
 echo "=================================================="
@@ -86,6 +86,15 @@ $env:FLASK_ENV = $Mode
 $env:FLASK_APP = "main.py"
 $env:PYTHONPATH = (Get-Location).Path
 
+# Initialize database (schema migrations and first-run data) before serving
+Write-Host "[INFO] Initializing database..." -ForegroundColor Blue
+python init_db.py
+if ($LASTEXITCODE -ne 0) {
+    Write-Host "[ERROR] Failed to initialize database" -ForegroundColor Red
+    Read-Host "Press Enter to exit"
+    exit 1
+}
+
 # Display configuration
 Write-Host
 Write-Host "==================================================" -ForegroundColor Cyan
@@ -86,6 +86,14 @@ export FLASK_ENV="$MODE"
 export FLASK_APP="main.py"
 export PYTHONPATH="$(pwd)"
 
+# Initialize database (schema migrations and first-run data) before serving
+print_info "Initializing database..."
+python init_db.py
+if [ $? -ne 0 ]; then
+    print_error "Failed to initialize database"
+    exit 1
+fi
+
 # Display configuration
 echo
 echo "=================================================="
@@ -0,0 +1,47 @@
+"""
+テスト共通のフィクスチャ
+一時DBを使うアプリケーションを、本番用の設定を元にしたテスト用の設定で作成する
+"""
+
+import os
+import sys
+
+import pytest
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import createApp
+from app.config import config
+from app.database_manager import DatabaseManager
+from app.models import db
+
+
+@pytest.fixture(scope='session')
+def createTestApp():
+    """
+    一時DBにカテゴリを登録したアプリケーションを作成する関数を返す
+    テスト用の設定はアプリケーションの作成中だけ config に登録し、作成後に取り除く
+    """
+    def create(databasePath: str, categories: list, **settings):
+        """
+        アプリケーションを作成する
+        Args:
+            databasePath (str): 一時DBのパス
+            categories (list): 登録するカテゴリ（エクスポート形式）
+            **settings: 上書きする設定（既定では HOLIDAYS_FILE を読み込まない）
+        Returns:
+            Flask: アプリケーション
+        """
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setitem(config, 'test', type('TestConfig', (config['production'],), {
+                'SQLALCHEMY_DATABASE_URI': f'sqlite:///{databasePath}',
+                'HOLIDAYS_FILE': None,
+                **settings,
+            }))
+            app = createApp('test')
+        with app.app_context():
+            db.create_all()
+            DatabaseManager.import_data({'categories': categories}, clear_existing=True)
+        return app
+    return create
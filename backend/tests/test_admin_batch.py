@@ -0,0 +1,95 @@
+"""
+管理APIの一括操作（POST /api/admin/batch）が、不正な入力を何も反映せずに拒否することを確認するテスト
+"""
+
+import pytest
+
+from app.models import GarbageCategory
+
+BATCH_URL = '/api/admin/batch'
+
+
+@pytest.fixture
+def client(tmp_path, createTestApp):
+    """
+    カテゴリを2件登録した一時DBのテストクライアントを作成する
+    """
+    app = createTestApp(str(tmp_path / 'batch.db'), [
+        {
+            'category': name,
+            'date': ['Monday'],
+            'method': '指定の袋に入れて出してください',
+            'special_days': [],
+            'garbage_types': [f'{name}の品目']
+        }
+        for name in ('燃えるゴミ', '資源ゴミ')
+    ])
+    return app.test_client()
+
+
+def categoryNames(client) -> list:
+    """
+    登録されているカテゴリ名を名前順に返す
+    Args:
+        client (FlaskClient): テストクライアント
+    Returns:
+        list: カテゴリ名のリスト
+    """
+    with client.application.app_context():
+        return sorted(category.category for category in GarbageCategory.query.all())
+
+
+def testBatchNameConflictReturns409(client):
+    """
+    操作の途中でカテゴリ名が重複する場合は 409 を返し、前の操作も反映しないことを確認する
+    """
+    response = client.post(BATCH_URL, json={'operations': [
+        {'op': 'create', 'data': {'category': '粗大ゴミ', 'date': ['Friday'], 'method': '予約して出してください'}},
+        {'op': 'create', 'data': {'category': '燃えるゴミ', 'date': ['Friday'], 'method': '予約して出してください'}},
+    ]})
+    assert response.status_code == 409
+    assert response.get_json()['success'] is False
+    assert categoryNames(client) == ['燃えるゴミ', '資源ゴミ']
+
+
+@pytest.mark.parametrize('operation', [
+    {'op': 'create', 'data': '粗大ゴミ'},
+    {'op': 'create', 'data': {'category': '粗大ゴミ', 'date': ['Someday'], 'method': '予約して出してください'}},
+    {'op': 'update', 'id': 1, 'data': {'garbage_types': '品目'}},
+    {'op': 'rename', 'id': 1},
+])
+def testMalformedOperationReturns400(client, operation):
+    """
+    形式の不正な操作は 400 を返し、何も反映しないことを確認する
+    """
+    response = client.post(BATCH_URL, json={'operations': [operation]})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert categoryNames(client) == ['燃えるゴミ', '資源ゴミ']
+
+
+@pytest.mark.parametrize('body, contentType', [
+    ('operations', 'text/plain'),
+    ('{"operations": [', 'application/json'),
+])
+def testNonJsonBodyReturns400(client, body, contentType):
+    """
+    JSONでない本文や Content-Type が JSON でないリクエストは 500 ではなく 400 を返すことを確認する
+    """
+    response = client.post(BATCH_URL, data=body, content_type=contentType)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def testCreateWithRecurrence(client):
+    """
+    繰り返しルールを指定したカテゴリを一括操作で作成でき、単体の作成と同じ形式で保存されることを確認する
+    """
+    rule = {'freq': 'monthly', 'days': ['Wednesday'], 'weeks': [2, 4]}
+    response = client.post(BATCH_URL, json={'operations': [
+        {'op': 'create', 'data': {'category': '粗大ゴミ', 'date': ['Wednesday'], 'method': '予約して出してください',
+                                  'recurrence': [rule]}},
+    ]})
+    assert response.status_code == 200
+    categoryId = response.get_json()['data']['results'][0]['id']
+    assert client.get(f'/api/categories/{categoryId}').get_json()['data']['recurrence'] == [rule]
@@ -0,0 +1,44 @@
+"""
+iCalendar フィード（/api/calendar.ics）が、キャッシュに収まる場合はキャッシュから、
+収まらない場合はストリーミングで返され、どちらも ETag による 304 に対応することを確認するテスト
+"""
+
+import pytest
+
+from app.models import WEEKDAYS
+
+CATEGORIES = [
+    {
+        'category': f'カテゴリ{index}',
+        'date': WEEKDAYS,
+        'method': '指定の袋に入れて出してください',
+        'special_days': [],
+        'garbage_types': [f'品目{index}']
+    }
+    for index in range(3)
+]
+
+
+@pytest.mark.parametrize('maxBytes, streamed', [(1024 * 1024, False), (0, True)])
+def testCalendarFeed(tmp_path, createTestApp, maxBytes, streamed):
+    """
+    フィードがキャッシュの上限に応じてキャッシュ・ストリーミングされ、内容と ETag が変わらないことを確認する
+    """
+    app = createTestApp(str(tmp_path / 'calendar.db'), CATEGORIES, RESPONSE_CACHE_MAX_BYTES=maxBytes)
+    client = app.test_client()
+
+    response = client.get('/api/calendar.ics?days=60')
+    assert response.status_code == 200
+    # ストリーミングの場合は全体の長さが分からないため Content-Length を返さない
+    assert ('Content-Length' not in response.headers) is streamed
+    body = response.get_data()
+    assert body.startswith(b'BEGIN:VCALENDAR') and body.rstrip().endswith(b'END:VCALENDAR')
+    assert body.count(b'BEGIN:VEVENT') == 60 * len(CATEGORIES)
+    assert len(app.extensions['response_cache'].entries) == (0 if streamed else 1)
+
+    again = client.get('/api/calendar.ics?days=60')
+    assert again.get_data() == body
+    assert again.headers['ETag'] == response.headers['ETag']
+
+    notModified = client.get('/api/calendar.ics?days=60', headers={'If-None-Match': response.headers['ETag']})
+    assert notModified.status_code == 304
@@ -0,0 +1,86 @@
+"""
+カタログの更新に失敗した場合や別プロセスから書き込まれた場合も、コミット済みの書き込みが成功として返り、
+次の更新で入力補完（/api/search/suggest）が最新の内容に戻ることを確認するテスト
+"""
+
+import pytest
+
+from app.catalog import CatalogSnapshot
+from app.models import db, GarbageType
+
+
+@pytest.fixture
+def app(tmp_path, createTestApp):
+    """
+    カテゴリを1件登録した一時DBのアプリケーションを作成する
+    """
+    return createTestApp(str(tmp_path / 'refresh.db'), [
+        {
+            'category': '燃えるゴミ',
+            'date': ['Monday'],
+            'method': '指定の袋に入れて出してください',
+            'special_days': [],
+            'garbage_types': ['ざっし']
+        }
+    ])
+
+
+def suggest(client, prefix: str) -> list:
+    """
+    入力補完の候補を取得する
+    Args:
+        client (FlaskClient): テストクライアント
+        prefix (str): 入力途中の文字列
+    Returns:
+        list: 補完候補の名前
+    """
+    return client.get(f'/api/search/suggest?prefix={prefix}').get_json()['data']
+
+
+def addTypes(client, names: list):
+    """
+    管理APIでカテゴリ1のゴミ種類を追加する
+    Args:
+        client (FlaskClient): テストクライアント
+        names (list): 追加後のゴミ種類名の一覧
+    Returns:
+        Response: レスポンス
+    """
+    return client.put('/api/admin/categories/1', json={'garbage_types': names})
+
+
+def testFailedRefreshKeepsCommittedWrite(app, monkeypatch):
+    """
+    コミット後のカタログの更新に失敗しても 200 とエラーを返し、次の更新では全件から再構築することを確認する
+    """
+    client = app.test_client()
+    assert suggest(client, 'ざ') == ['ざっし']
+
+    def failingFromDatabase(*args, **kwargs):
+        """カタログの構築に失敗する"""
+        raise RuntimeError('catalog is unavailable')
+
+    with monkeypatch.context() as patch:
+        patch.setattr(CatalogSnapshot, 'fromDatabase', failingFromDatabase)
+        response = addTypes(client, ['ざっし', 'ざぶとん'])
+    assert response.status_code == 200
+    assert response.get_json()['catalog_refresh_error'] == 'catalog is unavailable'
+
+    response = addTypes(client, ['ざっし', 'ざぶとん', 'ざる'])
+    assert 'catalog_refresh_error' not in response.get_json()
+    assert suggest(client, 'ざ') == ['ざっし', 'ざぶとん', 'ざる']
+
+
+def testOutOfProcessWriteIsPickedUp(app):
+    """
+    カタログを更新せずに書き込まれたゴミ種類（manage_db.py など）が、次の差分更新で入力補完に含まれることを確認する
+    """
+    client = app.test_client()
+    assert suggest(client, 'ざ') == ['ざっし']
+
+    with app.app_context():
+        db.session.add(GarbageType(name='ざぶとん', category_id=1))
+        db.session.commit()
+
+    addTypes(client, ['ざっし', 'ざぶとん', 'ざる'])
+    assert suggest(client, 'ざ') == ['ざっし', 'ざぶとん', 'ざる']
@@ -0,0 +1,57 @@
+"""
+既存データを削除するインポートで、カテゴリ個別の休止・振替だけが読み込み直されることを確認するテスト
+"""
+
+import json
+
+from app.database_manager import DatabaseManager
+from app.holidays import HolidayImporter
+from app.models import GarbageCategory, CollectionException
+
+CATEGORIES = [
+    {
+        'category': 'びん・缶',
+        'date': ['Wednesday'],
+        'method': 'コンテナに入れて出してください',
+        'special_days': [],
+        'garbage_types': ['空き缶']
+    }
+]
+
+
+def writeJson(path, data) -> str:
+    """
+    JSONファイルを書き込む
+    Args:
+        path (Path): 書き込み先
+        data (dict): 内容
+    Returns:
+        str: ファイルパス
+    """
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+def testClearingImportKeepsGlobalExceptions(tmp_path, createTestApp):
+    """
+    既存データを削除するインポートの後も、別のファイルから読み込んだ全カテゴリ共通の休止が残り、
+    HOLIDAYS_FILE のカテゴリ個別の振替が新しいカテゴリIDで読み込み直されることを確認する
+    HOLIDAYS_FILE に形式の不正な行があっても、カテゴリのインポートは失敗しない
+    """
+    holidaysFile = writeJson(tmp_path / 'holidays.json', {'exceptions': [
+        {'date': '2026-12-30', 'category': 'びん・缶', 'action': 'move', 'moved_to': '2026-12-29'},
+        {'date': '2026-13-40', 'category': 'びん・缶', 'action': 'cancel'},
+    ]})
+    customFile = writeJson(tmp_path / 'custom.json', {'exceptions': [
+        {'date': '2026-05-06', 'action': 'cancel', 'note': '振替休日'},
+    ]})
+    app = createTestApp(str(tmp_path / 'holidays.db'), CATEGORIES, HOLIDAYS_FILE=holidaysFile)
+
+    with app.app_context():
+        HolidayImporter.importFromJson(customFile, clearExisting=False)
+        result = DatabaseManager.import_data({'categories': CATEGORIES}, clear_existing=True)
+        assert result['imported_categories'] == 1
+
+        categoryId = GarbageCategory.query.filter_by(category='びん・缶').one().id
+        exceptions = sorted((row.date, row.category_id, row.action) for row in CollectionException.query.all())
+        assert exceptions == [('2026-05-06', None, 'cancel'), ('2026-12-30', categoryId, 'move')]
@@ -0,0 +1,87 @@
+"""
+公開API・管理APIのSQLクエリ数がデータ件数に依存しないこと（N+1 が発生しないこと）を確認するテスト
+カタログを未構築の状態にしてからリクエストし、スナップショットの構築を含めたクエリ数を数える
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.models import db, WEEKDAYS
+
+# 件数を比較する2つのデータ量（カテゴリ数）
+SMALL_SIZE = 5
+LARGE_SIZE = SMALL_SIZE * 10
+
+ENDPOINTS = [
+    '/api/categories',
+    '/api/categories/today',
+    '/api/categories/1',
+    '/api/search?q=品目',
+    '/api/admin/categories',
+]
+
+
+def buildCategories(categoryCount: int) -> list:
+    """
+    指定件数のカテゴリデータを作成する
+    Args:
+        categoryCount (int): カテゴリ数（1カテゴリにつきゴミ種類5件）
+    Returns:
+        list: エクスポート形式のカテゴリデータ
+    """
+    return [
+        {
+            'category': f'カテゴリ{index}',
+            'date': [WEEKDAYS[index % 7], WEEKDAYS[(index + 3) % 7]],
+            'method': '指定の袋に入れて出してください',
+            'special_days': [],
+            'garbage_types': [f'品目{index}-{number}' for number in range(5)]
+        }
+        for index in range(categoryCount)
+    ]
+
+
+def countQueries(app, url: str) -> int:
+    """
+    カタログを未構築の状態に戻してからリクエストし、実行されたSQLの数を返す
+    Args:
+        app (Flask): アプリケーション
+        url (str): リクエストするURL
+    Returns:
+        int: 実行されたSQLの数
+    """
+    statements = []
+
+    def onExecute(conn, cursor, statement, parameters, context, executemany):
+        """実行されたSQLを記録する"""
+        statements.append(statement)
+
+    app.extensions['catalog'].snapshot = None
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', onExecute)
+    try:
+        response = app.test_client().get(url)
+    finally:
+        event.remove(engine, 'before_cursor_execute', onExecute)
+    assert response.status_code == 200, url
+    return len(statements)
+
+
+@pytest.fixture(scope='module')
+def apps(tmp_path_factory, createTestApp):
+    """
+    カテゴリ数の異なる2つのアプリケーションを作成する
+    """
+    directory = tmp_path_factory.mktemp('query_count')
+    return (createTestApp(str(directory / 'small.db'), buildCategories(SMALL_SIZE)),
+            createTestApp(str(directory / 'large.db'), buildCategories(LARGE_SIZE)))
+
+
+@pytest.mark.parametrize('url', ENDPOINTS)
+def testQueryCountDoesNotGrowWithData(apps, url):
+    """
+    カテゴリ数を10倍にしても、1リクエストあたりのクエリ数が変わらないことを確認する
+    """
+    smallApp, largeApp = apps
+    assert countQueries(smallApp, url) == countQueries(largeApp, url)
@@ -0,0 +1,74 @@
+"""
+繰り返しルールの曜日が、曜日別の一覧（/api/week・/api/categories?day=）に反映されることを確認するテスト
+"""
+
+import pytest
+
+# 第2・第4水曜日の繰り返しルール（回収曜日の月曜日とは別の曜日）
+WEDNESDAY_RULE = {'freq': 'monthly', 'days': ['Wednesday'], 'weeks': [2, 4]}
+
+
+@pytest.fixture
+def client(tmp_path, createTestApp):
+    """
+    回収曜日が月曜日で、第2・第4水曜日のルールを持つカテゴリと、ルールのないカテゴリを登録した
+    一時DBのテストクライアントを作成する
+    """
+    app = createTestApp(str(tmp_path / 'recurrence.db'), [
+        {
+            'category': 'びん・缶',
+            'date': ['Monday'],
+            'method': 'コンテナに入れて出してください',
+            'special_days': [],
+            'recurrence': [WEDNESDAY_RULE],
+            'garbage_types': ['空き缶']
+        },
+        {
+            'category': '燃えるゴミ',
+            'date': ['Monday'],
+            'method': '指定の袋に入れて出してください',
+            'special_days': [],
+            'garbage_types': ['生ごみ']
+        }
+    ])
+    return app.test_client()
+
+
+def categoryNamesOn(client, day: str) -> tuple:
+    """
+    /api/categories?day= と /api/week の両方から、指定曜日のカテゴリ名を取得する
+    Args:
+        client (FlaskClient): テストクライアント
+        day (str): 曜日名
+    Returns:
+        tuple: (曜日指定の一覧のカテゴリ名, 週の一覧のカテゴリ名)
+    """
+    byDay = client.get(f'/api/categories?day={day}').get_json()['data']
+    week = client.get('/api/week').get_json()
+    return (sorted(category['category'] for category in byDay),
+            sorted(week['categories'][str(categoryId)]['category'] for categoryId in week['days'][day]))
+
+
+def testImportedRuleDaysAppearInDayViews(client):
+    """
+    インポートしたカテゴリのルールの曜日が、回収曜日とともに曜日別の一覧に含まれることを確認する
+    """
+    assert categoryNamesOn(client, 'Wednesday') == (['びん・缶'], ['びん・缶'])
+    assert categoryNamesOn(client, 'Monday') == (['びん・缶', '燃えるゴミ'], ['びん・缶', '燃えるゴミ'])
+
+
+def testUpdatedRuleDaysAppearInDayViews(client):
+    """
+    カテゴリの更新・一括操作で繰り返しルールだけを変更しても、曜日別の一覧に反映されることを確認する
+    """
+    response = client.put('/api/admin/categories/2', json={
+        'recurrence': [{'freq': 'weekly', 'days': ['Friday'], 'interval': 2, 'start': '2026-01-02'}]
+    })
+    assert response.status_code == 200
+    assert categoryNamesOn(client, 'Friday') == (['燃えるゴミ'], ['燃えるゴミ'])
+
+    response = client.post('/api/admin/batch', json={'operations': [
+        {'op': 'update', 'id': 1, 'data': {'recurrence': []}}
+    ]})
+    assert response.status_code == 200
+    assert categoryNamesOn(client, 'Wednesday') == ([], [])
@@ -29,6 +29,20 @@ interface CategoryData {
   }>;
 }
 
+type BatchOperation =
+  | { op: 'create'; data: CategoryFormData }
+  | { op: 'update'; id: number; data: Partial<CategoryFormData> }
+  | { op: 'delete'; id: number };
+
+interface BatchResult {
+  results: Array<{ op: BatchOperation['op']; id: number; category: string }>;
+  created: number;
+  updated: number;
+  deleted: number;
+  added_garbage_types: string[];
+  removed_garbage_types: string[];
+}
+
 interface ApiResponse<T> {
   success: boolean;
   data?: T;
@@ -37,6 +51,22 @@ interface ApiResponse<T> {
   total?: number;
 }
 
+interface ImportJob {
+  id: string;
+  kind: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  created_at: string;
+  elapsed_seconds: number;
+  categories_processed: number;
+  garbage_types_processed: number;
+  categories_skipped: number;
+  result: any | null;
+  error: string | null;
+}
+
+// バックグラウンドのインポートジョブの進捗を確認する間隔（ミリ秒）
+const JOB_POLL_INTERVAL_MS = 500;
+
 export class AdminApiClient {
   private baseUrl: string;
 
@@ -101,20 +131,56 @@ export class AdminApiClient {
     });
   }
 
+  // 複数カテゴリの作成・更新・削除を1回のリクエスト・1つのトランザクションで反映
+  async applyBatch(operations: BatchOperation[]): Promise<ApiResponse<BatchResult>> {
+    return this.request<BatchResult>('/batch', {
+      method: 'POST',
+      body: JSON.stringify({ operations }),
+    });
+  }
+
   // データエクスポート
   async exportData(): Promise<ApiResponse<any>> {
     return this.request<any>('/export');
   }
 
-  // データインポート
-  async importData(data: any, clearExisting = false): Promise<ApiResponse<any>> {
-    return this.request<any>('/import', {
+  // データインポート（1行に1カテゴリの NDJSON で送信し、サーバー側で1行ずつ読み込ませる）
+  // サーバーではバックグラウンドのジョブとして実行し、完了するまで進捗を確認する
+  async importData(
+    data: any,
+    clearExisting = false,
+    onProgress?: (job: ImportJob) => void
+  ): Promise<ApiResponse<any>> {
+    const categories: unknown[] = Array.isArray(data?.categories) ? data.categories : [];
+    const started = await this.request<ImportJob>(`/import?clear_existing=${clearExisting}&background=true`, {
       method: 'POST',
-      body: JSON.stringify({
-        data,
-        clear_existing: clearExisting
-      }),
+      headers: { 'Content-Type': 'application/x-ndjson' },
+      body: categories.map(category => JSON.stringify(category)).join('\n'),
     });
+    if (!started.success || !started.data) {
+      return started;
+    }
+
+    let job = started.data;
+    while (job.status === 'queued' || job.status === 'running') {
+      onProgress?.(job);
+      await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      const response = await this.getJob(job.id);
+      if (!response.success || !response.data) {
+        return response;
+      }
+      job = response.data;
+    }
+
+    if (job.status === 'failed') {
+      return { success: false, error: job.error || 'インポートに失敗しました' };
+    }
+    return { success: true, data: job.result, message: 'データのインポートが完了しました' };
+  }
+
+  // バックグラウンドジョブの状態取得
+  async getJob(jobId: string): Promise<ApiResponse<ImportJob>> {
+    return this.request<ImportJob>(`/jobs/${jobId}`);
   }
 
   // データベースリセット
@@ -125,4 +191,4 @@ export class AdminApiClient {
   }
 }
 
-export type { CategoryFormData, CategoryData, ApiResponse };
+export type { CategoryFormData, CategoryData, ApiResponse, ImportJob, BatchOperation, BatchResult };
@@ -6,7 +6,7 @@
 /// <reference types="vite/client" />
 
 import { ref, type Ref } from 'vue';
-import type { GarbageCategory, SearchResult, ApiResponse, DayOfWeek } from '@/types';
+import type { GarbageCategory, SearchResult, SearchHit, BatchSearchEntry, WeekSchedule, ApiResponse, DayOfWeek } from '@/types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL|| 'http://localhost:5000/api';
 
@@ -82,8 +82,40 @@ export function useGarbageApi() {
     }
   }
 
+  /**
+   * 全曜日のゴミカテゴリと今日・明日の曜日をまとめて取得する
+   */
+  async function getWeekSchedule(): Promise<WeekSchedule | null> {
+    loading.value = true;
+    error.value = null;
+    
+    try {
+      const response = await fetch(`${API_BASE_URL}/week`);
+      const result: ApiResponse<never> & Partial<WeekSchedule> = await response.json();
+      
+      if (!result.success) {
+        throw new Error(result.error || 'API request failed');
+      }
+      
+      return {
+        today: result.today || '',
+        tomorrow: result.tomorrow || '',
+        days: result.days || {},
+        dates: result.dates || {},
+        collecting: result.collecting || {},
+        categories: result.categories || {}
+      };
+    } catch (err) {
+      error.value = err instanceof Error ? err.message : 'Unknown error occurred';
+      return null;
+    } finally {
+      loading.value = false;
+    }
+  }
+
   /**
    * ゴミの種類で逆検索を実行する
+   * 検索APIはカテゴリをIDで参照して返すため、ヒットごとにカテゴリ情報を結合する
    */
   async function searchGarbageType(query: string): Promise<SearchResult[]> {
     if (!query.trim()) return [];
@@ -93,7 +125,7 @@ export function useGarbageApi() {
     
     try {
       const response = await fetch(`${API_BASE_URL}/search?q=${encodeURIComponent(query)}`);
-      const result: ApiResponse<SearchResult[]> & { found?: boolean } = await response.json();
+      const result: ApiResponse<SearchHit[]> = await response.json();
       
       if (!result.success) {
         throw new Error(result.error || 'Search failed');
@@ -103,7 +135,11 @@ export function useGarbageApi() {
         return [];
       }
       
-      return result.data || [];
+      const categories = result.categories || {};
+      return (result.data || []).map(hit => ({
+        garbage_type: hit.garbage_type,
+        category: categories[String(hit.category_id)]
+      }));
     } catch (err) {
       error.value = err instanceof Error ? err.message : 'Unknown error occurred';
       return [];
@@ -112,6 +148,63 @@ export function useGarbageApi() {
     }
   }
 
+  /**
+   * 複数のゴミの種類名をまとめて逆検索する
+   * 1回のリクエストで全検索語を解決し、検索語ごとの検索結果を返す
+   */
+  async function searchGarbageTypesBatch(queries: string[]): Promise<Record<string, SearchResult[]>> {
+    if (queries.length === 0) return {};
+    
+    loading.value = true;
+    error.value = null;
+    
+    try {
+      const response = await fetch(`${API_BASE_URL}/search/batch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ queries })
+      });
+      const result: ApiResponse<BatchSearchEntry[]> = await response.json();
+      
+      if (!result.success) {
+        throw new Error(result.error || 'Search failed');
+      }
+      
+      const categories = result.categories || {};
+      const resultsByQuery: Record<string, SearchResult[]> = {};
+      for (const entry of result.data || []) {
+        resultsByQuery[entry.query] = entry.hits.map(hit => ({
+          garbage_type: hit.garbage_type,
+          category: categories[String(hit.category_id)]
+        }));
+      }
+      return resultsByQuery;
+    } catch (err) {
+      error.value = err instanceof Error ? err.message : 'Unknown error occurred';
+      return {};
+    } finally {
+      loading.value = false;
+    }
+  }
+
+  /**
+   * 入力途中の文字列に前方一致するゴミの種類名の候補を取得する
+   * 入力ごとに呼び出されるため、ローディング状態とエラー表示は更新しない
+   */
+  async function suggestGarbageTypes(prefix: string, limit = 10): Promise<string[]> {
+    if (!prefix.trim()) return [];
+    
+    try {
+      const response = await fetch(
+        `${API_BASE_URL}/search/suggest?prefix=${encodeURIComponent(prefix)}&limit=${limit}`
+      );
+      const result: ApiResponse<string[]> = await response.json();
+      return result.success ? result.data || [] : [];
+    } catch {
+      return [];
+    }
+  }
+
   /**
    * 指定されたIDのカテゴリ詳細を取得する
    */
@@ -139,7 +232,10 @@ export function useGarbageApi() {
     getAllCategories,
     getCategoriesByDay,
     getTodayCategories,
+    getWeekSchedule,
     searchGarbageType,
+    searchGarbageTypesBatch,
+    suggestGarbageTypes,
     getCategoryById,
     healthCheck
   };
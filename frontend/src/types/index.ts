@@ -9,8 +9,24 @@ export interface GarbageCategory {
   date: string[] | string; // 複数曜日対応：配列または文字列
   method: string;
   special_days: string[];
+  recurrence?: RecurrenceRule[]; // 繰り返しルール（未登録の場合は回収曜日と特別回収日に従う）
   notion: string;
   garbage_types: GarbageType[];
+  next_collection?: string | null; // 次の回収日 YYYY-MM-DD
+}
+
+/**
+ * 回収日の繰り返しルール（例: 第2・第4水曜日、隔週）
+ */
+export interface RecurrenceRule {
+  freq: 'weekly' | 'monthly' | 'dates';
+  days?: string[];
+  interval?: number;
+  weeks?: number[];
+  month_days?: number[];
+  dates?: string[];
+  start?: string;
+  until?: string;
 }
 
 export interface GarbageType {
@@ -25,6 +41,37 @@ export interface SearchResult {
   category: GarbageCategory;
 }
 
+/**
+ * /api/search のヒット1件（カテゴリはIDで参照する）
+ */
+export interface SearchHit {
+  garbage_type: GarbageType;
+  category_id: number;
+  match: 'exact' | 'prefix' | 'substring' | 'fuzzy';
+}
+
+/**
+ * /api/search/batch の検索語ごとの結果
+ */
+export interface BatchSearchEntry {
+  query: string;
+  found: boolean;
+  total: number;
+  hits: SearchHit[];
+}
+
+/**
+ * /api/week の応答（曜日ごとのカテゴリIDとカテゴリ情報）
+ */
+export interface WeekSchedule {
+  today: string;
+  tomorrow: string;
+  days: Record<string, number[]>;
+  dates: Record<string, string>; // 今日から7日間の各曜日の日付 YYYY-MM-DD
+  collecting: Record<string, number[]>; // その日に実際に回収されるカテゴリID
+  categories: Record<string, GarbageCategory>;
+}
+
 export interface ApiResponse<T> {
   success: boolean;
   data?: T;
@@ -33,6 +80,8 @@ export interface ApiResponse<T> {
   found?: boolean;
   query?: string;
   today?: string;
+  total?: number;
+  categories?: Record<string, GarbageCategory>;
 }
 
 export type DayOfWeek = 'Monday' | 'Tuesday' | 'Wednesday' | 'Thursday' | 'Friday' | 'Saturday' | 'Sunday';
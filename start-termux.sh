@@ -52,6 +52,7 @@ start_backend() {
     export FLASK_ENV=production
     export FLASK_APP=main.py
     export PYTHONPATH="$(pwd)"
+    python init_db.py >> "$LOGS_DIR/backend.log" 2>&1
     nohup python main.py >> "$LOGS_DIR/backend.log" 2>&1 &
     echo $! > "$PIDS_DIR/backend.pid"
   )